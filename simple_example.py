@@ -1,5 +1,6 @@
 import logging
 import time
+from typing import ClassVar, List
 
 import pandas as pd
 import typer
@@ -34,6 +35,19 @@ class AddNBlock(BlockBase):
 
     params: AddNBlockParams
 
+    # Each row only depends on itself, can be fused with other row local blocks
+    row_local: ClassVar[bool] = True
+
+    @override
+    def read_columns(self) -> List[str]:
+        """Only the target column is read"""
+        return [self.params.target_column]
+
+    @override
+    def write_columns(self) -> List[str]:
+        """Only the target column is written"""
+        return [self.params.target_column]
+
     @override
     def validate(self, input_df: pd.DataFrame) -> None:
         """Validate that the input dataframe is not empty and that the target column exists and is numeric."""
@@ -53,10 +67,9 @@ class AddNBlock(BlockBase):
         """Run the block and return the result"""
         # Validate the input data
         self.validate(input_df=input_df)
-        # Run the block
-        result_df = input_df.copy()
-        result_df[self.params.target_column] += self.params.n
-        return result_df
+        # Run the block, only the target column was copied for this block
+        input_df[self.params.target_column] += self.params.n
+        return input_df
 
 
 ############################################################################################
@@ -74,6 +87,19 @@ class MultiplyByNBlock(BlockBase):
 
     params: MultiplyBYNBlockParams
 
+    # Each row only depends on itself, can be fused with other row local blocks
+    row_local: ClassVar[bool] = True
+
+    @override
+    def read_columns(self) -> List[str]:
+        """Only the target column is read"""
+        return [self.params.target_column]
+
+    @override
+    def write_columns(self) -> List[str]:
+        """Only the target column is written"""
+        return [self.params.target_column]
+
     @override
     def validate(self, input_df: pd.DataFrame) -> None:
         """Validate that the input dataframe is not empty and that the target column exists and is numeric."""
@@ -93,10 +119,9 @@ class MultiplyByNBlock(BlockBase):
         """Run the block and return the result"""
         # Validate the input data
         self.validate(input_df=input_df)
-        # Run the block
-        result_df = input_df.copy()
-        result_df[self.params.target_column] *= self.params.n
-        return result_df
+        # Run the block, only the target column was copied for this block
+        input_df[self.params.target_column] *= self.params.n
+        return input_df
 
 
 @app.command()
@@ -115,16 +140,19 @@ def example(
     print(f"{test_data.head(10)}")
 
     sequential_runner = SequentialRunner(
+        # Run the AddNBlock and MultiplyByNBlock stages as one fused parallel stage
+        fuse_parallel=True,
         block_map={
             # Prepare the data
             1: PrepareBlock(),
-            # Run the AddNBlock in parallel
+            # Run the AddNBlock in parallel, only shipping column_a to the workers
             2: ParallelRunner(
                 block=AddNBlock(
                     params=AddNBlockParams(n=5, target_column="column_a", num_retries=3)
                 ),
-                num_chunks=5,
+                auto_chunking=True,
                 use_thread_pool=True,
+                project_columns=True,
             ),
             # Run the MultiplyByNBlock in parallel
             3: ParallelRunner(
@@ -133,7 +161,7 @@ def example(
                         n=2, target_column="column_a", num_retries=3
                     )
                 ),
-                num_chunks=5,
+                auto_chunking=True,
                 use_thread_pool=True,
             ),
             # Run the AverageBlock sequentially by itself (just to show how it works)
@@ -146,7 +174,7 @@ def example(
                     )
                 }
             ),
-        }
+        },
     )
 
     # Run the computation
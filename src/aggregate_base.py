@@ -0,0 +1,50 @@
+from typing import Any, List
+
+import pandas as pd
+
+from src.block_base import BlockBase
+
+
+class AggregateBlockBase(BlockBase):
+    """Base class for blocks that broadcast a global aggregate back onto every row.
+
+    Aggregates split into three steps so ParallelRunner can compute them over
+    chunks and still get the global result:
+        - partial_state: compute a small partial state on a chunk (map)
+        - combine_states: combine two partial states (reduce)
+        - finalize: broadcast the combined state onto the rows (single pass)
+    """
+
+    def partial_state(self, input_df: pd.DataFrame) -> Any:
+        """Return the partial state of the aggregate over the input rows"""
+        raise NotImplementedError(
+            "The partial_state method must be implemented in the derived class"
+        )
+
+    def combine_states(self, left: Any, right: Any) -> Any:
+        """Combine two partial states into one"""
+        raise NotImplementedError(
+            "The combine_states method must be implemented in the derived class"
+        )
+
+    def finalize(self, input_df: pd.DataFrame, state: Any) -> pd.DataFrame:
+        """Broadcast the combined state onto the input rows and return the result"""
+        raise NotImplementedError(
+            "The finalize method must be implemented in the derived class"
+        )
+
+    def reduce_states(self, states: List[Any]) -> Any:
+        """Combine the partial states pairwise as a tree, keeping the chunk order."""
+        while len(states) > 1:
+            combined = [
+                self.combine_states(states[i], states[i + 1])
+                for i in range(0, len(states) - 1, 2)
+            ]
+            if len(states) % 2:
+                combined.append(states[-1])
+            states = combined
+        return states[0]
+
+    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block on the whole frame as a single partial state"""
+        return self.finalize(input_df, self.partial_state(input_df))
@@ -1,13 +1,22 @@
+import asyncio
 import logging
+import random
 import time
 import uuid
+from contextvars import Token
+from typing import ClassVar, Dict, List, Optional, Tuple
 
 import pandas as pd
 from pydantic import BaseModel
 
 from src.params_base import BlockParamBase
+from src.utils.cache import BlockCache, get_cache, is_cacheable
 from src.utils.logging import init_logging
-from src.utils.wrapper import log_run_info
+from src.utils.profiling import (profiled, profiled_blocks, reset_profiles,
+                                 write_reports)
+from src.utils.schema import Schema, check_schema, checked_blocks, frame_schema
+from src.utils.tracing import call_depth, enter_call, exit_call
+from src.utils.wrapper import log_run_info, log_run_info_async
 
 
 class BlockBase(BaseModel):
@@ -18,6 +27,13 @@ class BlockBase(BaseModel):
     # Parameters for the block
     params: BlockParamBase = BlockParamBase()
 
+    # Whether every output row depends only on the matching input row, which
+    # allows the block to be fused with other row local blocks (see fused.py)
+    row_local: ClassVar[bool] = False
+    # Whether the result only depends on the input and params, blocks that are
+    # not deterministic must set this to False to opt out of the result cache
+    cacheable: ClassVar[bool] = True
+
     def __init__(self, **data):
         """Initialize the block with the given parameters."""
         # Assign new id to the block and call the super constructor
@@ -28,32 +44,234 @@ class BlockBase(BaseModel):
     @log_run_info
     def __call__(self, input_df: pd.DataFrame) -> pd.DataFrame:
         """Call the block and return the result"""
-        # Initialize the logging
-        init_logging(level=self.params.log_level)
+        blocks, depth_token = self.begin_call()
+        try:
+            return self.execute(input_df)
+        finally:
+            self.end_call(blocks, depth_token)
 
-        # Validate the input data
-        self.validate(input_df=input_df)
+    def execute(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Validate the input and run the block, with the result cache and retries"""
+        self.check_input(input_df)
+
+        # Return the cached result if this block already ran on the same input
+        cache, cache_key = self.cache_lookup(input_df)
+        if cache_key is not None:
+            result = cache.get(cache_key)
+            if result is not None:
+                return result
 
-        # Run the block with any input data
-        num_attempts = self.params.attempts
-        retry_delay = self.params.retry_delay
+        # Only copy the columns the block writes, the rest are shared with the input
+        input_df = self.writable_input(input_df)
 
         # Try to run the block multiple times in case of failure
-        while num_attempts > 0:
+        attempt = 1
+        while True:
             try:
-                result = self.run(input_df=input_df)
+                result = self.run_attempt(input_df)
+                break
+            except Exception as e:
+                self.log_failure(e, attempt)
+            time.sleep(self.params.retry_delay)
+            attempt += 1
+        if cache_key is not None:
+            cache.put(cache_key, result)
+        return result
+
+    @log_run_info_async
+    async def acall(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Asynchronous counterpart of __call__, retries back off without blocking the event loop"""
+        blocks, depth_token = self.begin_call()
+        try:
+            return await self.aexecute(input_df)
+        finally:
+            self.end_call(blocks, depth_token)
+
+    async def aexecute(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Asynchronous counterpart of execute, cancellation is not retried"""
+        self.check_input(input_df)
+
+        # Return the cached result if this block already ran on the same input
+        cache, cache_key = self.cache_lookup(input_df)
+        if cache_key is not None:
+            result = await asyncio.to_thread(cache.get, cache_key)
+            if result is not None:
                 return result
+
+        # Only copy the columns the block writes, the rest are shared with the input
+        input_df = self.writable_input(input_df)
+
+        # Try to run the block multiple times in case of failure
+        attempt = 1
+        while True:
+            try:
+                result = await self.arun_attempt(input_df)
+                break
             except Exception as e:
-                num_attempts -= 1
-                if num_attempts == 0:
-                    logging.info(
-                        f"Failed to run block {self.__class__.__name__} with error: {e}"
-                    )
-                    raise e
-                logging.info(
-                    f"Failed to run block {self.__class__.__name__} with error: {e}. Retrying in {retry_delay} seconds."
-                )
-                time.sleep(retry_delay)
+                self.log_failure(e, attempt)
+            await asyncio.sleep(self.params.retry_delay)
+            attempt += 1
+        if cache_key is not None:
+            await asyncio.to_thread(cache.put, cache_key, result)
+        return result
+
+    def begin_call(self) -> Tuple[List["BlockBase"], Token]:
+        """Set up a call of the block, see end_call.
+
+        Returns:
+            blocks: The profiled blocks whose profiles the call merges when it ends,
+                only the outermost call merges the profiles of the blocks it runs,
+                including the calls made in pool workers (see utils/profiling.py).
+            depth_token: The token of the call depth of the caller.
+        """
+        init_logging(level=self.params.log_level)
+        blocks = profiled_blocks(self) if call_depth() == 0 else []
+        reset_profiles(blocks)
+        return blocks, enter_call()
+
+    def end_call(self, blocks: List["BlockBase"], depth_token: Token) -> None:
+        """Tear down a call of the block set up by begin_call."""
+        exit_call(depth_token)
+        write_reports(blocks)
+
+    def check_input(self, input_df: pd.DataFrame) -> None:
+        """Validate the input, and its columns unless the schema was checked for the run."""
+        self.validate(input_df=input_df)
+        if self.should_validate_columns():
+            self.validate_columns(input_df=input_df)
+
+    def log_failure(self, error: Exception, attempt: int) -> None:
+        """Log a failed attempt, re-raising the error if it was the last one."""
+        block_name = self.__class__.__name__
+        if attempt >= self.params.attempts:
+            logging.info(f"Failed to run block {block_name} with error: {error}")
+            raise error
+        logging.info(
+            f"Failed to run block {block_name} with error: {error}. Retrying in {self.params.retry_delay} seconds."
+        )
+
+    def run_attempt(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block once, under the profilers of params.profile."""
+        if not self.params.profile:
+            return self.run(input_df=input_df)
+        with profiled(self):
+            return self.run(input_df=input_df)
+
+    async def arun_attempt(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block once asynchronously, under the profilers of params.profile.
+
+        The default arun is profiled in its worker thread (see run_attempt), a
+        native coroutine is profiled on the event loop thread, so its cProfile
+        stats include the other tasks the loop runs meanwhile.
+        """
+        if not self.params.profile or type(self).arun is BlockBase.arun:
+            return await self.arun(input_df=input_df)
+        with profiled(self):
+            return await self.arun(input_df=input_df)
+
+    def cache_lookup(
+        self, input_df: pd.DataFrame
+    ) -> Tuple[Optional[BlockCache], Optional[str]]:
+        """Return the result cache and the key for this call, or (None, None) when not
+        cached. A block is only cached if every block nested in it is cacheable."""
+        if self.params.cache_dir is None or not is_cacheable(self):
+            return None, None
+        cache = get_cache(self.params.cache_dir, max_bytes=self.params.cache_max_bytes)
+        return cache, cache.key(self, input_df)
+
+    def read_columns(self) -> Optional[List[str]]:
+        """Return the columns the block reads, None if it may read any column."""
+        return None
+
+    def write_columns(self) -> Optional[List[str]]:
+        """Return the (existing or new) columns the block writes, None if undeclared.
+
+        A block that declares its written columns is run on a frame that shares
+        every other column with the caller's input, only the written columns that
+        already exist are copied. It may then modify those columns in place
+        without copying the whole frame first, but must not modify any other
+        column in place. Blocks that do not declare them copy their input themselves.
+        """
+        return None
+
+    def dedup_column(self) -> Optional[str]:
+        """Return the column of row ids (e.g. row hashes) the block uses to find the
+        duplicate rows of its output, None if it does not deduplicate. Runners that
+        split the input use it to remove the duplicates spanning chunks (see
+        ParallelRunner.dedup), only rows whose values are all equal are dropped.
+        """
+        return None
+
+    def input_schema(self) -> Optional[Schema]:
+        """Return the dtype family (see utils/schema.py) required of every column
+        the block reads, None if undeclared. Defaults to any dtype for the
+        declared read columns."""
+        read_columns = self.read_columns()
+        if read_columns is None:
+            return None
+        return {col: "any" for col in read_columns}
+
+    def output_schema(self, input_schema: Schema) -> Optional[Schema]:
+        """Return the schema of the output for an input with the given schema,
+        None if the block does not know it in advance."""
+        return None
+
+    def check_schema(
+        self, input_schema: Optional[Schema]
+    ) -> Tuple[Dict[str, bool], Optional[Schema]]:
+        """Check the block once against the schema of its input, before it runs.
+
+        Args:
+            input_schema: The schema of the input, None if unknown.
+        Returns:
+            checks: Whether the schema proves the input valid, by id of the block
+                (and of its nested blocks). Runs under schema_checked(checks) skip
+                validate_columns in the calls of the proven blocks.
+            output_schema: The schema of the output, None if unknown.
+        Raises:
+            ValueError: If no input with the schema can be valid.
+        """
+        if input_schema is None:
+            return {self.id: False}, None
+        required = self.input_schema()
+        proven = required is not None and check_schema(
+            required, input_schema, self.__class__.__name__
+        )
+        return {self.id: proven}, self.output_schema(input_schema)
+
+    def should_validate_columns(self) -> bool:
+        """Return whether this call validates the input columns, blocks whose schema
+        was checked only validate a sample of the calls (see params.schema_sample_rate).
+        """
+        if self.id not in checked_blocks():
+            return True
+        return random.random() < self.params.schema_sample_rate
+
+    def validate_columns(self, input_df: pd.DataFrame) -> None:
+        """Validate that the input has the declared read columns, of the declared types."""
+        required = self.input_schema()
+        if required is None:
+            return
+        check_schema(
+            required,
+            frame_schema(input_df, columns=list(required)),
+            self.__class__.__name__,
+        )
+
+    def writable_input(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Return the frame the block may write its declared columns to.
+
+        The frame is a shallow copy of the input, the written columns that exist
+        are replaced by copies so in place writes never reach the caller's frame.
+        """
+        write_columns = self.write_columns()
+        if write_columns is None:
+            return input_df
+        writable_df = input_df.copy(deep=False)
+        for col in write_columns:
+            if col in writable_df.columns:
+                writable_df[col] = input_df[col].copy()
+        return writable_df
 
     def validate(self, input_df: pd.DataFrame) -> None:
         """Validate that all the required parameters are present."""
@@ -65,3 +283,9 @@ class BlockBase(BaseModel):
         raise NotImplementedError(
             "The run method must be implemented in the derived class"
         )
+
+    async def arun(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block asynchronously and return the result, I/O bound blocks should
+        override this with a native coroutine. Defaults to running run in a worker thread.
+        """
+        return await asyncio.to_thread(self.run_attempt, input_df)
@@ -5,4 +5,6 @@
 from src.blocks.prepare.prepare_block import PrepareBlock, PrepareBlockParams
 from src.blocks.simple.average.average_block import (AverageBlock,
                                                      AverageBlockParams)
+from src.blocks.simple.compact.compact_block import (CompactBlock,
+                                                     CompactBlockParams)
 from src.blocks.simple.sum.sum_block import SumBlock, SumBlockParams
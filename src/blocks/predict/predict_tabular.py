@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import Tuple
+from typing import ClassVar, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -45,6 +45,22 @@ class PredictBlock(BlockBase):
 
     params: PredictModelParams
 
+    # Predictions are made row by row, can be fused with other row local blocks
+    row_local: ClassVar[bool] = True
+    # The model file can be retrained in place, so the params do not pin the result
+    cacheable: ClassVar[bool] = False
+
+    def read_columns(self) -> List[str]:
+        """The model features and the target are read"""
+        return self.params.cat_cols + self.params.cont_cols + [self.params.target_col]
+
+    def write_columns(self) -> List[str]:
+        """The categorical features are converted and the predictions are added"""
+        return self.params.cat_cols + [
+            self.params.prediction_col,
+            self.params.difference_col,
+        ]
+
     def load_model(self, input_df: pd.DataFrame) -> nn.Module:
         """
         Load the trained model from the specified path.
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# Format of the first 19 characters of the raw timestamps, e.g. "2010-04-19 08:17:56"
+DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+DATETIME_LENGTH: int = 19
+
+NS_PER_SECOND: int = 10**9
+SECONDS_PER_HOUR: int = 3600
+SECONDS_PER_DAY: int = 86400
+# 1970-01-01 was a Thursday, weekday 3 when Monday is 0
+EPOCH_WEEKDAY: int = 3
+
+# Time of day of every hour
+TIME_OF_DAY_LABELS = ["night", "morning", "afternoon", "evening"]
+TIME_OF_DAY_BY_HOUR = np.repeat(np.arange(4, dtype=np.int8), 6)
+
+AM_OR_PM_LABELS = ["am", "pm"]
+
+# Weekday names from Monday, the categories are sorted by name so the codes
+# match those of pd.Categorical over the names
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+WEEKDAY_LABELS = sorted(WEEKDAY_NAMES)
+WEEKDAY_CODES = np.array(
+    [WEEKDAY_LABELS.index(name) for name in WEEKDAY_NAMES], dtype=np.int8
+)
+
+
+def parse_timestamps(
+    values: pd.Series,
+    datetime_format: str = DATETIME_FORMAT,
+    length: int = DATETIME_LENGTH,
+) -> pd.Series:
+    """Parse the first length characters of every value with an explicit format,
+    parsing each distinct value only once."""
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(
+        pd.Series(uniques).str[:length], format=datetime_format
+    ).to_numpy()
+    timestamps = np.full(len(codes), np.datetime64("NaT"), dtype=parsed.dtype)
+    found = codes >= 0
+    timestamps[found] = parsed[codes[found]]
+    return pd.Series(timestamps, index=values.index, name=values.name)
+
+
+def categorical(codes: np.ndarray, labels: list, missing: np.ndarray, index, **kwargs):
+    """Return a category Series from int codes, missing rows get code -1 (NaN)."""
+    codes = np.where(missing, -1, codes).astype(np.int8)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=labels, **kwargs), index=index
+    )
+
+
+def calendar_features(timestamps: pd.Series) -> pd.DataFrame:
+    """Return the hour, time of day, am / pm and weekday of every timestamp.
+
+    The features are computed with integer arithmetic on the epoch seconds and
+    lookup tables. The hour is an int8 column (float if there are missing
+    timestamps), the others are category columns.
+    """
+    missing = timestamps.isna().to_numpy()
+    seconds = timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    seconds = np.where(missing, 0, seconds) // NS_PER_SECOND
+
+    hours = ((seconds // SECONDS_PER_HOUR) % 24).astype(np.int8)
+    weekdays = ((seconds // SECONDS_PER_DAY + EPOCH_WEEKDAY) % 7).astype(np.int8)
+
+    index = timestamps.index
+    hour = pd.Series(hours, index=index)
+    if missing.any():
+        hour = hour.astype(float).mask(missing)
+    return pd.DataFrame(
+        {
+            "hour": hour,
+            "time_of_day": categorical(
+                TIME_OF_DAY_BY_HOUR[hours],
+                TIME_OF_DAY_LABELS,
+                missing,
+                index,
+                ordered=True,
+            ),
+            "am_or_pm": categorical(
+                (hours >= 12).astype(np.int8), AM_OR_PM_LABELS, missing, index
+            ),
+            "weekday": categorical(
+                WEEKDAY_CODES[weekdays], WEEKDAY_LABELS, missing, index
+            ),
+        },
+        index=index,
+    )
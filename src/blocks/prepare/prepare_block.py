@@ -1,13 +1,13 @@
-import hashlib
 import time
+from typing import List
 
 import pandas as pd
 from typing_extensions import override
 
 from src.block_base import BlockBase
+from src.blocks.prepare.row_hash import row_ids
 from src.params_base import BlockParamBase
-
-HASH_LENGTH: int = 16
+from src.utils.dedup import duplicated_rows
 
 
 def to_snake_case(s: str) -> str:
@@ -15,12 +15,6 @@ def to_snake_case(s: str) -> str:
     return "".join(["_" + c.lower() if c.isupper() else c for c in s]).lstrip("_")
 
 
-def hash_row_values(row: pd.Series) -> str:
-    """Hashes the values of a DataFrame row using SHA-256 and returns the hash as a hex string."""
-    hash_val = hashlib.sha256("".join(str(row.values)).encode()).hexdigest()
-    return hash_val[:HASH_LENGTH]
-
-
 def convert_columns_to_snake_case(df: pd.DataFrame) -> pd.DataFrame:
     """Converts all column names of a DataFrame to snake_case."""
     df.columns = [to_snake_case(col) for col in df.columns]
@@ -30,7 +24,11 @@ def convert_columns_to_snake_case(df: pd.DataFrame) -> pd.DataFrame:
 class PrepareBlockParams(BlockParamBase):
     """Parameters for the PrepareBlock."""
 
+    # Column identifying a row, generated by hashing the row values if missing.
+    # Rows are only duplicates if all their values are equal, the id included
     id_col: str = "id"
+    # Render the generated uint64 row ids as 16 character hex strings
+    hex_ids: bool = False
 
 
 class PrepareBlock(BlockBase):
@@ -38,6 +36,16 @@ class PrepareBlock(BlockBase):
 
     params: PrepareBlockParams = PrepareBlockParams()
 
+    @override
+    def write_columns(self) -> List[str]:
+        """The id column is added, every other column is only renamed"""
+        return [self.params.id_col]
+
+    @override
+    def dedup_column(self) -> str:
+        """Rows are deduplicated on their id and values"""
+        return self.params.id_col
+
     @override
     def validate(self, input_df: pd.DataFrame) -> None:
         """Validate that the input dataframe is not empty"""
@@ -47,15 +55,17 @@ class PrepareBlock(BlockBase):
     @override
     def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
         """Run the block and return the result"""
-        # Convert column names to snake_case and hash each row
-        output_df = convert_columns_to_snake_case(input_df.copy())
+        # Convert column names to snake_case
+        output_df = convert_columns_to_snake_case(input_df)
 
-        # If ID_COL does not exist, add it
+        # If ID_COL does not exist, add it by hashing the values of every row
         if self.params.id_col not in output_df.columns:
-            output_df[self.params.id_col] = output_df.apply(hash_row_values, axis=1)
+            output_df[self.params.id_col] = row_ids(
+                output_df, hex_ids=self.params.hex_ids
+            )
 
-        # Delete duplicate rows
-        output_df.drop_duplicates(inplace=True)
+        # Delete duplicate rows, only comparing every column of the rows sharing an id
+        output_df = output_df[~duplicated_rows(output_df, self.params.id_col)]
 
         # Reorder cols to put ID_COL first
         cols = output_df.columns.tolist()
@@ -1,4 +1,4 @@
-import hashlib
+from typing import List
 
 import numpy as np
 import pandas as pd
@@ -6,9 +6,19 @@ from rich import print
 from typing_extensions import override
 
 from src.block_base import BlockBase
+from src.blocks.prepare.calendar_features import (calendar_features,
+                                                  parse_timestamps)
+from src.blocks.prepare.geospatial import SPATIAL_FEATURES, spatial_features
+from src.blocks.prepare.row_hash import row_ids
 from src.params_base import BlockParamBase
+from src.utils.dedup import duplicated_rows
 
-HASH_LENGTH: int = 16
+# Column of every spatial feature
+SPATIAL_COLUMNS = {
+    "haversine": "dist_km",
+    "bearing": "bearing_deg",
+    "manhattan": "manhattan_km",
+}
 
 
 def to_snake_case(s: str) -> str:
@@ -16,44 +26,25 @@ def to_snake_case(s: str) -> str:
     return "".join(["_" + c.lower() if c.isupper() else c for c in s]).lstrip("_")
 
 
-def hash_row_values(row: pd.Series) -> str:
-    """Hashes the values of a DataFrame row using SHA-256 and returns the hash as a hex string."""
-    hash_val = hashlib.sha256("".join(str(row.values)).encode()).hexdigest()
-    return hash_val[:HASH_LENGTH]
-
-
 def convert_columns_to_snake_case(df: pd.DataFrame) -> pd.DataFrame:
     """Converts all column names of a DataFrame to snake_case."""
     df.columns = [to_snake_case(col) for col in df.columns]
     return df
 
 
-def haversine_distance(df, lat1, long1, lat2, long2):
-    """
-    Calculates the haversine distance between 2 sets of GPS coordinates in df
-    """
-    r = 6371  # average radius of Earth in kilometers
-
-    phi1 = np.radians(df[lat1])
-    phi2 = np.radians(df[lat2])
-
-    delta_phi = np.radians(df[lat2] - df[lat1])
-    delta_lambda = np.radians(df[long2] - df[long1])
-
-    a = (
-        np.sin(delta_phi / 2) ** 2
-        + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
-    )
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-    d = r * c  # in kilometers
-
-    return d
-
-
 class PrepareTaxiBlockParams(BlockParamBase):
     """Parameters for the PrepareBlock."""
 
+    # Column identifying a row, generated by hashing the row values if missing.
+    # Rows are only duplicates if all their values are equal, the id included
     id_col: str = "id"
+    # Render the generated uint64 row ids as 16 character hex strings
+    hex_ids: bool = False
+
+    # Spatial features between the pickup and dropoff points, see SPATIAL_FEATURES
+    spatial_features: List[str] = ["haversine"]
+    # Compute the spatial features in single precision
+    float32_spatial: bool = False
 
 
 class PrepareTaxiBlock(BlockBase):
@@ -61,50 +52,69 @@ class PrepareTaxiBlock(BlockBase):
 
     params: PrepareTaxiBlockParams = PrepareTaxiBlockParams()
 
+    @override
+    def write_columns(self) -> List[str]:
+        """The id and the derived time and distance columns are added"""
+        return [
+            self.params.id_col,
+            "edt_date",
+            "hour",
+            "time_of_day",
+            "am_or_pm",
+            "weekday",
+        ] + [SPATIAL_COLUMNS[feature] for feature in self.params.spatial_features]
+
+    @override
+    def dedup_column(self) -> str:
+        """Rows are deduplicated on their id and values"""
+        return self.params.id_col
+
     @override
     def validate(self, input_df: pd.DataFrame) -> None:
         """Validate that the input dataframe is not empty"""
         if input_df.empty:
             raise ValueError("Input dataframe must not be empty")
+        unknown = set(self.params.spatial_features) - set(SPATIAL_FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown spatial features {sorted(unknown)}")
 
     def _prepare_taxi_data(self, input_df: pd.DataFrame) -> pd.DataFrame:
         """Prepare the taxi data for analysis"""
-        # Convert the pickup_datetime column to a datetime object
-        input_df["edt_date"] = pd.to_datetime(
-            input_df["pickup_datetime"].str[:19]
+        # Convert the pickup_datetime column to a datetime object, parsing each
+        # distinct timestamp once with an explicit format
+        input_df["edt_date"] = parse_timestamps(
+            input_df["pickup_datetime"]
         ) - pd.Timedelta(hours=4)
 
-        # Extract useful features from the datetime object
-        input_df["hour"] = input_df["edt_date"].dt.hour
-
-        # Granular break down of "morning" "midday" "afternoon" "evening" "night"
-        input_df["time_of_day"] = pd.cut(
-            input_df["hour"],
-            bins=[0, 6, 12, 18, 24],
-            labels=["night", "morning", "afternoon", "evening"],
-            right=False,
-        )
-        input_df["am_or_pm"] = np.where(input_df["hour"] < 12, "am", "pm")
-        input_df.loc[:, "am_or_pm"] = np.where(input_df["hour"] < 12, "am", "pm")
-        input_df["weekday"] = input_df["edt_date"].dt.strftime("%a")
-
-        # Calculate the haversine distance between the pickup and dropoff locations
-        input_df["dist_km"] = haversine_distance(
-            input_df,
-            "pickup_latitude",
-            "pickup_longitude",
-            "dropoff_latitude",
-            "dropoff_longitude",
+        # Extract the hour, "night" / "morning" / "afternoon" / "evening", am / pm
+        # and weekday as small int and category columns
+        features = calendar_features(input_df["edt_date"])
+        for col in ["hour", "time_of_day", "am_or_pm", "weekday"]:
+            input_df[col] = features[col]
+
+        # Calculate the distance and other spatial features between the pickup and
+        # dropoff locations in a single pass over the coordinates
+        features = spatial_features(
+            input_df["pickup_latitude"],
+            input_df["pickup_longitude"],
+            input_df["dropoff_latitude"],
+            input_df["dropoff_longitude"],
+            features=self.params.spatial_features,
+            dtype=np.float32 if self.params.float32_spatial else np.float64,
         )
+        for feature, values in features.items():
+            input_df[SPATIAL_COLUMNS[feature]] = values
         return input_df
 
     def standard_prepare(self, input_df: pd.DataFrame) -> pd.DataFrame:
-        # If ID_COL does not exist, add it
+        # If ID_COL does not exist, add it by hashing the values of every row
         if self.params.id_col not in input_df.columns:
-            input_df[self.params.id_col] = input_df.apply(hash_row_values, axis=1)
+            input_df[self.params.id_col] = row_ids(
+                input_df, hex_ids=self.params.hex_ids
+            )
 
-        # Delete duplicate rows
-        input_df.drop_duplicates(inplace=True)
+        # Delete duplicate rows, only comparing every column of the rows sharing an id
+        input_df = input_df[~duplicated_rows(input_df, self.params.id_col)]
 
         # Reorder cols to put ID_COL first
         cols = input_df.columns.tolist()
@@ -121,7 +131,7 @@ class PrepareTaxiBlock(BlockBase):
         # Prepare the taxi data
         input_df = self._prepare_taxi_data(input_df)
 
-        # Convert column names to snake_case and hash each row
-        input_df = convert_columns_to_snake_case(input_df.copy())
+        # Convert column names to snake_case
+        input_df = convert_columns_to_snake_case(input_df)
 
         return input_df
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Number of hex characters of a rendered row id
+HASH_LENGTH: int = 16
+
+# Constants of the column fold and of the splitmix64 finalizer
+FOLD_PRIME = np.uint64(0x100000001B3)
+MIX_MULTIPLIER_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_MULTIPLIER_2 = np.uint64(0x94D049BB133111EB)
+
+# Two character hex rendering of every byte value
+HEX_TABLE = np.array([f"{i:02x}".encode() for i in range(256)], dtype="S2")
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    """Apply the splitmix64 finalizer to every uint64 value."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * MIX_MULTIPLIER_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * MIX_MULTIPLIER_2
+    return values ^ (values >> np.uint64(31))
+
+
+def hash_rows(input_df: pd.DataFrame) -> np.ndarray:
+    """Return a uint64 hash of the values of every row, computed a column at a time.
+
+    Algorithm:
+        1. Every column is hashed with pandas.util.hash_pandas_object (index
+           excluded, default hash key), which hashes each value by its type:
+           SipHash-2-4 of object / string values and a bit mix of the raw bytes
+           of numeric and datetime values. Categoricals hash by value.
+        2. The column hashes are folded from left to right, starting from the
+           number of columns: h = mix64(h * 0x100000001B3 + column_hash), where
+           mix64 is the splitmix64 finalizer. All arithmetic wraps at 64 bits.
+
+    The hash of a row only depends on its values, their dtypes and the column
+    order, so equal rows get equal ids in every chunk and every run.
+    """
+    hashes = np.full(len(input_df), len(input_df.columns), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i in range(len(input_df.columns)):
+            column_hash = pd.util.hash_pandas_object(
+                input_df.iloc[:, i], index=False
+            ).to_numpy()
+            hashes = mix64(hashes * FOLD_PRIME + column_hash)
+    return hashes
+
+
+def row_ids_to_hex(ids: pd.Series) -> pd.Series:
+    """Render uint64 row ids as 16 character hex strings, for display or export."""
+    row_bytes = ids.to_numpy(dtype=np.uint64).astype(">u8").view(np.uint8)
+    hex_pairs = HEX_TABLE[row_bytes.reshape(-1, 8)]
+    hex_ids = np.ascontiguousarray(hex_pairs).view(f"S{HASH_LENGTH}").ravel()
+    return pd.Series(hex_ids.astype(str), index=ids.index, name=ids.name)
+
+
+def row_ids(input_df: pd.DataFrame, hex_ids: bool = False) -> pd.Series:
+    """Return the row id column of the frame, uint64 unless rendered as hex."""
+    ids = pd.Series(hash_rows(input_df), index=input_df.index)
+    return row_ids_to_hex(ids) if hex_ids else ids
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from src.blocks.prepare.geospatial import (bearing, haversine, manhattan,
+                                           spatial_features)
+from src.blocks.prepare.prepare_taxi import (PrepareTaxiBlock,
+                                             PrepareTaxiBlockParams)
+from src.blocks.prepare.tests.test_prepare_taxi import TEST_DATA
+
+# Define test data
+rng = np.random.default_rng(0)
+LAT1, LON1, LAT2, LON2 = (
+    rng.uniform(40.5, 41.0, 1000),
+    rng.uniform(-74.1, -73.7, 1000),
+    rng.uniform(40.5, 41.0, 1000),
+    rng.uniform(-74.1, -73.7, 1000),
+)
+
+
+def reference_haversine(lat1, lon1, lat2, lon2):
+    """Haversine distance computed the way PrepareTaxiBlock used to compute it"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    delta_phi = np.radians(lat2 - lat1)
+    delta_lambda = np.radians(lon2 - lon1)
+    a = (
+        np.sin(delta_phi / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    )
+    return 6371 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+####################################################################################################
+# The following tests are for the geospatial kernels                                               #
+####################################################################################################
+
+
+def test_haversine_matches_reference():
+    result = haversine(LAT1, LON1, LAT2, LON2)
+    assert result.dtype == np.float64
+    np.testing.assert_allclose(
+        result, reference_haversine(LAT1, LON1, LAT2, LON2), rtol=1e-12
+    )
+
+
+def test_float32():
+    result = haversine(LAT1, LON1, LAT2, LON2, dtype=np.float32)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(
+        result, reference_haversine(LAT1, LON1, LAT2, LON2), rtol=1e-3, atol=1e-3
+    )
+
+
+def test_chunks_match_single_pass():
+    single = spatial_features(LAT1, LON1, LAT2, LON2, ["haversine", "bearing"])
+    chunked = spatial_features(
+        LAT1, LON1, LAT2, LON2, ["haversine", "bearing"], chunk_size=7
+    )
+    for feature in single:
+        np.testing.assert_array_equal(single[feature], chunked[feature])
+
+
+def test_bearing():
+    # North, east, south and west of the origin
+    result = bearing([0, 0, 0, 0], [0, 0, 0, 0], [1, 0, -1, 0], [0, 1, 0, -1])
+    np.testing.assert_allclose(result, [0, 90, 180, 270], atol=1e-9)
+
+
+def test_manhattan():
+    # Along a meridian both distances agree, otherwise the grid distance is longer
+    np.testing.assert_allclose(
+        manhattan([40, 41], [-74, -74], [41, 40], [-74, -74]),
+        haversine([40, 41], [-74, -74], [41, 40], [-74, -74]),
+    )
+    assert (
+        manhattan(LAT1, LON1, LAT2, LON2) >= haversine(LAT1, LON1, LAT2, LON2)
+    ).all()
+
+
+def test_empty_and_unknown_features():
+    assert haversine([], [], [], []).shape == (0,)
+    with pytest.raises(ValueError):
+        spatial_features(LAT1, LON1, LAT2, LON2, ["euclidean"])
+
+
+####################################################################################################
+# The following tests are for the spatial features of PrepareTaxiBlock                             #
+####################################################################################################
+
+
+def test_prepare_taxi_spatial_features():
+    block = PrepareTaxiBlock(
+        params=PrepareTaxiBlockParams(
+            spatial_features=["haversine", "bearing", "manhattan"],
+            float32_spatial=True,
+        )
+    )
+    result = block(TEST_DATA)
+    for col in ["dist_km", "bearing_deg", "manhattan_km"]:
+        assert result[col].dtype == np.float32
+    np.testing.assert_allclose(
+        result["dist_km"],
+        reference_haversine(
+            TEST_DATA["pickup_latitude"],
+            TEST_DATA["pickup_longitude"],
+            TEST_DATA["dropoff_latitude"],
+            TEST_DATA["dropoff_longitude"],
+        ),
+        rtol=1e-4,
+    )
+
+    with pytest.raises(ValueError):
+        PrepareTaxiBlock(params=PrepareTaxiBlockParams(spatial_features=["x"]))(
+            TEST_DATA
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
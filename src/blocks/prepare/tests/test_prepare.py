@@ -1,9 +1,8 @@
-import hashlib
-
 import pandas as pd
 import pytest
 
-from src.blocks.prepare.prepare_block import PrepareBlock
+from src.blocks.prepare.prepare_block import PrepareBlock, PrepareBlockParams
+from src.blocks.prepare.row_hash import row_ids
 from src.runners.parallel_runner import ParallelRunner
 from src.runners.sequential_runner import SequentialRunner
 
@@ -19,9 +18,7 @@ TEST_DATA: pd.DataFrame = pd.DataFrame(
 # Expected output
 TEST_RESULT: pd.DataFrame = TEST_DATA.copy()
 TEST_RESULT.columns = ["column_a", "column_b", "column_c"]
-TEST_RESULT["id"] = TEST_RESULT.apply(
-    lambda row: hashlib.sha256("".join(str(row.values)).encode()).hexdigest(), axis=1
-)
+TEST_RESULT["id"] = row_ids(TEST_RESULT)
 
 ####################################################################################################
 # The following tests are for the PrepareBlock class                                                 #
@@ -41,6 +38,26 @@ def test_run_alone():
     assert result["id"].is_unique
 
 
+def test_row_ids():
+    result = PrepareBlock()(TEST_DATA)
+    assert result["id"].dtype == "uint64"
+    assert result.set_index("id").equals(TEST_RESULT.set_index("id"))
+
+    # Optionally rendered as 16 character hex strings
+    result = PrepareBlock(params=PrepareBlockParams(hex_ids=True))(TEST_DATA)
+    assert list(result["id"]) == [f"{row_id:016x}" for row_id in TEST_RESULT["id"]]
+
+
+def test_run_does_not_modify_input():
+    input_df = TEST_DATA.copy()
+    result = PrepareBlock()(input_df)
+
+    # The caller's frame keeps its columns, the block only added to its own frame
+    assert input_df.equals(TEST_DATA)
+    assert list(input_df.columns) == ["ColumnA", "ColumnB", "ColumnC"]
+    assert "id" in result.columns
+
+
 ####################################################################################################
 # The following tests are for the ParallelRunner and SequentialRunner classes                      #
 ####################################################################################################
@@ -97,6 +114,44 @@ def test_run_parallel_chunk_size(chunk_size, use_process_pool, use_thread_pool):
     )
     assert result["id"].is_unique
 
+    # Row ids only depend on the row, not on the chunk it was hashed in
+    assert result["id"].equals(PrepareBlock()(TEST_DATA)["id"])
+
+
+@pytest.mark.parametrize(
+    "use_process_pool, use_thread_pool", [(True, False), (False, True)]
+)
+def test_run_parallel_global_dedup(use_process_pool, use_thread_pool):
+    # Every row appears three times, in different chunks
+    input_df = pd.concat([TEST_DATA] * 3, ignore_index=True)
+    parallel_runner = ParallelRunner(
+        block=PrepareBlock(),
+        chunk_size=2,
+        use_process_pool=use_process_pool,
+        use_thread_pool=use_thread_pool,
+    )
+    result = parallel_runner(input_df)
+
+    # The duplicates spanning chunks are removed, as when run on the whole frame
+    assert result.equals(PrepareBlock()(input_df))
+    assert len(result) == 3
+
+    # Without global dedup only the duplicates within a chunk are removed, none here
+    result = parallel_runner.model_copy(update={"global_dedup": False})(input_df)
+    assert len(result) == 9
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2])
+def test_supplied_ids_are_not_deduplicated(chunk_size):
+    # Distinct rows sharing a supplied id are kept, equal rows are dropped
+    input_df = pd.DataFrame({"id": [1, 1, 2, 1], "v": [10, 20, 30, 10]})
+    block = PrepareBlock()
+    if chunk_size is not None:
+        block = ParallelRunner(block=block, chunk_size=chunk_size, use_thread_pool=True)
+    result = block(input_df)
+    assert list(result["id"]) == [1, 1, 2]
+    assert list(result["v"]) == [10, 20, 30]
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
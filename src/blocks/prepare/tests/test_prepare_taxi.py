@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.blocks.prepare.calendar_features import (calendar_features,
+                                                  parse_timestamps)
+from src.blocks.prepare.prepare_taxi import PrepareTaxiBlock
+
+# Define test data
+TEST_DATA: pd.DataFrame = pd.DataFrame(
+    {
+        "key": ["a", "b", "c", "d", "e"],
+        "fare_amount": [4.5, 16.9, 5.7, 7.7, 5.3],
+        "pickup_datetime": [
+            "2009-06-15 17:26:21 UTC",
+            "2010-01-05 16:52:16 UTC",
+            "2011-08-18 00:35:00 UTC",
+            "2012-04-21 04:30:42 UTC",
+            "2010-01-05 16:52:16 UTC",
+        ],
+        "pickup_longitude": [-73.844311, -74.016048, -73.982738, -73.98713, -73.968095],
+        "pickup_latitude": [40.721319, 40.711303, 40.76127, 40.733143, 40.768008],
+        "dropoff_longitude": [
+            -73.84161,
+            -73.979268,
+            -73.991242,
+            -73.991567,
+            -73.956655,
+        ],
+        "dropoff_latitude": [40.712278, 40.782004, 40.750562, 40.758092, 40.783762],
+        "passenger_count": [1, 1, 2, 1, 1],
+    }
+)
+
+
+def expected_features(timestamps: pd.Series) -> pd.DataFrame:
+    """Calendar features computed the way the block used to compute them"""
+    hour = timestamps.dt.hour
+    return pd.DataFrame(
+        {
+            "hour": hour,
+            "time_of_day": pd.cut(
+                hour,
+                bins=[0, 6, 12, 18, 24],
+                labels=["night", "morning", "afternoon", "evening"],
+                right=False,
+            ),
+            "am_or_pm": np.where(hour < 12, "am", "pm"),
+            "weekday": timestamps.dt.strftime("%a"),
+        }
+    )
+
+
+####################################################################################################
+# The following tests are for the calendar feature helpers                                         #
+####################################################################################################
+
+
+def test_parse_timestamps():
+    result = parse_timestamps(TEST_DATA["pickup_datetime"])
+    expected = pd.to_datetime(TEST_DATA["pickup_datetime"].str[:19])
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_parse_timestamps_missing():
+    values = pd.Series(["2012-04-21 04:30:42 UTC", None], index=[3, 7])
+    result = parse_timestamps(values)
+    assert list(result.index) == [3, 7]
+    assert result[3] == pd.Timestamp("2012-04-21 04:30:42")
+    assert pd.isna(result[7])
+
+
+def test_calendar_features_every_hour():
+    # Every hour of two weeks, starting before the epoch
+    timestamps = pd.Series(
+        pd.date_range("1969-12-25", periods=24 * 14, freq="h") + pd.Timedelta(minutes=7)
+    )
+    result = calendar_features(timestamps)
+    expected = expected_features(timestamps)
+
+    assert result["hour"].dtype == np.int8
+    assert list(result["hour"]) == list(expected["hour"])
+    for col in ["time_of_day", "am_or_pm", "weekday"]:
+        assert isinstance(result[col].dtype, pd.CategoricalDtype)
+        assert list(result[col].astype(str)) == list(expected[col].astype(str))
+    assert result["time_of_day"].cat.ordered
+
+
+def test_calendar_features_fixed_categories():
+    # Chunks share the same categories, so their codes agree
+    first = calendar_features(pd.Series(pd.to_datetime(["2010-01-04 01:00:00"])))
+    second = calendar_features(pd.Series(pd.to_datetime(["2010-01-09 13:00:00"])))
+    for col in ["time_of_day", "am_or_pm", "weekday"]:
+        assert list(first[col].cat.categories) == list(second[col].cat.categories)
+    # Weekdays are sorted by name, as pd.Categorical would sort them
+    assert list(first["weekday"].cat.categories) == sorted(
+        ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    )
+
+
+def test_calendar_features_missing():
+    timestamps = pd.Series(pd.to_datetime(["2010-01-04 13:00:00", None]))
+    result = calendar_features(timestamps)
+    assert result["hour"].iloc[0] == 13
+    assert result.iloc[1].isna().all()
+
+
+####################################################################################################
+# The following tests are for the PrepareTaxiBlock class                                           #
+####################################################################################################
+
+
+def test_prepare_taxi():
+    result = PrepareTaxiBlock()(TEST_DATA)
+
+    # The duplicate pickup time is a different row, so every row is kept
+    assert len(result) == len(TEST_DATA)
+    edt_date = pd.to_datetime(TEST_DATA["pickup_datetime"].str[:19]) - pd.Timedelta(
+        hours=4
+    )
+    assert list(result["edt_date"]) == list(edt_date)
+
+    expected = expected_features(edt_date)
+    assert list(result["hour"]) == list(expected["hour"])
+    for col in ["time_of_day", "am_or_pm", "weekday"]:
+        assert list(result[col].astype(str)) == list(expected[col].astype(str))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,11 +1,12 @@
-from typing import Dict
+from typing import Dict, List, Tuple
 
 import pandas as pd
 from pydantic import field_validator
 from typing_extensions import override
 
-from src.block_base import BlockBase
+from src.aggregate_base import AggregateBlockBase
 from src.params_base import BlockParamBase
+from src.utils.schema import Schema
 
 
 class AverageBlockParams(BlockParamBase):
@@ -26,40 +27,61 @@ class AverageBlockParams(BlockParamBase):
         return value
 
 
-class AverageBlock(BlockBase):
+class AverageBlock(AggregateBlockBase):
 
     params: AverageBlockParams
 
     @override
-    def validate(self, input_df: pd.DataFrame) -> None:
-        """Validate that all the required parameters are present.
-        and that the columns specified are present in the dataframe
-        """
-        col_keys = list(self.params.column_mapping.keys())
-        col_types = [input_df[col].dtype for col in col_keys]
-
-        # General Validation
-        if not isinstance(self.params, AverageBlockParams):
-            raise ValueError("params must be of type AverageBlockParams")
-        if not isinstance(self.params.column_mapping, Dict):
-            raise ValueError("columns must be a Dict")
-        if len(col_keys) == 0:
-            raise ValueError("columns must be non-empty")
+    def read_columns(self) -> List[str]:
+        """The averaged columns are read"""
+        return list(self.params.column_mapping.keys())
+
+    @override
+    def write_columns(self) -> List[str]:
+        """The average columns are written"""
+        return list(self.params.column_mapping.values())
+
+    @override
+    def input_schema(self) -> Schema:
+        """The averaged columns must be numeric"""
+        return {col: "numeric" for col in self.params.column_mapping}
 
-        # Input Validation
-        if not all([col in input_df.columns for col in col_keys]):
-            raise ValueError("columns must be present in the dataframe")
-        if not all([col_type in [int, float] for col_type in col_types]):
-            raise ValueError(f"columns must be of type int / float, were {col_types}")
+    @override
+    def output_schema(self, input_schema: Schema) -> Schema:
+        """The average columns are added as floats"""
+        return {
+            **input_schema,
+            **{avg_col: "float" for avg_col in self.params.column_mapping.values()},
+        }
+
+    @override
+    def partial_state(self, input_df: pd.DataFrame) -> Dict[str, Tuple[float, int]]:
+        """Return the (sum, count) of the non null values of each column"""
+        return {
+            original_col: (input_df[original_col].sum(), input_df[original_col].count())
+            for original_col in self.params.column_mapping
+        }
+
+    @override
+    def combine_states(
+        self,
+        left: Dict[str, Tuple[float, int]],
+        right: Dict[str, Tuple[float, int]],
+    ) -> Dict[str, Tuple[float, int]]:
+        """Add up the sums and counts of each column"""
+        return {
+            col: (left[col][0] + right[col][0], left[col][1] + right[col][1])
+            for col in left
+        }
 
     @override
-    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
-        """Run the block and return the result"""
-        # Average each column and output a new dataframe with N new columns
-        # where N is the number of columns in the input dataframe
-        return input_df.assign(
-            **{
-                avg_col: input_df[original_col].mean()
-                for original_col, avg_col in self.params.column_mapping.items()
-            }
-        )
+    def finalize(
+        self, input_df: pd.DataFrame, state: Dict[str, Tuple[float, int]]
+    ) -> pd.DataFrame:
+        """Average each column and output a new dataframe with N new columns
+        where N is the number of columns in the input dataframe"""
+        result_df = self.writable_input(input_df)
+        for original_col, avg_col in self.params.column_mapping.items():
+            total, count = state[original_col]
+            result_df[avg_col] = total / count if count else float("nan")
+        return result_df
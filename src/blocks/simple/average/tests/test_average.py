@@ -118,6 +118,9 @@ def test_run_parallel_chunk_size(
     original_cols.append("a_avg")
     assert original_cols == list(result.columns)
 
+    # check the average is global, not per chunk
+    assert result["a_avg"].equals(expected_result["a_avg"])
+
 
 @pytest.mark.parametrize(
     "num_chunks, expected_result, use_process_pool, use_thread_pool",
@@ -160,6 +163,9 @@ def test_run_parallel_num_chunks(
     original_cols.append("a_avg")
     assert original_cols == list(result.columns)
 
+    # check the average is global, not per chunk
+    assert result["a_avg"].equals(expected_result["a_avg"])
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
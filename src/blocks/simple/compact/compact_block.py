@@ -0,0 +1,159 @@
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from typing_extensions import override
+
+from src.block_base import BlockBase
+from src.params_base import BlockParamBase
+
+# Columns of the report of a compaction
+REPORT_COLUMNS: List[str] = [
+    "column",
+    "dtype_before",
+    "dtype_after",
+    "bytes_before",
+    "bytes_after",
+    "bytes_saved",
+]
+
+
+def compact_column(
+    column: pd.Series,
+    max_category_ratio: float = 0.5,
+    float32: bool = False,
+    integers: bool = True,
+    categories: bool = True,
+) -> pd.Series:
+    """Return the column in the smallest dtype that keeps every value.
+
+    If integers is set, integers are downcast to the smallest (unsigned if they
+    were) integer type holding their range. Floats are downcast to float32 if
+    every value survives the round trip, or always if float32 is set. If
+    categories is set, string columns with at most max_category_ratio distinct
+    values per row become categoricals.
+    """
+    dtype = column.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+        # Booleans are already one byte, extension dtypes are left alone
+        return column
+    if dtype.kind in "iu":
+        if not integers:
+            return column
+        downcast = pd.to_numeric(
+            column, downcast="unsigned" if dtype.kind == "u" else "integer"
+        )
+        return column if downcast.dtype == dtype else downcast
+    if dtype.kind == "f" and dtype.itemsize > 4:
+        downcast = column.astype(np.float32)
+        if float32 or np.array_equal(
+            downcast.to_numpy(dtype=dtype), column.to_numpy(), equal_nan=True
+        ):
+            return downcast
+        return column
+    if dtype.kind == "O" and categories and len(column) > 0:
+        if pd.api.types.infer_dtype(column, skipna=True) != "string":
+            return column
+        if column.nunique() <= max_category_ratio * len(column):
+            return column.astype("category")
+    return column
+
+
+def compact_frame(
+    input_df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    max_category_ratio: float = 0.5,
+    float32: bool = False,
+    integers: bool = True,
+    categories: bool = True,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return the frame with compacted columns and a report of the bytes saved per column.
+
+    The input is not modified, the columns that are not compacted are shared with it.
+    """
+    result_df = input_df.copy(deep=False)
+    report = []
+    for col in input_df.columns if columns is None else columns:
+        before = input_df[col]
+        after = compact_column(
+            before, max_category_ratio, float32, integers, categories
+        )
+        bytes_before = before.memory_usage(index=False, deep=True)
+        bytes_after = bytes_before
+        if after is not before:
+            result_df[col] = after
+            bytes_after = after.memory_usage(index=False, deep=True)
+        report.append(
+            [
+                col,
+                str(before.dtype),
+                str(after.dtype),
+                bytes_before,
+                bytes_after,
+                bytes_before - bytes_after,
+            ]
+        )
+    return result_df, pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+
+class CompactBlockParams(BlockParamBase):
+    """Parameters for the CompactBlock."""
+
+    # Columns to compact, None compacts every column
+    columns: Optional[List[str]] = None
+    # Strings become categoricals if they have at most this many distinct values per row
+    max_category_ratio: float = 0.5
+    # Downcast every float64 column to float32, even if values lose precision
+    float32: bool = False
+    # Downcast integers to the smallest type holding their current range
+    integers: bool = True
+    # Turn string columns with few distinct values into categoricals
+    categories: bool = True
+
+
+class CompactBlock(BlockBase):
+    """Shrink the frame by downcasting numerics and turning repeated strings into categoricals.
+
+    Later blocks then move less data, but arithmetic on a downcast integer column
+    wraps at its new width, so later blocks must widen it before growing its
+    values past their current range (or set integers to False). Assigning a
+    value that is not a category of a categorical column (e.g. a new or
+    concatenated string) fails or yields NaN, so set categories to False if
+    later blocks do. Call compact to get the bytes saved per column along with
+    the frame.
+    """
+
+    params: CompactBlockParams = CompactBlockParams()
+
+    @override
+    def read_columns(self) -> Optional[List[str]]:
+        """The compacted columns are read"""
+        return self.params.columns
+
+    @override
+    def validate(self, input_df: pd.DataFrame) -> None:
+        """Validate that the ratio is a fraction"""
+        super().validate(input_df)
+        if not 0 <= self.params.max_category_ratio <= 1:
+            raise ValueError("max_category_ratio must be between 0 and 1")
+
+    def compact(self, input_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Return the compacted frame and its report, see REPORT_COLUMNS"""
+        result_df, report = compact_frame(
+            input_df,
+            columns=self.params.columns,
+            max_category_ratio=self.params.max_category_ratio,
+            float32=self.params.float32,
+            integers=self.params.integers,
+            categories=self.params.categories,
+        )
+        logging.debug(
+            f"Compacted {report['bytes_before'].sum()} bytes into {report['bytes_after'].sum()} bytes"
+        )
+        return result_df, report
+
+    @override
+    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block and return the compacted frame"""
+        return self.compact(input_df)[0]
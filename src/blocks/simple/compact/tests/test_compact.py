@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.blocks.simple.compact.compact_block import (CompactBlock,
+                                                     CompactBlockParams,
+                                                     compact_column)
+
+# Define test data
+TEST_DATA: pd.DataFrame = pd.DataFrame(
+    {
+        "passenger_count": np.array([1, 2, 1, 6, 1, 3], dtype=np.int64),
+        "id": np.array([0, 2**40, 7, 9, 11, 13], dtype=np.uint64),
+        "fare_amount": [4.5, 16.5, 5.25, 7.75, 5.5, 4.0],
+        "pickup_latitude": [40.721319, 40.711303, 40.76127, 40.733143, 40.7, 40.8],
+        "am_or_pm": ["am", "pm", "am", "am", "pm", "am"],
+        "key": ["a", "b", "c", "d", "e", "f"],
+        "flag": [True, False, True, True, False, True],
+    }
+)
+
+####################################################################################################
+# The following tests are for the compact_column function                                          #
+####################################################################################################
+
+
+def test_compact_column():
+    assert compact_column(TEST_DATA["passenger_count"]).dtype == np.int8
+    assert compact_column(pd.Series([-1, 300])).dtype == np.int16
+    assert compact_column(TEST_DATA["id"]).dtype == np.uint64
+    assert compact_column(pd.Series([1, 2], dtype=np.uint64)).dtype == np.uint8
+    assert compact_column(TEST_DATA["flag"]).dtype == bool
+    assert (
+        compact_column(TEST_DATA["passenger_count"], integers=False).dtype == np.int64
+    )
+
+    # Floats are only downcast when every value survives, unless forced
+    assert compact_column(TEST_DATA["fare_amount"]).dtype == np.float32
+    assert compact_column(pd.Series([1.5, np.nan])).dtype == np.float32
+    assert compact_column(TEST_DATA["pickup_latitude"]).dtype == np.float64
+    assert (
+        compact_column(TEST_DATA["pickup_latitude"], float32=True).dtype == np.float32
+    )
+
+    # Only strings with few distinct values become categoricals
+    assert compact_column(TEST_DATA["am_or_pm"]).dtype == "category"
+    assert compact_column(TEST_DATA["key"]).dtype == object
+    assert compact_column(pd.Series(["a", 1, "a", "a"])).dtype == object
+    assert compact_column(TEST_DATA["am_or_pm"], categories=False).dtype == object
+
+
+####################################################################################################
+# The following tests are for the CompactBlock class                                               #
+####################################################################################################
+
+
+def test_run_alone():
+    input_df = TEST_DATA.copy()
+    block = CompactBlock()
+    result = block(input_df)
+    compacted, report = block.compact(input_df)
+    assert compacted.equals(result)
+
+    # Values are unchanged and the input is not modified
+    assert input_df.equals(TEST_DATA)
+    for col in TEST_DATA.columns:
+        assert list(result[col].astype(TEST_DATA[col].dtype)) == list(TEST_DATA[col])
+    assert (
+        result.memory_usage(deep=True).sum() < TEST_DATA.memory_usage(deep=True).sum()
+    )
+
+    # Columns that are not compacted are shared with the input
+    assert np.shares_memory(result["id"].values, input_df["id"].values)
+
+    report = report.set_index("column")
+    assert list(report.index) == list(TEST_DATA.columns)
+    assert report.loc["passenger_count", "dtype_after"] == "int8"
+    assert report.loc["passenger_count", "bytes_saved"] == 6 * 7
+    assert report.loc["id", "bytes_saved"] == 0
+    assert (report["bytes_saved"] >= 0).all()
+
+
+def test_selected_columns():
+    block = CompactBlock(params=CompactBlockParams(columns=["passenger_count"]))
+    result = block(TEST_DATA)
+    assert result["passenger_count"].dtype == np.int8
+    assert result["fare_amount"].dtype == np.float64
+    assert list(block.compact(TEST_DATA)[1]["column"]) == ["passenger_count"]
+
+    with pytest.raises(ValueError):
+        CompactBlock(params=CompactBlockParams(columns=["missing"]))(TEST_DATA)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
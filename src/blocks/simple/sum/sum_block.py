@@ -1,11 +1,12 @@
-from typing import Dict
+from typing import Dict, List
 
 import pandas as pd
 from pydantic import field_validator
 from typing_extensions import override
 
-from src.block_base import BlockBase
+from src.aggregate_base import AggregateBlockBase
 from src.params_base import BlockParamBase
+from src.utils.schema import Schema
 
 
 class SumBlockParams(BlockParamBase):
@@ -26,33 +27,54 @@ class SumBlockParams(BlockParamBase):
         return value
 
 
-class SumBlock(BlockBase):
+class SumBlock(AggregateBlockBase):
     params: SumBlockParams
 
     @override
-    def validate(self, input_df: pd.DataFrame) -> None:
-        """Validate that all required parameters are present and columns specified are in the dataframe"""
-        col_keys = list(self.params.column_mapping.keys())
-        col_types = [input_df[col].dtype for col in col_keys]
-
-        if not isinstance(self.params, SumBlockParams):
-            raise ValueError("params must be of type SumBlockParams")
-        if len(col_keys) == 0:
-            raise ValueError("column_mapping must be non-empty")
+    def read_columns(self) -> List[str]:
+        """The summed columns are read"""
+        return list(self.params.column_mapping.keys())
 
-        if not all(col in input_df.columns for col in col_keys):
-            raise ValueError("All columns must be present in the dataframe")
-        if not all(col_type in [int, float] for col_type in col_types):
-            raise ValueError(
-                f"All columns must be of type int or float, were {col_types}"
-            )
+    @override
+    def write_columns(self) -> List[str]:
+        """The sum columns are written"""
+        return list(self.params.column_mapping.values())
 
     @override
-    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
-        """Run the block and return the result by summing up specified columns"""
-        return input_df.assign(
+    def input_schema(self) -> Schema:
+        """The summed columns must be numeric"""
+        return {col: "numeric" for col in self.params.column_mapping}
+
+    @override
+    def output_schema(self, input_schema: Schema) -> Schema:
+        """The sum columns are added with the type of the summed columns"""
+        return {
+            **input_schema,
             **{
-                new_col: input_df[original_col].sum()
-                for original_col, new_col in self.params.column_mapping.items()
-            }
-        )
+                new_col: input_schema[col]
+                for col, new_col in self.params.column_mapping.items()
+            },
+        }
+
+    @override
+    def partial_state(self, input_df: pd.DataFrame) -> Dict[str, float]:
+        """Return the sum of each specified column"""
+        return {
+            original_col: input_df[original_col].sum()
+            for original_col in self.params.column_mapping
+        }
+
+    @override
+    def combine_states(
+        self, left: Dict[str, float], right: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Add up the sums of each column"""
+        return {col: left[col] + right[col] for col in left}
+
+    @override
+    def finalize(self, input_df: pd.DataFrame, state: Dict[str, float]) -> pd.DataFrame:
+        """Return the result by broadcasting the sum of each specified column"""
+        result_df = self.writable_input(input_df)
+        for original_col, new_col in self.params.column_mapping.items():
+            result_df[new_col] = state[original_col]
+        return result_df
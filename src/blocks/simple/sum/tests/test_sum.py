@@ -0,0 +1,89 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.blocks.simple.sum.sum_block import SumBlock, SumBlockParams
+from src.runners.parallel_runner import ParallelRunner
+
+# Define the test parameters and data
+TEST_COLUMNS: Dict[str, str] = {
+    "a": "a_sum",
+    "b": "b_sum",
+}
+TEST_DATA: pd.DataFrame = pd.DataFrame(
+    {
+        "a": [1, 2, 3, 4, 5],
+        "b": [0.5, 1.5, 2.5, 3.5, 4.5],
+    }
+)
+
+# Create the test result data
+TEST_RESULT: pd.DataFrame = TEST_DATA.assign(a_sum=15, b_sum=12.5)
+
+####################################################################################################
+# The following tests are for the SumBlock class                                                   #
+####################################################################################################
+
+
+def test_run_alone():
+    # create block
+    block = SumBlock(params=SumBlockParams(column_mapping=TEST_COLUMNS))
+    # run block
+    result = block(TEST_DATA)
+    # check result
+    assert result.equals(TEST_RESULT)
+
+
+def test_run_shares_unchanged_columns():
+    block = SumBlock(params=SumBlockParams(column_mapping=TEST_COLUMNS))
+    input_df = TEST_DATA.copy()
+    result = block(input_df)
+
+    # Only the new sum columns are allocated, the input columns are shared
+    assert input_df.equals(TEST_DATA)
+    assert np.shares_memory(result["a"].values, input_df["a"].values)
+    assert np.shares_memory(result["b"].values, input_df["b"].values)
+
+
+def test_partial_states():
+    # combining the partial states of two halves gives the state of the whole
+    block = SumBlock(params=SumBlockParams(column_mapping=TEST_COLUMNS))
+    states = [
+        block.partial_state(TEST_DATA.iloc[:2]),
+        block.partial_state(TEST_DATA.iloc[2:]),
+    ]
+    assert block.reduce_states(states) == block.partial_state(TEST_DATA)
+
+
+####################################################################################################
+# The following tests are for the ParallelRunner class                                             #
+####################################################################################################
+
+
+@pytest.mark.parametrize(
+    "num_chunks, use_process_pool, use_thread_pool",
+    [
+        (1, False, True),
+        (2, True, False),
+        (3, False, True),
+        (5, True, False),
+    ],
+)
+def test_run_parallel_num_chunks(num_chunks, use_process_pool, use_thread_pool):
+    # create parallel runner
+    parallel_runner = ParallelRunner(
+        block=SumBlock(params=SumBlockParams(column_mapping=TEST_COLUMNS)),
+        num_chunks=num_chunks,
+        use_process_pool=use_process_pool,
+        use_thread_pool=use_thread_pool,
+    )
+
+    # run blocks, the sums are global and not per chunk
+    result = parallel_runner(TEST_DATA)
+    assert result.equals(TEST_RESULT)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,6 +1,6 @@
 import logging
 import os.path
-from typing import List, Tuple
+from typing import ClassVar, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -44,6 +44,9 @@ class TrainModelBlock(BlockBase):
 
     params: TrainModelParams = TrainModelParams()
 
+    # Training is random and saves the model as a side effect, never cache it
+    cacheable: ClassVar[bool] = False
+
     @override
     def validate(self, input_df: pd.DataFrame) -> None:
         """Validate the input dataframe to ensure it is not empty.
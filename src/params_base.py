@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, field_validator
+
+from src.utils.profiling import PROFILERS
 
 
 class BlockParamBase(BaseModel):
@@ -10,3 +14,30 @@ class BlockParamBase(BaseModel):
     attempts: int = 1
     # 1 second delay between retries
     retry_delay: int = 1
+    # Directory of the result cache (see utils/cache.py), None disables caching
+    cache_dir: Optional[str] = None
+    # Least recently used results are evicted past this size, 1 GiB
+    cache_max_bytes: int = 1 << 30
+    # Fraction of calls that still validate the input columns at runtime when a
+    # runner already checked the block's schema once for the whole run
+    schema_sample_rate: float = 0.0
+    # Profilers every call of the block runs under, "cprofile" and / or "tracemalloc",
+    # also in pool workers (see utils/profiling.py)
+    profile: List[str] = []
+    # Directory the reports merging the profiles of every call are written to
+    profile_dir: str = "profiles"
+
+    @field_validator("profile")
+    def validate_profile(cls, value: List[str]) -> List[str]:
+        """Validate that the profilers are known"""
+        unknown = set(value) - set(PROFILERS)
+        if unknown:
+            raise ValueError(
+                f"Unknown profilers {unknown}, expected some of {PROFILERS}"
+            )
+        return value
+
+
+# Params that control how a block is run, not what it returns: every param of the
+# base class, the params of the derived classes are the ones shaping the result
+RUN_CONTROL_PARAMS: frozenset = frozenset(BlockParamBase.model_fields)
@@ -0,0 +1,110 @@
+import logging
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkAssembler:
+    """Assemble chunk results in chunk order into preallocated per column arrays.
+
+    Each finished chunk is written straight into the output arrays at its row
+    offset, so no final concat copy is needed when the block keeps the row count
+    and schema of every chunk. Columns with pandas extension dtypes (category,
+    string, tz aware datetimes, ...) cannot be written by offset and are
+    concatenated instead. If any chunk changes the row count or schema the
+    assembler falls back to merging the chunk results in chunk order.
+    """
+
+    def __init__(self, chunks: List[pd.DataFrame]):
+        """Initialize the assembler for the given input chunks."""
+        self.chunks = chunks
+        self.offsets = np.concatenate(
+            [[0], np.cumsum([len(chunk) for chunk in chunks], dtype=np.int64)]
+        )
+        self.results: Dict[int, pd.DataFrame] = {}
+        self.columns: Optional[pd.Index] = None
+        self.dtypes: Optional[List] = None
+        self.arrays: Dict[int, np.ndarray] = {}
+        self.fits = True
+
+    @property
+    def num_rows(self) -> int:
+        """Return the total number of input rows"""
+        return int(self.offsets[-1])
+
+    def allocate(self, result_df: pd.DataFrame) -> None:
+        """Allocate the output arrays using the schema of the first finished chunk."""
+        self.columns = result_df.columns
+        self.dtypes = list(result_df.dtypes)
+        self.arrays = {
+            position: np.empty(self.num_rows, dtype=dtype)
+            for position, dtype in enumerate(self.dtypes)
+            if isinstance(dtype, np.dtype)
+        }
+
+    def matches(self, index: int, result_df: pd.DataFrame) -> bool:
+        """Return whether a chunk result can be written into the output arrays."""
+        if len(result_df) != len(self.chunks[index]):
+            return False
+        if not result_df.columns.is_unique:
+            return False
+        if self.columns is None:
+            return True
+        return result_df.columns.equals(self.columns) and self.dtypes == list(
+            result_df.dtypes
+        )
+
+    def add(self, index: int, result_df: pd.DataFrame) -> None:
+        """Record the result of chunk index and write it into the output arrays."""
+        self.results[index] = result_df
+        if not self.fits:
+            return
+        if not self.matches(index, result_df):
+            logger.debug(
+                f"Chunk {index} changed the row count or schema, falling back to concat"
+            )
+            self.fits = False
+            return
+        if self.columns is None:
+            self.allocate(result_df)
+
+        # Write every numpy backed column at the chunk offset
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        for position, array in self.arrays.items():
+            array[start:stop] = result_df.iloc[:, position].to_numpy()
+
+    def ordered_results(self) -> List[pd.DataFrame]:
+        """Return the chunk results in chunk order."""
+        return [self.results[i] for i in range(len(self.chunks))]
+
+    @staticmethod
+    def index(results: List[pd.DataFrame]) -> pd.Index:
+        """Return the output index, the chunk indexes appended in chunk order."""
+        return results[0].index.append([result_df.index for result_df in results[1:]])
+
+    def assemble(
+        self, merge: Callable[[List[pd.DataFrame]], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Return the assembled result, falling back to merge when the chunks did not fit.
+
+        Args:
+            merge: The function used to merge the ordered chunk results on fallback.
+        Returns:
+            result_df: The assembled result.
+        """
+        results = self.ordered_results()
+        if not self.fits or self.columns is None:
+            return merge(results)
+
+        data = {}
+        for position, column in enumerate(self.columns):
+            if position in self.arrays:
+                data[column] = self.arrays[position]
+            else:
+                data[column] = pd.concat(
+                    [result_df.iloc[:, position] for result_df in results]
+                ).array
+        return pd.DataFrame(data, index=self.index(results), copy=False)
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import chunk_bounds
+
+
+class AsyncRunner(BlockBase):
+    """Run a block over the chunks of the input on a single event loop.
+
+    Meant for I/O bound blocks that implement `async def arun`, thousands of
+    chunks can be in flight at once without tying up a thread each. Blocks
+    without a native arun run their synchronous run in a worker thread.
+    """
+
+    # The block to run on every chunk
+    block: BlockBase
+
+    # Two different ways of chunking the input
+    num_chunks: int = None
+    chunk_size: int = None
+
+    # Maximum number of chunks in flight at once
+    max_concurrency: int = 64
+    # Maximum number of seconds for the whole run, None waits forever
+    timeout: Optional[float] = None
+
+    @property
+    def block_name(self) -> str:
+        """Return the name of the block"""
+        return self.block.__class__.__name__
+
+    def validate(self, input_df: pd.DataFrame) -> None:
+        """Override the validate method to add additional validation."""
+        pass
+
+    def validate_runner(self) -> None:
+        """Simple validation on params."""
+        if self.num_chunks is not None and self.chunk_size is not None:
+            raise ValueError("Only one of num_chunks or chunk_size must be specified")
+        if self.num_chunks is None and self.chunk_size is None:
+            raise ValueError("Either num_chunks or chunk_size must be specified")
+        if self.num_chunks is not None and self.num_chunks <= 0:
+            raise ValueError("num_chunks must be greater than 0")
+        if self.chunk_size is not None and self.chunk_size <= 0:
+            raise ValueError("chunk_size must be greater than 0")
+        if self.max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0")
+
+    def split(self, input_df: pd.DataFrame) -> List[pd.DataFrame]:
+        """Split the input dataframe into chunks based on the specified parameters."""
+        return [
+            input_df.iloc[start:stop]
+            for start, stop in chunk_bounds(
+                len(input_df), num_chunks=self.num_chunks, chunk_size=self.chunk_size
+            )
+        ]
+
+    def merge(self, input_dfs: List[pd.DataFrame]) -> pd.DataFrame:
+        """Merge the dataframes (in chunk order) into one dataframe"""
+        return pd.concat(input_dfs)
+
+    async def arun(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block on every chunk concurrently, at most max_concurrency at a time.
+
+        If any chunk fails, or the run is cancelled or times out, every other
+        chunk still in flight is cancelled before the error is raised.
+        """
+        self.validate_runner()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+            async with semaphore:
+                return await self.block.acall(chunk)
+
+        tasks = [
+            asyncio.ensure_future(run_chunk(chunk)) for chunk in self.split(input_df)
+        ]
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*tasks), self.timeout)
+        except BaseException as e:
+            logging.debug(f"Block {self.block_name} failed with error: {e}")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise e
+
+        return self.merge(results)
+
+    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the chunks on a new event loop, use acall / arun from a running loop."""
+        return asyncio.run(self.arun(input_df))
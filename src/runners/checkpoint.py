@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import uuid
+from typing import Any, Dict, List
+
+import pandas as pd
+from pydantic import BaseModel
+
+from src.utils.cache import block_hash, fingerprint_frame
+
+logger = logging.getLogger(__name__)
+
+# Name of the manifest file in the checkpoint directory
+MANIFEST_FILE = "manifest.json"
+
+
+def chain_key(input_key: str, block: BaseModel) -> str:
+    """Return the key of the output of running the block on the input with the given key."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(input_key.encode())
+    digest.update(block_hash(block).encode())
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Stage outputs of a SequentialRunner persisted in a directory.
+
+    The manifest lists every completed stage with its order, block class, a
+    hash of its params (including nested blocks) and a key chaining the input
+    fingerprint through the hashes of every stage so far. A stage is still
+    valid if the key computed for the current run matches the manifest, so a
+    change to the input or to any earlier stage invalidates the later ones.
+    Outputs are stored as uncompressed pickles, the fastest format to reload.
+    """
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = checkpoint_dir
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    @property
+    def manifest_path(self) -> str:
+        """Return the path of the manifest"""
+        return os.path.join(self.checkpoint_dir, MANIFEST_FILE)
+
+    def load_manifest(self) -> List[Dict[str, Any]]:
+        """Return the completed stages recorded in the manifest."""
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path) as f:
+            return json.load(f)["stages"]
+
+    def save_manifest(self, stages: List[Dict[str, Any]]) -> None:
+        """Write the manifest atomically."""
+        tmp_path = f"{self.manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"stages": stages}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def output_path(self, entry: Dict[str, Any]) -> str:
+        """Return the path of the stored output of a manifest entry."""
+        return os.path.join(self.checkpoint_dir, entry["output"])
+
+    def resume_point(self, keys: List[str]) -> int:
+        """Return the number of leading stages whose stored output is still valid.
+
+        Args:
+            keys: The chain key of every stage for the current run.
+        """
+        manifest = self.load_manifest()
+        completed = 0
+        for key, entry in zip(keys, manifest):
+            if entry["key"] != key or not os.path.exists(self.output_path(entry)):
+                break
+            completed += 1
+        return completed
+
+    def load_output(self, index: int) -> pd.DataFrame:
+        """Return the stored output of the stage at the given position."""
+        entry = self.load_manifest()[index]
+        with open(self.output_path(entry), "rb") as f:
+            return pickle.load(f)
+
+    def save_output(
+        self,
+        index: int,
+        order: int,
+        block: BaseModel,
+        key: str,
+        output_df: pd.DataFrame,
+    ) -> None:
+        """Store the output of the stage at the given position, dropping later stages."""
+        manifest = self.load_manifest()[:index]
+        entry = {
+            "order": order,
+            "block": block.__class__.__name__,
+            "params_hash": block_hash(block),
+            "key": key,
+            "output": f"stage_{index}_{key}.pkl",
+        }
+        tmp_path = f"{self.output_path(entry)}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(output_df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.output_path(entry))
+        self.save_manifest(manifest + [entry])
+        self.remove_stale(manifest + [entry])
+
+    def remove_stale(self, manifest: List[Dict[str, Any]]) -> None:
+        """Remove stored outputs that are no longer in the manifest."""
+        keep = {entry["output"] for entry in manifest} | {MANIFEST_FILE}
+        for name in os.listdir(self.checkpoint_dir):
+            if name not in keep and name.startswith("stage_"):
+                os.remove(os.path.join(self.checkpoint_dir, name))
+
+    def stage_keys(self, input_df: pd.DataFrame, blocks: List[BaseModel]) -> List[str]:
+        """Return the chain key of every stage for running the blocks on the input."""
+        keys, key = [], fingerprint_frame(input_df)
+        for block in blocks:
+            key = chain_key(key, block)
+            keys.append(key)
+        return keys
@@ -0,0 +1,90 @@
+import logging
+import math
+from typing import List, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Largest share of a task's run time that may be spent on scheduling overhead
+MAX_OVERHEAD_FRACTION: float = 0.05
+# Upper bound on tasks per worker, a few tasks per worker smooths out uneven chunks
+TASKS_PER_WORKER: int = 4
+
+
+class ChunkPlan(BaseModel):
+    """Chunking plan picked from the cost of the block measured on calibration chunks."""
+
+    num_rows: int
+    num_chunks: int
+    workers: int
+    per_row_seconds: float
+    task_overhead_seconds: float
+
+    @property
+    def chunk_size(self) -> int:
+        """Return the (largest) number of rows per chunk"""
+        return math.ceil(self.num_rows / self.num_chunks) if self.num_rows else 0
+
+
+def noop() -> None:
+    """Task used to spawn the workers before the calibration chunks are timed."""
+    return None
+
+
+def split_cost(timings: List[Tuple[int, float]]) -> Tuple[float, float]:
+    """Split the cost of running tasks into a per row and a per task part.
+
+    Args:
+        timings: The (rows, round trip seconds) of tasks that each had a worker
+            to itself, the first two of different sizes are used. A round trip
+            includes the block call, the dispatch and the (de)serialization.
+    Returns:
+        per_row_seconds: The marginal cost of a row.
+        task_overhead_seconds: The fixed cost of a task, independent of the rows.
+    """
+    if not timings:
+        return 0.0, 0.0
+    if len(timings) == 1:
+        rows, seconds = timings[0]
+        return seconds / max(1, rows), 0.0
+    (small_rows, small_seconds), (large_rows, large_seconds) = timings[:2]
+    per_row_seconds = max(0.0, large_seconds - small_seconds) / max(
+        1, large_rows - small_rows
+    )
+    task_overhead_seconds = max(0.0, small_seconds - per_row_seconds * small_rows)
+    return per_row_seconds, task_overhead_seconds
+
+
+def plan_chunks(
+    num_rows: int,
+    workers: int,
+    per_row_seconds: float,
+    task_overhead_seconds: float,
+    max_overhead_fraction: float = MAX_OVERHEAD_FRACTION,
+    tasks_per_worker: int = TASKS_PER_WORKER,
+) -> ChunkPlan:
+    """Pick the number of chunks for the measured costs.
+
+    Chunks are made large enough that the per task overhead is at most
+    max_overhead_fraction of the work in the chunk, and there are never more
+    than tasks_per_worker chunks per worker (or more chunks than rows).
+    """
+    if per_row_seconds > 0:
+        min_rows = math.ceil(
+            task_overhead_seconds / (max_overhead_fraction * per_row_seconds)
+        )
+    else:
+        min_rows = num_rows
+    num_chunks = min(
+        num_rows // max(1, min_rows),
+        workers * tasks_per_worker,
+        num_rows,
+    )
+    return ChunkPlan(
+        num_rows=num_rows,
+        num_chunks=max(1, num_chunks),
+        workers=workers,
+        per_row_seconds=per_row_seconds,
+        task_overhead_seconds=task_overhead_seconds,
+    )
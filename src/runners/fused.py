@@ -0,0 +1,112 @@
+import logging
+from typing import ClassVar, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+from src.utils.schema import (Schema, checked_blocks, frame_schema,
+                              merge_checks, schema_checked)
+
+logger = logging.getLogger(__name__)
+
+
+class FusedBlock(BlockBase):
+    """Chain of row local blocks run one after the other on the same chunk."""
+
+    # The blocks to run in order
+    blocks: List[BlockBase]
+
+    row_local: ClassVar[bool] = True
+
+    def read_columns(self) -> Optional[List[str]]:
+        """Return the columns read by any block that are not written by an earlier block."""
+        read_columns, written = [], set()
+        for block in self.blocks:
+            block_reads, block_writes = block.read_columns(), block.write_columns()
+            if block_reads is None or block_writes is None:
+                return None
+            for col in block_reads:
+                if col not in written and col not in read_columns:
+                    read_columns.append(col)
+            written.update(block_writes)
+        return read_columns
+
+    def write_columns(self) -> Optional[List[str]]:
+        """Return the columns written by any block."""
+        write_columns = []
+        for block in self.blocks:
+            block_writes = block.write_columns()
+            if block_writes is None:
+                return None
+            write_columns.extend(c for c in block_writes if c not in write_columns)
+        return write_columns
+
+    def check_schema(
+        self, input_schema: Optional[Schema]
+    ) -> Tuple[Dict[str, bool], Optional[Schema]]:
+        """Propagate the schema through the blocks in order, checking every block."""
+        if input_schema is None:
+            return {self.id: False}, None
+        checks, schema = {self.id: True}, input_schema
+        for block in self.blocks:
+            block_checks, schema = block.check_schema(schema)
+            checks = merge_checks(checks, block_checks)
+        return checks, schema
+
+    def validate(self, input_df: pd.DataFrame) -> None:
+        """Override the validate method, each block validates its own input."""
+        pass
+
+    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the blocks in order, passing the result of each block to the next."""
+        if self.id not in checked_blocks():
+            with schema_checked(self.check_schema(frame_schema(input_df))[0]):
+                return self.run(input_df)
+        result = input_df
+        for block in self.blocks:
+            result = block(result)
+        return result
+
+
+def can_fuse(block: BlockBase) -> bool:
+    """Return whether the stage is a ParallelRunner over a row local block."""
+    return isinstance(block, ParallelRunner) and block.block.row_local
+
+
+def fuse(runners: List[ParallelRunner]) -> ParallelRunner:
+    """Fuse consecutive ParallelRunner stages into one stage running the whole chain.
+
+    The fused stage uses the settings (pool, chunking, ...) of the first runner.
+    """
+    blocks = []
+    for runner in runners:
+        if isinstance(runner.block, FusedBlock):
+            blocks.extend(runner.block.blocks)
+        else:
+            blocks.append(runner.block)
+    return runners[0].model_copy(update={"block": FusedBlock(blocks=blocks)})
+
+
+def fuse_stages(stages: List[Tuple[int, BlockBase]]) -> List[Tuple[int, BlockBase]]:
+    """Fuse every run of consecutive fusable stages, keeping the order of the first stage."""
+    fused, group = [], []
+
+    def flush():
+        if len(group) > 1:
+            logger.debug(
+                f"Fusing stages {[order for order, _ in group]} into a single parallel stage"
+            )
+            fused.append((group[0][0], fuse([runner for _, runner in group])))
+        else:
+            fused.extend(group)
+        group.clear()
+
+    for order, block in stages:
+        if can_fuse(block):
+            group.append((order, block))
+            continue
+        flush()
+        fused.append((order, block))
+    flush()
+    return fused
@@ -0,0 +1,234 @@
+import logging
+import os
+import shutil
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.block_base import BlockBase
+from src.utils.cache import block_hash, fingerprint_frame
+
+logger = logging.getLogger(__name__)
+
+# Different ways of telling the new rows apart from the rows already processed
+WATERMARKS: List[str] = ["row_count", "max_value", "id_set"]
+
+# Rows at each end of the seen rows hashed by the row_count watermark
+FINGERPRINT_ROWS: int = 1024
+
+# Name of the file holding the watermark and the list of output parts
+STATE_FILE: str = "state.pkl"
+# Extension of the files holding the output of a run
+PART_SUFFIX: str = ".pkl.gz"
+
+
+def edge_fingerprint(input_df: pd.DataFrame, rows: int = FINGERPRINT_ROWS) -> str:
+    """Return a hash of the row count and of the first and last rows of the frame,
+    so checking that the seen rows are unchanged costs the same for any history."""
+    edges = input_df
+    if len(input_df) > 2 * rows:
+        edges = pd.concat([input_df.iloc[:rows], input_df.iloc[-rows:]])
+    return f"{len(input_df)}-{fingerprint_frame(edges)}"
+
+
+class IncrementalRunner(BlockBase):
+    """Run a block only on the rows appended since the last run.
+
+    The output of every run is stored in state_dir as a part file of its own,
+    next to a small state file with the watermark and the list of parts. The
+    next run processes only the rows past the watermark and adds their result
+    as a new part, earlier parts are never rewritten and are only read when the
+    output of every row is returned (see return_all), so the run time scales
+    with the new data instead of the whole history. Every row is processed
+    once, so the block (or SequentialRunner chain) should be row local (see
+    BlockBase.row_local). The stored output is only reused by the same block
+    with the same params.
+
+    Watermarks:
+        row_count: The input only grows by appending rows, the new rows are the
+            ones past the previous row count. If the first or last FINGERPRINT_ROWS
+            of the previously seen rows changed everything is reprocessed, rows
+            changed in between are not detected.
+        max_value: The new rows have a watermark_column value (e.g. a timestamp
+            or increasing id) greater than the largest one seen so far.
+        id_set: The new rows have a watermark_column value (e.g. an id) that has
+            not been seen before.
+    """
+
+    # The block (or SequentialRunner chain) to run on the new rows
+    block: BlockBase
+
+    # Directory holding the output and watermark of every incremental pipeline
+    state_dir: str
+    # Name of the pipeline, the state of each name is kept separately
+    name: str
+
+    # How the new rows are found, one of WATERMARKS
+    watermark: str = "row_count"
+    # Column used by the max_value and id_set watermarks
+    watermark_column: Optional[str] = None
+
+    # Return the output of every row, reading every stored part, or only the
+    # output of the rows processed by this run
+    return_all: bool = True
+
+    @property
+    def block_name(self) -> str:
+        """Return the name of the block"""
+        return self.block.__class__.__name__
+
+    @property
+    def pipeline_dir(self) -> str:
+        """Return the directory holding the state and output parts of the pipeline"""
+        return os.path.join(self.state_dir, self.name)
+
+    @property
+    def state_path(self) -> str:
+        """Return the path of the stored state of the pipeline"""
+        return os.path.join(self.pipeline_dir, STATE_FILE)
+
+    def validate(self, input_df: pd.DataFrame) -> None:
+        """Override the validate method to add additional validation."""
+        if (
+            self.watermark_column is not None
+            and self.watermark_column not in input_df.columns
+        ):
+            raise ValueError(
+                f"Watermark column {self.watermark_column} is not in the input"
+            )
+
+    def validate_runner(self) -> None:
+        """Simple validation on params."""
+        if self.watermark not in WATERMARKS:
+            raise ValueError(f"watermark must be one of {WATERMARKS}")
+        if self.watermark != "row_count" and self.watermark_column is None:
+            raise ValueError(
+                f"watermark_column must be specified for the {self.watermark} watermark"
+            )
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        """Return the state stored by the last run, None if there is none."""
+        if not os.path.exists(self.state_path):
+            return None
+        state = pd.read_pickle(self.state_path)
+        if (state["watermark"], state["watermark_column"]) != (
+            self.watermark,
+            self.watermark_column,
+        ):
+            logger.info(f"Watermark of {self.name} changed, reprocessing every row")
+            return None
+        # The stored output was computed by another block or with other params
+        if state.get("block_hash") != block_hash(self.block):
+            logger.info(f"Block of {self.name} changed, reprocessing every row")
+            return None
+        return state
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        """Store the state atomically, so an interrupted run keeps the last state,
+        then remove the parts it no longer lists."""
+        tmp_path = f"{self.state_path}.{uuid.uuid4().hex}.tmp"
+        pd.to_pickle(state, tmp_path)
+        os.replace(tmp_path, self.state_path)
+        for file_name in os.listdir(self.pipeline_dir):
+            if file_name.endswith(PART_SUFFIX) and file_name not in state["parts"]:
+                os.remove(os.path.join(self.pipeline_dir, file_name))
+
+    def save_part(self, output_df: pd.DataFrame) -> str:
+        """Store the output of a run as a new part, returns the name of its file."""
+        os.makedirs(self.pipeline_dir, exist_ok=True)
+        part = f"part-{uuid.uuid4().hex}{PART_SUFFIX}"
+        output_df.to_pickle(os.path.join(self.pipeline_dir, part), compression="gzip")
+        return part
+
+    def load_parts(self, parts: List[str]) -> List[pd.DataFrame]:
+        """Return the stored output parts, in the given order."""
+        return [
+            pd.read_pickle(os.path.join(self.pipeline_dir, part), compression="gzip")
+            for part in parts
+        ]
+
+    def reset(self) -> None:
+        """Forget the stored state and output, the next run processes every row."""
+        shutil.rmtree(self.pipeline_dir, ignore_errors=True)
+
+    def new_rows(
+        self, input_df: pd.DataFrame, state: Optional[Dict[str, Any]]
+    ) -> Optional[pd.DataFrame]:
+        """Return the rows past the watermark, or None if everything must be reprocessed."""
+        if state is None:
+            return None
+
+        if self.watermark == "row_count":
+            row_count = state["row_count"]
+            if (
+                len(input_df) < row_count
+                or edge_fingerprint(input_df.iloc[:row_count]) != state["fingerprint"]
+            ):
+                logger.info(f"Rows seen by {self.name} changed, reprocessing every row")
+                return None
+            return input_df.iloc[row_count:]
+
+        column = input_df[self.watermark_column]
+        if self.watermark == "max_value":
+            if state["max_value"] is None:
+                return input_df
+            return input_df[column > state["max_value"]]
+        return input_df[~column.isin(state["ids"])]
+
+    def next_state(
+        self,
+        input_df: pd.DataFrame,
+        parts: List[str],
+        state: Optional[Dict[str, Any]],
+        new_df: pd.DataFrame,
+    ) -> Dict[str, Any]:
+        """Return the state after processing new_df, whose output parts are parts."""
+        next_state = {
+            "watermark": self.watermark,
+            "watermark_column": self.watermark_column,
+            "block_hash": block_hash(self.block),
+            "parts": parts,
+        }
+        if self.watermark == "row_count":
+            next_state["row_count"] = len(input_df)
+            next_state["fingerprint"] = edge_fingerprint(input_df)
+        elif self.watermark == "max_value":
+            column = input_df[self.watermark_column]
+            next_state["max_value"] = column.max() if len(column) else None
+        else:
+            new_ids = new_df[self.watermark_column].unique()
+            if state is not None:
+                new_ids = np.concatenate([state["ids"], new_ids])
+            next_state["ids"] = new_ids
+        return next_state
+
+    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block on the new rows and return the output for every row, or
+        for the new rows only if return_all is False."""
+        self.validate_runner()
+        state = self.load_state()
+        new_df = self.new_rows(input_df, state)
+
+        if new_df is None:
+            logger.debug(f"Running {self.block_name} on all {len(input_df)} rows")
+            new_df, state, parts = input_df, None, []
+        elif new_df.empty:
+            logger.debug(f"No new rows for {self.block_name}")
+            if self.return_all:
+                return pd.concat(self.load_parts(state["parts"]))
+            return self.block(new_df)
+        else:
+            logger.debug(f"Running {self.block_name} on {len(new_df)} new rows")
+            parts = state["parts"]
+
+        output_df = self.block(new_df)
+        self.save_state(
+            self.next_state(
+                input_df, [*parts, self.save_part(output_df)], state, new_df
+            )
+        )
+        if not self.return_all or not parts:
+            return output_df
+        return pd.concat([*self.load_parts(parts), output_df])
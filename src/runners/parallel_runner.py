@@ -1,27 +1,120 @@
 import logging
-from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
-                                as_completed)
-from typing import List
+import os
+import time
+import uuid
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor, as_completed)
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
+from pydantic import PrivateAttr
 
+from src.aggregate_base import AggregateBlockBase
 from src.block_base import BlockBase
+from src.runners.assembly import ChunkAssembler
+from src.runners.chunk_planner import ChunkPlan, noop, plan_chunks, split_cost
+from src.runners.remote_executor import RemoteExecutor
+from src.runners.scheduler import DynamicScheduler
+from src.runners.shared_memory import (SharedFrame, assemble, run_shared_chunk,
+                                       unlink)
+from src.runners.worker_pool import WorkerPool, get_shared_pool
+from src.utils.dedup import duplicated_rows
+from src.utils.schema import (Schema, checked_blocks, frame_schema,
+                              schema_checked)
+from src.utils.tracing import merge_spans, with_parent
 from src.utils.wrapper import log_run_info
 
+# Supported ways of shipping chunks to the workers
+TRANSPORTS = ["pickle", "shared_memory"]
+# Supported ways of scheduling the chunks
+SCHEDULINGS = ["static", "dynamic"]
+# Supported ways of assembling the chunk results
+ASSEMBLIES = ["concat", "preallocated"]
+
+
+def chunk_bounds(
+    num_rows: int, num_chunks: int = None, chunk_size: int = None
+) -> List[Tuple[int, int]]:
+    """Return the [start, stop) row bounds of every chunk for a frame of num_rows rows."""
+    # If we are using num_chunks, split the rows into num_chunks
+    if num_chunks is not None:
+        base_size = num_rows // num_chunks
+        remainder = num_rows % num_chunks
+        bounds = []
+        for i in range(num_chunks):
+            start_index = i * base_size + min(i, remainder)
+            end_index = start_index + base_size + (1 if i < remainder else 0)
+            bounds.append((start_index, end_index))
+        return bounds
+    # If we are using chunk_size, split the rows into chunks of chunk_size, an
+    # empty frame is still a single (empty) chunk so the block runs on it
+    elif chunk_size is not None:
+        return [
+            (i, min(i + chunk_size, num_rows)) for i in range(0, num_rows, chunk_size)
+        ] or [(0, 0)]
+    # If neither num_chunks nor chunk_size is specified, raise an error
+    else:
+        raise ValueError("Either num_chunks or chunk_size must be specified")
+
 
 class ParallelRunner(BlockBase):
 
     # The blocks to run in parallel
     block: BlockBase
 
-    # Two different ways of running in parallel
+    # Three different ways of chunking the input, auto_chunking calibrates
+    # num_chunks on the first chunks of the input (see plan_chunking)
     num_chunks: int = None
     chunk_size: int = None
+    auto_chunking: bool = False
+    # Number of rows of the larger calibration chunk when auto_chunking
+    probe_rows: int = 1000
 
     # Two different ways to parallelize
     use_process_pool: bool = False
     use_thread_pool: bool = False
 
+    # Run the chunks on worker daemons reached over sockets instead of local
+    # pools, addresses are "host:port" or "unix:/path" (see remote_executor.py)
+    use_remote_pool: bool = False
+    remote_addresses: List[str] = []
+
+    # Attach to the process wide worker pool (see worker_pool.py) instead of
+    # creating a new executor on every call
+    use_shared_pool: bool = False
+    # Number of workers for a per call executor, defaults to the number of cpus
+    max_workers: int = None
+
+    # How chunks are shipped to process pool workers, either "pickle" or
+    # "shared_memory" (see shared_memory.py)
+    transport: str = "pickle"
+
+    # How chunks are handed to the workers, either "static" (one task per chunk)
+    # or "dynamic" (see scheduler.py)
+    scheduling: str = "static"
+    # Number of tasks each chunk is split into when scheduling dynamically
+    over_partition: int = 4
+    # Re-run a task when it takes longer than this multiple of the median task
+    # time when scheduling dynamically, None disables speculative re-execution
+    speculation_factor: Optional[float] = 3.0
+
+    # How chunk results are merged, either "concat" or "preallocated" (see assembly.py)
+    assembly: str = "concat"
+
+    # Only ship the columns the block reads (see BlockBase.read_columns) to the
+    # workers and stitch the columns it writes back onto the untouched columns.
+    # Untouched columns keep their position, new columns are appended
+    project_columns: bool = False
+
+    # Drop the rows equal to a row of an earlier chunk, found by their dedup column
+    # (see BlockBase.dedup_column), so duplicates spanning chunks are removed as well
+    global_dedup: bool = True
+
+    # Executor of the calibration chunks a calibrated copy runs the rest of the
+    # input on (see calibrated), None to pick one for every call
+    _executor: Optional[Executor] = PrivateAttr(default=None)
+
     @property
     def runner_name(self) -> str:
         """Return the name of the runner"""
@@ -38,88 +131,443 @@ class ParallelRunner(BlockBase):
 
     def validate_runner(self) -> None:
         """Simple validation on params."""
-        if not self.use_process_pool and not self.use_thread_pool:
-            raise ValueError("Either use_process_pool or use_thread_pool must be True")
-        if self.use_process_pool and self.use_thread_pool:
+        num_pools = sum(
+            [self.use_process_pool, self.use_thread_pool, self.use_remote_pool]
+        )
+        if num_pools == 0:
             raise ValueError(
-                "Only one of use_process_pool or use_thread_pool must be True"
+                "Either use_process_pool, use_thread_pool or use_remote_pool must be True"
             )
+        if num_pools > 1:
+            raise ValueError(
+                "Only one of use_process_pool, use_thread_pool or use_remote_pool must be True"
+            )
+        if self.use_remote_pool and not self.remote_addresses:
+            raise ValueError("remote_addresses must be given when use_remote_pool")
+        if self.use_remote_pool and self.use_shared_pool:
+            raise ValueError("use_shared_pool is not supported with use_remote_pool")
         if self.num_chunks is not None and self.chunk_size is not None:
             raise ValueError("Only one of num_chunks or chunk_size must be specified")
-        if self.num_chunks is None and self.chunk_size is None:
-            raise ValueError("Either num_chunks or chunk_size must be specified")
+        if self.auto_chunking and (
+            self.num_chunks is not None or self.chunk_size is not None
+        ):
+            raise ValueError(
+                "auto_chunking cannot be combined with num_chunks or chunk_size"
+            )
+        if (
+            self.num_chunks is None
+            and self.chunk_size is None
+            and not self.auto_chunking
+        ):
+            raise ValueError(
+                "Either num_chunks, chunk_size or auto_chunking must be specified"
+            )
+        if self.probe_rows <= 0:
+            raise ValueError("probe_rows must be greater than 0")
         if self.num_chunks is not None and self.num_chunks <= 0:
             raise ValueError("num_chunks must be greater than 0")
         if self.chunk_size is not None and self.chunk_size <= 0:
             raise ValueError("chunk_size must be greater than 0")
+        if self.max_workers is not None and self.max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"transport must be one of {TRANSPORTS}")
+        if self.transport == "shared_memory" and not self.use_process_pool:
+            raise ValueError("transport 'shared_memory' requires use_process_pool")
+        if self.assembly not in ASSEMBLIES:
+            raise ValueError(f"assembly must be one of {ASSEMBLIES}")
+        if self.scheduling not in SCHEDULINGS:
+            raise ValueError(f"scheduling must be one of {SCHEDULINGS}")
+        if self.scheduling == "dynamic" and self.transport == "shared_memory":
+            raise ValueError("scheduling 'dynamic' requires transport 'pickle'")
+        if self.over_partition <= 0:
+            raise ValueError("over_partition must be greater than 0")
+        if self.speculation_factor is not None and self.speculation_factor < 1:
+            raise ValueError("speculation_factor must be at least 1")
+
+    def check_schema(
+        self, input_schema: Optional[Schema]
+    ) -> Tuple[Dict[str, bool], Optional[Schema]]:
+        """Check the block against the schema, every chunk has the same schema as the input."""
+        if input_schema is None:
+            return {self.id: False}, None
+        checks, output_schema = self.block.check_schema(input_schema)
+        return {**checks, self.id: True}, output_schema
+
+    def shared_pool(self) -> Optional[WorkerPool]:
+        """Return the shared pool the chunks run on, None if not attached to it or if
+        called from one of its workers (e.g. by a nested runner): its chunks could
+        wait forever behind the tasks of the outer runner holding every worker, so
+        it runs them on an executor of its own instead."""
+        if not self.use_shared_pool:
+            return None
+        pool = get_shared_pool(use_process_pool=self.use_process_pool)
+        return None if pool.in_worker() else pool
+
+    def worker_count(self) -> int:
+        """Return the number of workers the chunks will run on"""
+        pool = self.shared_pool()
+        if pool is not None:
+            return pool.max_workers
+        if self.use_remote_pool:
+            return len(self.remote_addresses)
+        return self.max_workers or os.cpu_count() or 1
+
+    def plan_chunking(
+        self,
+        input_df: pd.DataFrame,
+        executor: Executor,
+        fn: Callable[[pd.DataFrame], Any] = None,
+    ) -> Tuple[ChunkPlan, List[Any], int]:
+        """Calibrate the chunking on the first real chunks of the input.
+
+        The head of the input is run as two chunks of probe_rows // 2 and
+        probe_rows rows, submitted together. Their round trip times split the
+        cost into a per row cost and a per task overhead (block call and
+        dispatch), which pick the number of chunks of the remaining rows. Their
+        results are part of the output, so no row is run twice.
+
+        Args:
+            input_df: The input dataframe.
+            executor: The executor to run the calibration chunks on, the rest of
+                the input should run on it too (see calibrated).
+            fn: The function to run on every chunk, defaults to calling the block.
+        Returns:
+            plan: The chunking of the rows after the calibration chunks.
+            results: The results of the calibration chunks, in chunk order.
+            head_rows: The number of rows of the calibration chunks.
+        """
+        small_stop = min(len(input_df), max(1, self.probe_rows // 2))
+        large_stop = min(len(input_df), small_stop + self.probe_rows)
+        bounds = [
+            (start, stop)
+            for start, stop in [(0, small_stop), (small_stop, large_stop)]
+            if start < stop
+        ]
+        workers = self.worker_count()
+
+        # The first tasks may spawn the workers, do not count them
+        for future in [executor.submit(noop) for _ in range(min(len(bounds), workers))]:
+            future.result()
+
+        # Time every chunk from the submission until its result is back
+        finished = {}
+        start_time = time.perf_counter()
+        results = self.run_executor(
+            executor=executor,
+            chunks=[input_df.iloc[start:stop] for start, stop in bounds],
+            on_result=lambda index, _: finished.setdefault(index, time.perf_counter()),
+            fn=fn,
+        )
+        timings = [
+            (stop - start, finished[index] - start_time)
+            for index, (start, stop) in enumerate(bounds)
+        ]
+        if workers == 1 and len(timings) == 2:
+            # The larger chunk waited for the smaller one on the single worker
+            timings[1] = (timings[1][0], finished[1] - finished[0])
+
+        per_row_seconds, task_overhead_seconds = split_cost(timings)
+        plan = plan_chunks(
+            num_rows=len(input_df) - large_stop,
+            workers=workers,
+            per_row_seconds=per_row_seconds,
+            task_overhead_seconds=task_overhead_seconds,
+        )
+        logging.info(
+            f"[{self.id}] Auto chunking {self.block_name} into {plan.num_chunks} chunks "
+            f"of ~{plan.chunk_size} rows for {plan.workers} workers "
+            f"(per row {plan.per_row_seconds:.2e}s, per task {plan.task_overhead_seconds:.2e}s)"
+        )
+        return plan, results, large_stop
+
+    def calibrated(self, plan: ChunkPlan, executor: Executor) -> "ParallelRunner":
+        """Return a copy of the runner chunking with the plan on the executor the
+        calibration chunks ran on, so a call starts a single pool."""
+        runner = self.model_copy(
+            update={"auto_chunking": False, "num_chunks": plan.num_chunks}
+        )
+        runner._executor = executor
+        return runner
+
+    def chunk_bounds(self, num_rows: int) -> List[Tuple[int, int]]:
+        """Return the [start, stop) row bounds of every chunk for a frame of num_rows rows."""
+        return chunk_bounds(
+            num_rows=num_rows, num_chunks=self.num_chunks, chunk_size=self.chunk_size
+        )
 
     def split(self, input_df: pd.DataFrame) -> List[pd.DataFrame]:
         """Split the input dataframe into chunks based on the specified parameters."""
-        # If we are using num_chunks, split the dataframe into num_chunks
-        if self.num_chunks is not None:
-            chunk_size = len(input_df) // self.num_chunks
-            remainder = len(input_df) % self.num_chunks
-            chunks = []
-            for i in range(self.num_chunks):
-                start_index = i * chunk_size + min(i, remainder)
-                end_index = start_index + chunk_size + (1 if i < remainder else 0)
-                chunks.append(input_df.iloc[start_index:end_index])
-            return chunks
-        # If we are using chunk_size, split the dataframe into chunks of chunk_size
-        elif self.chunk_size is not None:
-            return [
-                input_df.iloc[i : i + self.chunk_size]
-                for i in range(0, len(input_df), self.chunk_size)
-            ]
-        # If neither num_chunks nor chunk_size is specified, raise an error
-        else:
-            raise ValueError("Either num_chunks or chunk_size must be specified")
+        return [
+            input_df.iloc[start:stop]
+            for start, stop in self.chunk_bounds(len(input_df))
+        ]
+
+    def over_split(self, chunks: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Split every chunk into (up to) over_partition smaller tasks, keeping row order."""
+        tasks = []
+        for chunk in chunks:
+            task_size = max(1, -(-len(chunk) // self.over_partition))
+            tasks.extend(
+                chunk.iloc[i : i + task_size] for i in range(0, len(chunk), task_size)
+            )
+        # Empty chunks have no tasks, keep one so the block still runs on the empty input
+        return tasks or chunks[:1]
+
+    def can_project(self) -> bool:
+        """Return whether the block declares the columns it reads and writes."""
+        return (
+            self.project_columns
+            and self.block.read_columns() is not None
+            and self.block.write_columns() is not None
+        )
+
+    def project(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Return only the input columns the block reads, in input order."""
+        self.block.validate_columns(input_df=input_df)
+        read_columns = set(self.block.read_columns())
+        return input_df[[col for col in input_df.columns if col in read_columns]]
+
+    def stitch(self, input_df: pd.DataFrame, written_df: pd.DataFrame) -> pd.DataFrame:
+        """Put the columns written by the block back onto the untouched input columns."""
+        if not written_df.index.equals(input_df.index):
+            raise ValueError(
+                f"Block {self.block_name} changed the rows of its input, run it without project_columns"
+            )
+        result_df = input_df.copy(deep=False)
+        for col in self.block.write_columns():
+            if col in written_df.columns:
+                result_df[col] = written_df[col]
+        return result_df
+
+    def run_projected(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block on the columns it reads and stitch its output back on the input."""
+        projected_df = self.project(input_df)
+        logging.debug(
+            f"Shipping {len(projected_df.columns)} of {len(input_df.columns)} columns to the workers"
+        )
+        runner = self.model_copy(update={"project_columns": False})
+        return self.stitch(input_df, runner.run(projected_df))
 
     def merge(self, input_dfs: List[pd.DataFrame]) -> pd.DataFrame:
-        """Merge the dataframes into one dataframe"""
+        """Merge the dataframes (in chunk order) into one dataframe"""
         return pd.concat(input_dfs)
 
-    def run_process_pool(self, chunks: List[pd.DataFrame]) -> List[pd.DataFrame]:
-        # Run in parallel using ProcessPoolExecutor
-        results = []
-        with ProcessPoolExecutor() as executor:
-
-            # Submit the tasks
-            futures = {}
-            for chunk in chunks:
-                future = executor.submit(self.block, chunk)
-                futures[future] = chunk
-
-            # Wait for the tasks to complete and aggregate the results
-            for future in as_completed(futures):
-                block = futures[future]
-                try:
-                    results.append(future.result())
-                except Exception as e:
-                    logging.debug(f"Block {block.__class__} failed with error: {e}")
-                    raise e
+    def dedup(self, result_df: pd.DataFrame) -> pd.DataFrame:
+        """Drop the rows equal to an earlier row (in chunk order), finding them by
+        the block's dedup column.
+
+        Each chunk is already deduplicated by the block, so this single pass over
+        the compact row ids only removes the duplicates spanning chunks. Rows
+        sharing an id but not their values are kept, as when run on the whole frame.
+        """
+        dedup_column = self.block.dedup_column()
+        if (
+            not self.global_dedup
+            or dedup_column is None
+            or dedup_column not in result_df.columns
+        ):
+            return result_df
+        duplicated = duplicated_rows(result_df, dedup_column)
+        if not duplicated.any():
+            return result_df
+        logging.debug(
+            f"Dropping {duplicated.sum()} rows duplicated across chunks of {self.block_name}"
+        )
+        return result_df[~duplicated]
+
+    def get_executor(self) -> Executor:
+        """Return a fresh executor for this call, only used when not attached to the shared pool."""
+        if self.use_remote_pool:
+            return RemoteExecutor(addresses=self.remote_addresses)
+        if self.use_process_pool:
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def run_executor(
+        self,
+        executor: Executor,
+        chunks: List[pd.DataFrame],
+        on_result: Callable[[int, pd.DataFrame], None] = None,
+        fn: Callable[[pd.DataFrame], Any] = None,
+    ) -> List[pd.DataFrame]:
+        """Submit every chunk to the executor and collect the results in chunk order.
+
+        Args:
+            executor: The executor to submit the chunks to.
+            chunks: The chunks to run the block on.
+            on_result: Optional callback called with (chunk index, result) as each chunk finishes.
+            fn: The function to run on every chunk, defaults to calling the block.
+        Returns:
+            results: The result of every chunk, in chunk order.
+        """
+        # Link the spans of the chunks to the span of the runner
+        fn = with_parent(self.block if fn is None else fn)
+        results = [None] * len(chunks)
+
+        # Submit the tasks
+        futures = {}
+        for index, chunk in enumerate(chunks):
+            future = executor.submit(fn, chunk)
+            futures[future] = index
+
+        # Wait for the tasks to complete and aggregate the results
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = merge_spans(future.result())
+            except Exception as e:
+                logging.debug(
+                    f"Block {self.block_name} failed on chunk {index} with error: {e}"
+                )
+                raise e
+            if on_result is not None:
+                on_result(index, results[index])
         return results
 
-    def run_thread_pool(self, chunks: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    @contextmanager
+    def executor_context(self, wait: bool = True) -> Iterator[Executor]:
+        """Yield the executor of the calibration if any (see calibrated), the shared
+        pool executor if attached, otherwise a fresh executor for this call.
+
+        Args:
+            wait: Whether to wait for running tasks when shutting down a fresh executor.
+        """
+        if self._executor is not None:
+            yield self._executor
+            return
+        pool = self.shared_pool()
+        if pool is not None:
+            yield pool.executor
+            return
+        executor = self.get_executor()
+        try:
+            yield executor
+        finally:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def run_pool(
+        self,
+        chunks: List[pd.DataFrame],
+        on_result: Callable[[int, pd.DataFrame], None] = None,
+    ) -> List[pd.DataFrame]:
+        """Run the chunks on the shared pool if attached, otherwise on a fresh executor."""
+        # Do not wait for losing speculative copies when the executor is shut down
+        dynamic = self.scheduling == "dynamic"
+        with self.executor_context(wait=not dynamic) as executor:
+            if dynamic:
+                scheduler = DynamicScheduler(
+                    executor=executor,
+                    fn=with_parent(self.block),
+                    tasks=chunks,
+                    workers=self.worker_count(),
+                    speculation_factor=self.speculation_factor,
+                )
+                return scheduler.run(on_result=on_result)
+            return self.run_executor(
+                executor=executor, chunks=chunks, on_result=on_result
+            )
+
+    def run_aggregate(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run an aggregate block as a parallel map of partial states over the chunks,
+        a tree combine of the (small) partial states and a single broadcast pass."""
+        # Validate the whole input once, the chunks only compute partial states
+        self.block.validate(input_df=input_df)
+
+        # Map: compute the partial state of every chunk in parallel
+        map_df = self.project(input_df) if self.can_project() else input_df
+        with self.executor_context() as executor:
+            runner, states = self, []
+            if self.auto_chunking:
+                plan, states, head_rows = self.plan_chunking(
+                    map_df, executor, fn=self.block.partial_state
+                )
+                runner, map_df = (
+                    self.calibrated(plan, executor),
+                    map_df.iloc[head_rows:],
+                )
+            if not states or len(map_df):
+                states += runner.run_executor(
+                    executor=executor,
+                    chunks=runner.split(map_df),
+                    fn=self.block.partial_state,
+                )
+
+        # Reduce and broadcast the global aggregate onto every row
+        state = self.block.reduce_states(states)
+        return self.block.finalize(input_df, state)
+
+    def run_shared_memory(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block over the chunks using the shared memory transport.
+
+        Numeric columns are copied into shared memory once and workers rebuild
+        their chunk as zero copy views, only the remaining columns are pickled.
+        Workers write the numeric columns of their result straight into one
+        output buffer per column at the chunk rows, which the result then uses
+        as is. Chunks that drop or add rows fall back to a segment of their own
+        each, and their frames are merged (see shared_memory.assemble).
+        """
+        bounds = self.chunk_bounds(len(input_df))
+        output_prefix = f"psm_{uuid.uuid4().hex[:12]}"
+
+        with SharedFrame.from_frame(input_df) as shared_input:
+            local_df = input_df.iloc[:, shared_input.spec.local_positions]
+
+            # Submit the tasks, only the non shared columns of each chunk are pickled
+            with self.executor_context() as executor:
+                futures = [
+                    executor.submit(
+                        with_parent(run_shared_chunk),
+                        self.block,
+                        shared_input.spec,
+                        local_df.iloc[start:stop],
+                        start,
+                        stop,
+                        output_prefix,
+                    )
+                    for start, stop in bounds
+                ]
+
+                # Wait for every chunk, so the output segments of the chunks that
+                # finished are unlinked even if another one failed
+                results, error = [], None
+                for future in futures:
+                    try:
+                        results.append(merge_spans(future.result()))
+                    except Exception as e:
+                        error = error or e
+                if error is not None:
+                    for output_spec, _ in results:
+                        unlink(output_spec)
+                    logging.debug(f"Block {self.block_name} failed with error: {error}")
+                    raise error
+
+        frames = assemble(results)
+        return self.dedup(frames[0] if len(frames) == 1 else self.merge(frames))
+
+    def run_process_pool(
+        self,
+        chunks: List[pd.DataFrame],
+        on_result: Callable[[int, pd.DataFrame], None] = None,
+    ) -> List[pd.DataFrame]:
         # Run in parallel using ProcessPoolExecutor
-        results = []
-        with ThreadPoolExecutor() as executor:
-
-            # Submit the tasks
-            futures = {}
-            for chunk in chunks:
-                future = executor.submit(self.block, chunk)
-                futures[future] = chunk
-
-            # Wait for the tasks to complete and aggregate the results
-            for future in as_completed(futures):
-                block = futures[future]
-                try:
-                    results.append(future.result())
-                except Exception as e:
-                    logging.debug(f"Block {block.__class__} failed with error: {e}")
-                    raise e
-        return results
+        return self.run_pool(chunks=chunks, on_result=on_result)
+
+    def run_thread_pool(
+        self,
+        chunks: List[pd.DataFrame],
+        on_result: Callable[[int, pd.DataFrame], None] = None,
+    ) -> List[pd.DataFrame]:
+        # Run in parallel using ThreadPoolExecutor
+        return self.run_pool(chunks=chunks, on_result=on_result)
+
+    def run_remote_pool(
+        self,
+        chunks: List[pd.DataFrame],
+        on_result: Callable[[int, pd.DataFrame], None] = None,
+    ) -> List[pd.DataFrame]:
+        # Run in parallel using RemoteExecutor
+        return self.run_pool(chunks=chunks, on_result=on_result)
 
     def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
         """Run the blocks that the runner was initialized with in order
@@ -127,18 +575,61 @@ class ParallelRunner(BlockBase):
         previous block to the next block."""
         self.validate_runner()
 
+        # Check the block's schema once on the whole input instead of on every chunk
+        if self.id not in checked_blocks():
+            with schema_checked(self.check_schema(frame_schema(input_df))[0]):
+                return self.run(input_df)
+
+        # Only ship the columns the block reads to the workers
+        if self.can_project() and not isinstance(self.block, AggregateBlockBase):
+            return self.run_projected(input_df)
+
+        # Aggregates need the partial states of every chunk before any row can be finalized
+        if isinstance(self.block, AggregateBlockBase):
+            return self.run_aggregate(input_df)
+
+        # Run the calibration chunks, then the rest of the input with the picked chunking
+        if self.auto_chunking:
+            with self.executor_context(wait=self.scheduling != "dynamic") as executor:
+                plan, results, head_rows = self.plan_chunking(input_df, executor)
+                if results and head_rows == len(input_df):
+                    return self.dedup(self.merge(results))
+                runner = self.calibrated(plan, executor)
+                rest = runner.run(input_df.iloc[head_rows:])
+            return self.dedup(self.merge([*results, rest]))
+
+        # Ship the numeric columns through shared memory instead of pickling the chunks
+        if self.transport == "shared_memory" and not input_df.empty:
+            return self.run_shared_memory(input_df)
+
         # Generate the chunks
         chunks = self.split(input_df)
 
+        # Over partition the chunks so they can be handed out dynamically
+        if self.scheduling == "dynamic":
+            chunks = self.over_split(chunks)
+
+        # Write each finished chunk into preallocated output arrays at its offset
+        assembler = None
+        on_result = None
+        if self.assembly == "preallocated":
+            assembler = ChunkAssembler(chunks=chunks)
+            on_result = assembler.add
+
         # Run in parallel
         results = []
         if self.use_process_pool:
-            results = self.run_process_pool(chunks=chunks)
+            results = self.run_process_pool(chunks=chunks, on_result=on_result)
         elif self.use_thread_pool:
-            results = self.run_thread_pool(chunks=chunks)
+            results = self.run_thread_pool(chunks=chunks, on_result=on_result)
+        elif self.use_remote_pool:
+            results = self.run_remote_pool(chunks=chunks, on_result=on_result)
 
         # Merge the results
-        result = self.merge(results)
+        if assembler is not None:
+            result = assembler.assemble(merge=self.merge)
+        else:
+            result = self.merge(results)
 
-        # Return the result
-        return result
+        # Remove the duplicates spanning chunks and return the result
+        return self.dedup(result)
@@ -0,0 +1,234 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pydantic import BaseModel
+
+from src.block_base import BlockBase
+from src.runners.fused import can_fuse
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the chunks on a stage queue
+_DONE = object()
+
+
+def is_row_local(block: BlockBase) -> bool:
+    """Return whether the stage can run chunk by chunk without changing the result."""
+    return block.row_local or can_fuse(block)
+
+
+class StageMetrics(BaseModel):
+    """What a single pipeline stage spent its time on.
+
+    A stage whose input queue is usually full (high mean_occupancy) and whose
+    workers are rarely starved is the bottleneck, the stages before it spend
+    their time blocked on putting into its queue.
+    """
+
+    # Name of the block run by the stage
+    name: str
+    # Number of worker threads running the stage
+    concurrency: int
+    # Capacity of the input queue of the stage
+    queue_size: int
+
+    # Number of chunks processed
+    num_chunks: int = 0
+    # Seconds spent running the block, summed over the workers
+    busy_time: float = 0.0
+    # Seconds spent waiting for the previous stage to produce a chunk
+    starved_time: float = 0.0
+    # Seconds spent waiting for room in the queue of the next stage
+    blocked_time: float = 0.0
+
+    # Input queue occupancy sampled every time a worker takes a chunk
+    occupancy_samples: int = 0
+    occupancy_total: int = 0
+    max_occupancy: int = 0
+
+    @property
+    def mean_occupancy(self) -> float:
+        """Return the mean number of chunks waiting in the input queue"""
+        if self.occupancy_samples == 0:
+            return 0.0
+        return self.occupancy_total / self.occupancy_samples
+
+    def utilization(self, wall_time: float) -> float:
+        """Return the fraction of the wall time the workers of the stage were busy"""
+        if wall_time <= 0:
+            return 0.0
+        return self.busy_time / (wall_time * self.concurrency)
+
+
+class Pipeline:
+    """Run chunks through a chain of stages connected by bounded queues.
+
+    Every stage has its own worker threads, so stage N+1 works on chunk k while
+    stage N produces chunk k+1. The queues hold at most queue_size chunks, which
+    bounds memory and applies back pressure to stages running ahead of the
+    bottleneck. Results are returned in chunk order.
+    """
+
+    def __init__(
+        self,
+        stages: List[Tuple[str, Callable[[pd.DataFrame], pd.DataFrame]]],
+        concurrency: Optional[List[int]] = None,
+        queue_size: int = 2,
+    ):
+        if not stages:
+            raise ValueError("At least one stage must be given")
+        concurrency = concurrency or [1] * len(stages)
+        if len(concurrency) != len(stages):
+            raise ValueError("concurrency must have one entry per stage")
+        if any(count <= 0 for count in concurrency):
+            raise ValueError("Stage concurrency must be greater than 0")
+        if queue_size <= 0:
+            raise ValueError("queue_size must be greater than 0")
+
+        self.stages = stages
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.metrics = [
+            StageMetrics(name=name, concurrency=count, queue_size=queue_size)
+            for (name, _), count in zip(stages, concurrency)
+        ]
+        self.wall_time = 0.0
+
+        # Run state
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def bottleneck(self) -> StageMetrics:
+        """Return the metrics of the stage with the highest utilization"""
+        return max(self.metrics, key=lambda m: m.utilization(self.wall_time))
+
+    def _fail(self, error: BaseException) -> None:
+        """Record the first error, every stage then drops the chunks it receives."""
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._failed.set()
+
+    def _feed(self, chunks: List[pd.DataFrame], output: queue.Queue) -> None:
+        """Put the chunks on the queue of the first stage."""
+        for index, chunk in enumerate(chunks):
+            if self._failed.is_set():
+                break
+            output.put((index, chunk))
+        for _ in range(self.concurrency[0]):
+            output.put(_DONE)
+
+    def _work(
+        self,
+        stage: int,
+        input_queue: queue.Queue,
+        output_queue: queue.Queue,
+        remaining: List[int],
+        num_done: int,
+    ) -> None:
+        """Run the block of the stage on every chunk taken from its input queue."""
+        _, fn = self.stages[stage]
+        metrics = self.metrics[stage]
+        while True:
+            start = time.perf_counter()
+            occupancy = input_queue.qsize()
+            item = input_queue.get()
+            waited = time.perf_counter() - start
+
+            if item is _DONE:
+                # The last worker of the stage tells the next stage it is done
+                with self._lock:
+                    remaining[stage] -= 1
+                    last = remaining[stage] == 0
+                if last:
+                    for _ in range(num_done):
+                        output_queue.put(_DONE)
+                return
+
+            # Drain the queue without doing any work once a stage has failed
+            if self._failed.is_set():
+                continue
+
+            index, chunk = item
+            start = time.perf_counter()
+            try:
+                result = fn(chunk)
+            except BaseException as e:
+                logger.debug(f"Stage {metrics.name} failed on chunk {index}: {e}")
+                self._fail(e)
+                continue
+            busy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            output_queue.put((index, result))
+            blocked = time.perf_counter() - start
+
+            with self._lock:
+                metrics.num_chunks += 1
+                metrics.busy_time += busy
+                metrics.starved_time += waited
+                metrics.blocked_time += blocked
+                metrics.occupancy_samples += 1
+                metrics.occupancy_total += occupancy
+                metrics.max_occupancy = max(metrics.max_occupancy, occupancy)
+
+    def run(self, chunks: List[pd.DataFrame]) -> List[Any]:
+        """Push the chunks through every stage and return the results in chunk order."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        # The results are collected by this thread, so the last queue is unbounded
+        queues.append(queue.Queue())
+        remaining = list(self.concurrency)
+        num_done = self.concurrency[1:] + [1]
+
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(chunks, queues[0]), name="pipeline-feed"
+            )
+        ]
+        for stage, count in enumerate(self.concurrency):
+            for i in range(count):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(
+                            stage,
+                            queues[stage],
+                            queues[stage + 1],
+                            remaining,
+                            num_done[stage],
+                        ),
+                        name=f"pipeline-{self.metrics[stage].name}-{i}",
+                    )
+                )
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        results: Dict[int, Any] = {}
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            index, result = item
+            results[index] = result
+
+        for thread in threads:
+            thread.join()
+        self.wall_time = time.perf_counter() - start
+
+        if self._error is not None:
+            raise self._error
+        for metrics in self.metrics:
+            logger.debug(
+                f"Stage {metrics.name}: {metrics.num_chunks} chunks, "
+                f"utilization {metrics.utilization(self.wall_time):.0%}, "
+                f"mean queue occupancy {metrics.mean_occupancy:.2f}/{metrics.queue_size}"
+            )
+        return [results[index] for index in range(len(chunks))]
@@ -0,0 +1,366 @@
+import logging
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, List, Optional, Tuple
+
+import typer
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+
+# Every message is a pickled tuple prefixed with its length as an unsigned 64 bit int
+HEADER = struct.Struct("!Q")
+# Prefix of unix socket addresses, anything else is treated as host:port
+UNIX_PREFIX = "unix:"
+
+
+####################################################################################################
+# Wire protocol                                                                                    #
+####################################################################################################
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """Parse "host:port" or "unix:/path/to/socket" into a socket family and address."""
+    if address.startswith(UNIX_PREFIX):
+        return socket.AF_UNIX, address[len(UNIX_PREFIX) :]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid worker address: {address}")
+    return socket.AF_INET, (host, int(port))
+
+
+def connect(address: str, timeout: Optional[float] = None) -> socket.socket:
+    """Open a connection to the worker listening on the given address."""
+    family, addr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(addr)
+    except OSError:
+        sock.close()
+        raise
+    sock.settimeout(None)
+    return sock
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from the socket."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Connection closed by peer")
+        received += count
+    return bytes(buffer)
+
+
+def send_message(sock: socket.socket, message: Any) -> None:
+    """Pickle the message and send it with its length prefix."""
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def recv_payload(sock: socket.socket) -> bytes:
+    """Receive a single length prefixed payload."""
+    (size,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return _recv_exact(sock, size)
+
+
+def recv_message(sock: socket.socket) -> Any:
+    """Receive and unpickle a single message."""
+    return pickle.loads(recv_payload(sock))
+
+
+####################################################################################################
+# Worker daemon                                                                                    #
+####################################################################################################
+
+
+class WorkerHandler(socketserver.BaseRequestHandler):
+    """Serve a single client connection, one task at a time.
+
+    Messages:
+        ("ping",)                   -> ("pong", pid)
+        ("task", fn, args, kwargs)  -> ("ok", result) or ("error", exception)
+    """
+
+    def handle(self) -> None:
+        while True:
+            try:
+                payload = recv_payload(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                message = pickle.loads(payload)
+                if message[0] == "ping":
+                    reply = ("pong", os.getpid())
+                else:
+                    _, fn, args, kwargs = message
+                    reply = ("ok", fn(*args, **kwargs))
+            except Exception as e:
+                reply = ("error", e)
+            try:
+                send_message(self.request, reply)
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                # The result could not be pickled, report that instead
+                send_message(self.request, ("error", RuntimeError(str(e))))
+
+
+class TCPWorkerServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class UnixWorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(address: str) -> socketserver.BaseServer:
+    """Create (and bind) a worker server for the given address."""
+    family, addr = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(addr):
+            os.unlink(addr)
+        return UnixWorkerServer(addr, WorkerHandler)
+    return TCPWorkerServer(addr, WorkerHandler)
+
+
+@app.command()
+def serve(address: str = "127.0.0.1:0"):
+    """Run a worker daemon that executes block tasks sent over the socket.
+
+    Tasks are pickled, only listen on addresses reachable by trusted clients.
+    """
+    server = create_server(address)
+    if isinstance(server, UnixWorkerServer):
+        bound = f"{UNIX_PREFIX}{server.server_address}"
+    else:
+        host, port = server.server_address[:2]
+        bound = f"{host}:{port}"
+    print(f"Worker {os.getpid()} listening on {bound}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+####################################################################################################
+# Client executor                                                                                  #
+####################################################################################################
+
+
+class _Task:
+    """A submitted call and the number of times it was sent to a worker."""
+
+    def __init__(self, future: Future, fn: Callable, args: tuple, kwargs: dict):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.attempts = 0
+
+
+class RemoteExecutor(Executor):
+    """Executor that runs calls on worker daemons reached over TCP / unix sockets.
+
+    One dispatcher thread per worker connection pulls tasks from a shared queue,
+    so faster workers take more tasks. Idle connections are health checked with
+    a ping every health_interval seconds. When a worker dies mid task the task
+    is requeued for the remaining workers (up to max_attempts sends) and the
+    dispatcher keeps trying to reconnect. If no worker has been reachable for
+    unavailable_timeout seconds the queued tasks fail with a ConnectionError.
+    """
+
+    def __init__(
+        self,
+        addresses: List[str],
+        connections_per_worker: int = 1,
+        health_interval: float = 1.0,
+        max_attempts: int = 3,
+        connect_timeout: float = 5.0,
+        unavailable_timeout: float = 30.0,
+    ):
+        if not addresses:
+            raise ValueError("At least one worker address must be given")
+        for address in addresses:
+            parse_address(address)
+        self.addresses = addresses
+        self.health_interval = health_interval
+        self.max_attempts = max_attempts
+        self.connect_timeout = connect_timeout
+        self.unavailable_timeout = unavailable_timeout
+
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._healthy: set = set()
+        self._last_healthy = time.monotonic()
+
+        self._threads = [
+            threading.Thread(
+                target=self._dispatch,
+                args=(address, f"{address}#{i}"),
+                name=f"remote-executor-{address}-{i}",
+                daemon=True,
+            )
+            for address in addresses
+            for i in range(connections_per_worker)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def max_workers(self) -> int:
+        """Return the number of worker connections"""
+        return len(self._threads)
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) to run on the first free worker."""
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future = Future()
+            self._queue.append(_Task(future, fn, args, kwargs))
+            self._condition.notify()
+            return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop accepting tasks, dispatchers exit once the queue is drained."""
+        with self._condition:
+            self._shutdown = True
+            if cancel_futures:
+                while self._queue:
+                    self._queue.popleft().future.cancel()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _mark(self, connection_id: str, healthy: bool) -> None:
+        """Record whether the given connection is healthy."""
+        with self._condition:
+            if healthy:
+                self._healthy.add(connection_id)
+                self._last_healthy = time.monotonic()
+            else:
+                self._healthy.discard(connection_id)
+
+    def _requeue(self, task: _Task, error: Exception) -> None:
+        """Put a task that was lost with its worker back at the front of the queue."""
+        if task.attempts >= self.max_attempts:
+            task.future.set_exception(
+                ConnectionError(f"Task lost {task.attempts} times, last error: {error}")
+            )
+            return
+        with self._condition:
+            self._queue.appendleft(task)
+            self._condition.notify()
+
+    def _fail_if_unavailable(self) -> None:
+        """Fail the queued tasks when no worker has been reachable for too long."""
+        with self._condition:
+            unavailable_for = time.monotonic() - self._last_healthy
+            if self._healthy or unavailable_for < self.unavailable_timeout:
+                return
+            while self._queue:
+                task = self._queue.popleft()
+                if task.attempts or task.future.set_running_or_notify_cancel():
+                    task.future.set_exception(
+                        ConnectionError(
+                            f"No worker reachable for {unavailable_for:.1f} seconds"
+                        )
+                    )
+
+    def _next_task(self) -> Tuple[bool, Optional[_Task]]:
+        """Wait up to health_interval for a task, returns (done, task)."""
+        with self._condition:
+            if not self._queue and not self._shutdown:
+                self._condition.wait(timeout=self.health_interval)
+            if self._queue:
+                return False, self._queue.popleft()
+            return self._shutdown, None
+
+    def _dispatch(self, address: str, connection_id: str) -> None:
+        """Send queued tasks to the worker at address, one at a time."""
+        sock = None
+        try:
+            while True:
+                # (Re)connect to the worker before taking a task
+                if sock is None:
+                    with self._condition:
+                        if self._shutdown and not self._queue:
+                            return
+                    try:
+                        sock = connect(address, timeout=self.connect_timeout)
+                        self._mark(connection_id, healthy=True)
+                    except OSError as e:
+                        logger.debug(f"Worker {address} is unreachable: {e}")
+                        self._mark(connection_id, healthy=False)
+                        self._fail_if_unavailable()
+                        time.sleep(self.health_interval)
+                        continue
+
+                done, task = self._next_task()
+                if done:
+                    return
+
+                # Nothing to do, check the worker is still alive
+                if task is None:
+                    try:
+                        send_message(sock, ("ping",))
+                        recv_message(sock)
+                        self._mark(connection_id, healthy=True)
+                    except (ConnectionError, OSError) as e:
+                        logger.debug(f"Worker {address} failed health check: {e}")
+                        self._mark(connection_id, healthy=False)
+                        sock.close()
+                        sock = None
+                    continue
+
+                # The future may have been cancelled while queued
+                if (
+                    task.attempts == 0
+                    and not task.future.set_running_or_notify_cancel()
+                ):
+                    continue
+
+                task.attempts += 1
+                try:
+                    send_message(sock, ("task", task.fn, task.args, task.kwargs))
+                    status, value = recv_message(sock)
+                except (ConnectionError, OSError) as e:
+                    logger.debug(f"Worker {address} died while running a task: {e}")
+                    self._mark(connection_id, healthy=False)
+                    sock.close()
+                    sock = None
+                    self._requeue(task, e)
+                    continue
+                except Exception as e:
+                    # The task itself could not be pickled
+                    task.future.set_exception(e)
+                    continue
+
+                self._mark(connection_id, healthy=True)
+                if status == "ok":
+                    task.future.set_result(value)
+                else:
+                    task.future.set_exception(value)
+        finally:
+            if sock is not None:
+                sock.close()
+
+
+if __name__ == "__main__":
+    app()
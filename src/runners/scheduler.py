@@ -0,0 +1,141 @@
+import logging
+import statistics
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.tracing import merge_spans
+
+logger = logging.getLogger(__name__)
+
+# Number of finished tasks required before stragglers are detected
+MIN_SAMPLES: int = 3
+# How often (in seconds) running tasks are checked for stragglers
+POLL_INTERVAL: float = 0.05
+
+
+class DynamicScheduler:
+    """Hand out many small tasks dynamically and speculatively re-run stragglers.
+
+    At most `workers` tasks are in flight, so a worker picks up the next task as
+    soon as it is free instead of being assigned a fixed partition up front.
+    Once the queue is drained, any running task that has taken longer than
+    `speculation_factor` times the median task time is submitted a second time
+    and whichever copy finishes first is kept.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        fn: Callable[[pd.DataFrame], pd.DataFrame],
+        tasks: List[pd.DataFrame],
+        workers: int,
+        speculation_factor: Optional[float] = 3.0,
+        min_samples: int = MIN_SAMPLES,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.executor = executor
+        self.fn = fn
+        self.tasks = tasks
+        self.workers = workers
+        self.speculation_factor = speculation_factor
+        self.min_samples = min_samples
+        self.poll_interval = poll_interval
+
+        # Scheduling state
+        self.pending = deque(range(len(tasks)))
+        self.running: Dict[Future, Tuple[int, float, bool]] = {}
+        self.copies: Dict[int, int] = {}
+        self.speculated: set = set()
+        self.results: Dict[int, Any] = {}
+        self.durations: List[float] = []
+
+        # Counters
+        self.num_speculative = 0
+        self.num_speculative_wins = 0
+
+    def submit(self, index: int, speculative: bool = False) -> None:
+        """Submit a (possibly speculative) copy of task index."""
+        future = self.executor.submit(self.fn, self.tasks[index])
+        self.running[future] = (index, time.perf_counter(), speculative)
+        self.copies[index] = self.copies.get(index, 0) + 1
+
+    def fill(self) -> None:
+        """Keep the workers busy with pending tasks."""
+        while self.pending and len(self.running) < self.workers:
+            self.submit(self.pending.popleft())
+
+    def speculate(self) -> None:
+        """Submit a second copy of running tasks that are much slower than the median."""
+        if self.speculation_factor is None or self.pending:
+            return
+        if len(self.durations) < self.min_samples:
+            return
+        threshold = self.speculation_factor * statistics.median(self.durations)
+        now = time.perf_counter()
+        for index, start, _ in list(self.running.values()):
+            if len(self.running) >= self.workers:
+                return
+            if index in self.speculated or index in self.results:
+                continue
+            if now - start > threshold:
+                logger.debug(
+                    f"Speculatively re-running task {index} after {now - start:.3f}s"
+                )
+                self.speculated.add(index)
+                self.num_speculative += 1
+                self.submit(index, speculative=True)
+
+    def collect(self, future: Future, on_result: Callable) -> None:
+        """Record a finished copy, keeping only the first copy of each task to finish."""
+        index, start, speculative = self.running.pop(future)
+        self.copies[index] -= 1
+        if index in self.results:
+            return
+        try:
+            result = merge_spans(future.result())
+        except Exception as e:
+            # Another copy of the task may still succeed
+            if self.copies[index] > 0:
+                logger.debug(f"Copy of task {index} failed with error: {e}")
+                return
+            raise e
+        if speculative:
+            self.num_speculative_wins += 1
+        self.results[index] = result
+        self.durations.append(time.perf_counter() - start)
+        if on_result is not None:
+            on_result(index, result)
+
+    def run(self, on_result: Callable[[int, Any], None] = None) -> List[Any]:
+        """Run every task and return the results in task order.
+
+        Args:
+            on_result: Optional callback called with (task index, result) as each task finishes.
+        Returns:
+            results: The result of every task, in task order.
+        """
+        try:
+            while len(self.results) < len(self.tasks):
+                self.fill()
+                self.speculate()
+                done, _ = wait(
+                    self.running,
+                    timeout=self.poll_interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self.collect(future, on_result)
+        finally:
+            # Losing copies cannot be stopped once running, only the queued ones are cancelled
+            for future in self.running:
+                future.cancel()
+
+        logger.debug(
+            f"Ran {len(self.tasks)} tasks with {self.num_speculative} speculative copies "
+            f"({self.num_speculative_wins} won)"
+        )
+        return [self.results[i] for i in range(len(self.tasks))]
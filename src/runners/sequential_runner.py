@@ -1,9 +1,20 @@
 import logging
-from typing import Dict
+from contextlib import nullcontext
+from typing import ContextManager, Dict, List, Optional, Tuple
 
 import pandas as pd
+from pydantic import PrivateAttr, model_validator
 
 from src.block_base import BlockBase
+from src.blocks.simple.compact.compact_block import (CompactBlock,
+                                                     CompactBlockParams)
+from src.runners.checkpoint import CheckpointStore
+from src.runners.fused import fuse_stages
+from src.runners.parallel_runner import chunk_bounds
+from src.runners.pipeline import Pipeline, StageMetrics, is_row_local
+from src.utils.schema import (Schema, checked_blocks, frame_schema,
+                              merge_checks, schema_checked)
+from src.utils.tracing import with_parent
 from src.utils.wrapper import log_run_info
 
 
@@ -11,24 +22,219 @@ class SequentialRunner(BlockBase):
 
     block_map: Dict[int, BlockBase]
 
+    # Fuse consecutive ParallelRunner stages over row local blocks so the data
+    # is split and merged once for the whole chain (see fused.py)
+    fuse_parallel: bool = False
+
+    # Pipeline the stages: the input is split into chunks that flow through
+    # bounded queues, so block N+1 works on chunk k while block N produces
+    # chunk k+1. Every block must be row local (see pipeline.py)
+    pipelined: bool = False
+    # Two different ways of chunking the input when pipelined
+    num_chunks: int = None
+    chunk_size: int = None
+    # Number of worker threads per stage (keyed by order), defaults to 1
+    stage_concurrency: Dict[int, int] = {}
+    # Maximum number of chunks waiting between two stages
+    queue_size: int = 2
+
+    # Persist the output of every stage here, so a rerun skips the stages whose
+    # input and params are unchanged and resumes from the first invalid or
+    # failed stage (see checkpoint.py). None disables checkpointing
+    checkpoint_dir: Optional[str] = None
+
+    # Compact the output of every stage with a CompactBlock, so later stages
+    # (and checkpoints) move less data. Only lossless changes are allowed (no
+    # integer downcasts a later stage could overflow, no forced float32), by
+    # default only floats that keep their values are downcast. Strings only become
+    # categoricals if compact_params.categories is set, which is only safe if no
+    # later stage writes new values to them (see CompactBlock). Not supported when
+    # pipelined, chunks compacted separately would not share categories
+    compact: bool = False
+    compact_params: CompactBlockParams = CompactBlockParams(
+        integers=False, categories=False
+    )
+
+    # Schema of the input (see utils/schema.py), when given every stage is checked
+    # against it at build time. Every run checks the stages once on the schema of
+    # its actual input, so blocks whose input is proven valid skip validate_columns
+    source_schema: Optional[Schema] = None
+
+    # Stage metrics of the last pipelined run
+    _pipeline_metrics: Optional[List[StageMetrics]] = PrivateAttr(default=None)
+    # Bytes saved per column by compacting the output of every stage (keyed by order)
+    _compact_reports: Dict[int, pd.DataFrame] = PrivateAttr(default_factory=dict)
+
+    @property
+    def pipeline_metrics(self) -> Optional[List[StageMetrics]]:
+        """Return the per stage metrics of the last pipelined run"""
+        return self._pipeline_metrics
+
+    @property
+    def compact_reports(self) -> Dict[int, pd.DataFrame]:
+        """Return the compaction report of every stage of the last run"""
+        return self._compact_reports
+
+    @model_validator(mode="after")
+    def check_source_schema(self) -> "SequentialRunner":
+        """Check every stage against the source schema when the runner is built."""
+        if self.source_schema is not None:
+            self.check_schema(self.source_schema)
+        return self
+
+    def check_schema(
+        self, input_schema: Optional[Schema]
+    ) -> Tuple[Dict[str, bool], Optional[Schema]]:
+        """Propagate the schema through the stages in order, checking every stage."""
+        return self.check_stages(self.ordered_blocks(), input_schema)
+
+    def check_stages(
+        self,
+        ordered_blocks: List[Tuple[int, BlockBase]],
+        input_schema: Optional[Schema],
+    ) -> Tuple[Dict[str, bool], Optional[Schema]]:
+        """Propagate the schema through the given stages in order, checking every stage."""
+        if input_schema is None:
+            return {self.id: False}, None
+        checks, schema = {self.id: True}, input_schema
+        for _, block in ordered_blocks:
+            block_checks, schema = block.check_schema(schema)
+            checks = merge_checks(checks, block_checks)
+        return checks, schema
+
+    def checked(
+        self, ordered_blocks: List[Tuple[int, BlockBase]], input_df: pd.DataFrame
+    ) -> ContextManager:
+        """Return the context of a run checking the stages once on the schema of its
+        input, unless an enclosing runner already checked them."""
+        if self.id in checked_blocks():
+            return nullcontext()
+        return schema_checked(
+            self.check_stages(ordered_blocks, frame_schema(input_df))[0]
+        )
+
     def validate(self, input_df: pd.DataFrame) -> None:
         """Override the validate method to add additional validation."""
         pass
 
+    def validate_runner(self) -> None:
+        """Simple validation on the compaction and pipelining params."""
+        if self.compact and (
+            self.compact_params.integers or self.compact_params.float32
+        ):
+            raise ValueError(
+                "Compacting the stages only allows lossless changes, set integers and float32 to False"
+            )
+        if not self.pipelined:
+            return
+        if self.checkpoint_dir is not None:
+            raise ValueError("Pipelined runs can not be checkpointed")
+        if self.compact:
+            raise ValueError("Pipelined runs can not be compacted")
+        if self.num_chunks is not None and self.chunk_size is not None:
+            raise ValueError("Only one of num_chunks or chunk_size must be specified")
+        if self.num_chunks is None and self.chunk_size is None:
+            raise ValueError("Either num_chunks or chunk_size must be specified")
+        unknown = set(self.stage_concurrency) - set(self.block_map)
+        if unknown:
+            raise ValueError(f"stage_concurrency has no block with order {unknown}")
+        for order, block in self.block_map.items():
+            if not is_row_local(block):
+                raise ValueError(
+                    f"Block {block.__class__.__name__} with order {order} is not row local and cannot be pipelined"
+                )
+
+    def ordered_blocks(self) -> List[Tuple[int, BlockBase]]:
+        """Return the (order, block) stages to run, fusing parallel stages if enabled."""
+        ordered_blocks = sorted(self.block_map.items(), key=lambda x: x[0])
+        if self.fuse_parallel:
+            ordered_blocks = fuse_stages(ordered_blocks)
+        return ordered_blocks
+
     def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
         """Run the blocks that the runner was initialized with in order
         from the first block to the last block. Passing the result of the
         previous block to the next block."""
+        self.validate_runner()
+
+        # Sort the blocks by order, checking their schemas once for the whole run
+        ordered_blocks = self.ordered_blocks()
+        with self.checked(ordered_blocks, input_df):
+            if self.pipelined:
+                return self.run_pipelined(ordered_blocks, input_df)
+            return self.run_stages(ordered_blocks, input_df)
+
+    def run_stages(
+        self, ordered_blocks: List[Tuple[int, BlockBase]], input_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Run the stages one after the other on the whole input."""
         result = input_df
+        compact_reports = {}
 
-        # Sort the blocks by order
-        ordered_blocks = sorted(self.block_map.items(), key=lambda x: x[0])
+        # Skip the stages completed by an earlier run with the same input and params
+        start = 0
+        if self.checkpoint_dir is not None:
+            store = CheckpointStore(self.checkpoint_dir)
+            keys = store.stage_keys(input_df, [block for _, block in ordered_blocks])
+            start = store.resume_point(keys)
+            if start > 0:
+                logging.info(f"Resuming after {start} completed stages")
+                result = store.load_output(start - 1)
 
         # Run in order
-        for order, block in ordered_blocks:
+        for index, (order, block) in enumerate(ordered_blocks[start:], start=start):
             logging.debug(f"Running block {block.__class__} with order {order}")
             result = block(result)
             logging.debug(f"Completed block {block.__class__} with order {order}")
+            if self.compact:
+                result, compact_reports[order] = self.compact_output(order, result)
+            if self.checkpoint_dir is not None:
+                store.save_output(index, order, block, keys[index], result)
+
+        # Keep the reports of this run as a whole, so a concurrent run never mixes in
+        self._compact_reports = compact_reports
 
         # Return the result
         return result
+
+    def compact_output(
+        self, order: int, result: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Return the compacted output of the stage with the given order and its report."""
+        compact_block = CompactBlock(params=self.compact_params)
+        compact_block.validate(result)
+        result, report = compact_block.compact(result)
+        logging.debug(
+            f"Compacting the output of order {order} saved {report['bytes_saved'].sum()} bytes"
+        )
+        return result, report
+
+    def run_pipelined(
+        self, ordered_blocks: List[Tuple[int, BlockBase]], input_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Run the stages as a pipeline over the chunks of the input."""
+        pipeline = Pipeline(
+            stages=[
+                (block.__class__.__name__, with_parent(block))
+                for _, block in ordered_blocks
+            ],
+            concurrency=[
+                self.stage_concurrency.get(order, 1) for order, _ in ordered_blocks
+            ],
+            queue_size=self.queue_size,
+        )
+        chunks = [
+            input_df.iloc[start:stop]
+            for start, stop in chunk_bounds(
+                len(input_df), num_chunks=self.num_chunks, chunk_size=self.chunk_size
+            )
+        ]
+        logging.debug(
+            f"Pipelining {len(chunks)} chunks through {len(ordered_blocks)} stages"
+        )
+        try:
+            results = pipeline.run(chunks)
+        finally:
+            self._pipeline_metrics = pipeline.metrics
+        logging.debug(f"Pipeline bottleneck is stage {pipeline.bottleneck.name}")
+        return pd.concat(results)
@@ -0,0 +1,393 @@
+import logging
+import time
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# numpy dtype kinds that can be placed in shared memory as flat buffers (bool, int, uint, float)
+SHAREABLE_KINDS: str = "biuf"
+# How many times, and how long apart, a chunk retries attaching to an output
+# buffer that another chunk created but has not sized yet
+ATTACH_RETRIES: int = 100
+ATTACH_DELAY: float = 0.01
+
+
+def is_shareable(dtype: Any) -> bool:
+    """Return whether a column dtype can be placed in shared memory."""
+    return isinstance(dtype, np.dtype) and dtype.kind in SHAREABLE_KINDS
+
+
+class SharedColumnSpec(BaseModel):
+    """Location of a single column buffer in shared memory."""
+
+    position: int
+    shm_name: str
+    dtype: str
+
+
+class SharedFrameSpec(BaseModel):
+    """Picklable description of a frame whose numeric columns live in shared memory,
+    as rows [offset:offset + length] of the column buffers."""
+
+    columns: List[Any]
+    dtypes: List[str]
+    shared: List[SharedColumnSpec]
+    length: int
+    offset: int = 0
+
+    @property
+    def shared_positions(self) -> List[int]:
+        """Return the positions of the columns stored in shared memory"""
+        return [column.position for column in self.shared]
+
+    @property
+    def local_positions(self) -> List[int]:
+        """Return the positions of the columns that are shipped with each chunk"""
+        shared_positions = set(self.shared_positions)
+        return [i for i in range(len(self.columns)) if i not in shared_positions]
+
+
+def attach(spec: SharedFrameSpec) -> List[shared_memory.SharedMemory]:
+    """Attach to the shared memory segments described by the spec."""
+    return [shared_memory.SharedMemory(name=column.shm_name) for column in spec.shared]
+
+
+def views(
+    spec: SharedFrameSpec,
+    segments: List[shared_memory.SharedMemory],
+    start: int = 0,
+    stop: Optional[int] = None,
+    writeable: bool = False,
+) -> List[np.ndarray]:
+    """Return zero copy numpy views over rows [start:stop] of every shared column."""
+    stop = spec.length if stop is None else stop
+    result = []
+    for column, segment in zip(spec.shared, segments):
+        dtype = np.dtype(column.dtype)
+        view = np.ndarray(
+            (spec.length,),
+            dtype=dtype,
+            buffer=segment.buf,
+            offset=spec.offset * dtype.itemsize,
+        )
+        view = view[start:stop]
+        view.flags.writeable = writeable
+        result.append(view)
+    return result
+
+
+def close(segments: List[shared_memory.SharedMemory]) -> None:
+    """Close the given segments, leaving them to the gc if views are still exported."""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            logger.debug(f"Shared memory segment {segment.name} still has views")
+
+
+class MappedColumn:
+    """Rows [start:stop] of a shared column, exposed through __array_interface__.
+
+    np.asarray over it returns an array whose base is this object, so the
+    segment stays mapped for as long as the array is alive, even once unlinked.
+    Unlike a view through the buffer protocol it holds no export, so the segment
+    closes cleanly when the array is collected.
+    """
+
+    def __init__(
+        self, segment: shared_memory.SharedMemory, dtype: Any, start: int, stop: int
+    ):
+        self.segment = segment
+        dtype = np.dtype(dtype)
+        address = np.frombuffer(segment.buf, dtype=np.uint8).ctypes.data
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": (stop - start,),
+            "typestr": dtype.str,
+            "data": (address + start * dtype.itemsize, False),
+        }
+
+
+def mapped(
+    spec: SharedFrameSpec, segments: List[shared_memory.SharedMemory]
+) -> List[np.ndarray]:
+    """Return writeable arrays over the rows of every shared column of the spec,
+    that keep their segment mapped after it is closed and unlinked by its owner."""
+    return [
+        np.asarray(
+            MappedColumn(segment, column.dtype, spec.offset, spec.offset + spec.length)
+        )
+        for column, segment in zip(spec.shared, segments)
+    ]
+
+
+class SharedFrame:
+    """Owner of the shared memory segments backing the numeric columns of a frame.
+
+    Only the process that created the SharedFrame unlinks the segments, workers
+    attach to them through the picklable SharedFrameSpec.
+    """
+
+    def __init__(
+        self, spec: SharedFrameSpec, segments: List[shared_memory.SharedMemory]
+    ):
+        self.spec = spec
+        self.segments = segments
+
+    @classmethod
+    def allocate(cls, columns: List[Any], dtypes: List[Any], length: int):
+        """Allocate (uninitialized) shared buffers for every shareable column."""
+        shared, segments = [], []
+        try:
+            for position, dtype in enumerate(dtypes):
+                if not is_shareable(dtype):
+                    continue
+                segment = shared_memory.SharedMemory(
+                    create=True, size=max(1, dtype.itemsize * length)
+                )
+                segments.append(segment)
+                shared.append(
+                    SharedColumnSpec(
+                        position=position, shm_name=segment.name, dtype=dtype.str
+                    )
+                )
+        except Exception:
+            cls(spec=None, segments=segments).release()
+            raise
+        spec = SharedFrameSpec(
+            columns=list(columns),
+            dtypes=[str(dtype) for dtype in dtypes],
+            shared=shared,
+            length=length,
+        )
+        return cls(spec=spec, segments=segments)
+
+    @classmethod
+    def from_frame(cls, input_df: pd.DataFrame):
+        """Copy the shareable columns of the frame into shared memory once."""
+        shared_frame = cls.allocate(
+            columns=input_df.columns, dtypes=list(input_df.dtypes), length=len(input_df)
+        )
+        for column, view in zip(
+            shared_frame.spec.shared, shared_frame.views(writeable=True)
+        ):
+            view[:] = input_df.iloc[:, column.position].to_numpy()
+        return shared_frame
+
+    def views(
+        self, start: int = 0, stop: Optional[int] = None, writeable: bool = False
+    ) -> List[np.ndarray]:
+        """Return views over rows [start:stop] of every shared column."""
+        return views(self.spec, self.segments, start, stop, writeable)
+
+    def release(self) -> None:
+        """Close and unlink every segment."""
+        close(self.segments)
+        for segment in self.segments:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self.segments = []
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+def build_chunk(
+    spec: SharedFrameSpec,
+    arrays: List[np.ndarray],
+    local_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """Rebuild a chunk from shared column views and the locally shipped columns.
+
+    Columns are placed by position, so duplicate column names are kept.
+
+    Args:
+        spec: The spec of the shared input frame.
+        arrays: Views over the chunk rows of every shared column.
+        local_df: The non shared columns of the chunk, also carrying the chunk index.
+    Returns:
+        chunk: The chunk, sharing memory with the shared columns.
+    """
+    data = dict(zip(spec.shared_positions, arrays))
+    for local_position, position in enumerate(spec.local_positions):
+        data[position] = local_df.iloc[:, local_position].array
+    chunk = pd.DataFrame(
+        {position: data[position] for position in range(len(spec.columns))},
+        index=local_df.index,
+        copy=False,
+    )
+    chunk.columns = pd.Index(spec.columns)
+    return chunk
+
+
+def detach(shared_frame: SharedFrame) -> SharedFrameSpec:
+    """Close the segments of a frame without unlinking them and return its spec, the
+    process attaching to them through the spec becomes responsible for unlinking."""
+    close(shared_frame.segments)
+    shared_frame.segments = []
+    return shared_frame.spec
+
+
+def unlink(spec: SharedFrameSpec) -> None:
+    """Unlink the segments of a detached frame that will not be assembled."""
+    for column in spec.shared:
+        try:
+            segment = shared_memory.SharedMemory(name=column.shm_name)
+        except FileNotFoundError:
+            continue
+        SharedFrame(spec=spec, segments=[segment]).release()
+
+
+def output_buffer(name: str, size: int) -> shared_memory.SharedMemory:
+    """Create the output buffer of a column, or attach to it if another chunk did."""
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        pass
+    # The chunk that created it may not have sized it yet, it can not be mapped until then
+    for _ in range(ATTACH_RETRIES):
+        try:
+            return shared_memory.SharedMemory(name=name)
+        except ValueError:
+            time.sleep(ATTACH_DELAY)
+    raise TimeoutError(f"Shared memory output buffer {name} was never sized")
+
+
+def write_output(
+    result_df: pd.DataFrame, prefix: str, num_rows: int, start: int
+) -> SharedFrameSpec:
+    """Write the shareable columns of a chunk result at rows [start:start + len] of
+    the output buffers of the run, one per column over all num_rows rows.
+
+    A buffer is named after the run prefix, the column position and its dtype,
+    so the chunks that agree on a column write into the same buffer.
+    """
+    shared, segments = [], []
+    try:
+        for position, dtype in enumerate(result_df.dtypes):
+            if not is_shareable(dtype):
+                continue
+            segment = output_buffer(
+                f"{prefix}_{position}_{dtype.name}", max(1, dtype.itemsize * num_rows)
+            )
+            segments.append(segment)
+            shared.append(
+                SharedColumnSpec(
+                    position=position, shm_name=segment.name, dtype=dtype.str
+                )
+            )
+        spec = SharedFrameSpec(
+            columns=list(result_df.columns),
+            dtypes=[str(dtype) for dtype in result_df.dtypes],
+            shared=shared,
+            length=len(result_df),
+            offset=start,
+        )
+        for column, view in zip(shared, views(spec, segments, writeable=True)):
+            view[:] = result_df.iloc[:, column.position].to_numpy()
+    except Exception:
+        # The run fails with this chunk, its buffers are of no use to the other chunks
+        for segment in segments:
+            SharedFrame(spec=None, segments=[segment]).release()
+        raise
+    close(segments)
+    return spec
+
+
+def run_shared_chunk(
+    block: Any,
+    input_spec: SharedFrameSpec,
+    local_df: pd.DataFrame,
+    start: int,
+    stop: int,
+    output_prefix: str,
+) -> Tuple[SharedFrameSpec, pd.DataFrame]:
+    """Worker side entry point of the shared memory transport.
+
+    Rebuilds rows [start:stop] as zero copy views and runs the block. When the
+    block keeps the row count the shareable output columns are written straight
+    into the output buffers of the run at the chunk rows (see write_output),
+    otherwise into segments allocated for this chunk alone. Either way the
+    layout is taken from the actual result and never guessed up front.
+
+    Returns:
+        output_spec: The spec of the detached output segments, see assemble.
+        result_df: The non shared output columns, also carrying the index.
+    """
+    input_segments = attach(input_spec)
+    try:
+        chunk = build_chunk(
+            input_spec, views(input_spec, input_segments, start, stop), local_df
+        )
+        result_df = block(chunk)
+        del chunk
+    finally:
+        close(input_segments)
+
+    if len(result_df) == stop - start:
+        output_spec = write_output(result_df, output_prefix, input_spec.length, start)
+    else:
+        output_spec = detach(SharedFrame.from_frame(result_df))
+
+    # Only the remaining columns go back through the pipe
+    return output_spec, result_df.iloc[:, output_spec.local_positions].copy()
+
+
+def assemble(results: List[Tuple[SharedFrameSpec, pd.DataFrame]]) -> List[pd.DataFrame]:
+    """Turn the worker results back into frames, in chunk order, and unlink their
+    output segments.
+
+    When every chunk kept its row count and wrote the same columns and dtypes,
+    the chunks fill the output buffers end to end and a single frame is returned
+    whose shared columns are those buffers, without any copy. Otherwise one frame
+    is returned per chunk, over its rows of the buffers, and the caller is
+    expected to merge them. Either way the buffers stay mapped for as long as the
+    frames use them.
+    """
+    segments = {}
+    try:
+        for spec, _ in results:
+            for column in spec.shared:
+                if column.shm_name not in segments:
+                    segments[column.shm_name] = shared_memory.SharedMemory(
+                        name=column.shm_name
+                    )
+
+        def chunk_segments(spec: SharedFrameSpec) -> List[shared_memory.SharedMemory]:
+            return [segments[column.shm_name] for column in spec.shared]
+
+        specs = [spec for spec, _ in results]
+        layout = specs[0]
+        offsets = np.cumsum([0] + [spec.length for spec in specs])
+        if all(
+            spec.columns == layout.columns
+            and spec.dtypes == layout.dtypes
+            and spec.shared == layout.shared
+            and spec.offset == offset
+            for spec, offset in zip(specs, offsets)
+        ):
+            local_df = pd.concat([result_df for _, result_df in results])
+            spec = layout.model_copy(update={"length": int(offsets[-1]), "offset": 0})
+            return [build_chunk(spec, mapped(spec, chunk_segments(spec)), local_df)]
+
+        return [
+            build_chunk(spec, mapped(spec, chunk_segments(spec)), result_df)
+            for spec, result_df in results
+        ]
+    finally:
+        # The frames keep the segments they use mapped, see MappedColumn
+        for segment in segments.values():
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,108 @@
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import chunk_bounds
+from src.utils.tracing import merge_spans, with_parent
+
+
+def read_csv_batches(path: str, batch_size: int, **kwargs) -> Iterator[pd.DataFrame]:
+    """Lazily read a csv file as batches of batch_size rows."""
+    with pd.read_csv(path, chunksize=batch_size, **kwargs) as reader:
+        for batch in reader:
+            yield batch
+
+
+def write_csv_batches(batches: Iterable[pd.DataFrame], path: str, **kwargs) -> int:
+    """Append every batch to a csv file as it arrives, returns the number of rows written."""
+    num_rows = 0
+    for i, batch in enumerate(batches):
+        batch.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, **kwargs)
+        num_rows += len(batch)
+    return num_rows
+
+
+class StreamingRunner(BlockBase):
+    """Push an iterator of DataFrame batches through a block (chain) and yield the
+    output batches, so the data never has to fit in memory at once.
+
+    At most max_batches_in_flight input batches are being processed at any time,
+    which bounds peak memory. Every batch is processed independently, so the block
+    should be row local (see BlockBase.row_local) for the output to match a run
+    over the whole dataset.
+    """
+
+    # The block (or SequentialRunner chain) to run on every batch
+    block: BlockBase
+
+    # Number of batches read ahead and processed concurrently
+    max_batches_in_flight: int = 1
+    # Batch size used when run is given a single frame, None runs it as one batch
+    batch_size: int = None
+
+    @property
+    def block_name(self) -> str:
+        """Return the name of the block"""
+        return self.block.__class__.__name__
+
+    def validate(self, input_df: pd.DataFrame) -> None:
+        """Override the validate method to add additional validation."""
+        pass
+
+    def validate_runner(self) -> None:
+        """Simple validation on params."""
+        if self.max_batches_in_flight <= 0:
+            raise ValueError("max_batches_in_flight must be greater than 0")
+        if self.batch_size is not None and self.batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0")
+
+    def stream(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Run the block on every batch and yield the results in input order.
+
+        Args:
+            batches: The input batches, e.g. from read_csv_batches.
+        Yields:
+            result_df: The result of the block for each batch.
+        """
+        self.validate_runner()
+
+        # Process one batch at a time
+        if self.max_batches_in_flight == 1:
+            for i, batch in enumerate(batches):
+                logging.debug(f"Running block {self.block_name} on batch {i}")
+                yield self.block(batch)
+            return
+
+        # Read ahead up to max_batches_in_flight batches, yielding in order
+        executor = ThreadPoolExecutor(max_workers=self.max_batches_in_flight)
+        pending = deque()
+        block = with_parent(self.block)
+        try:
+            for i, batch in enumerate(batches):
+                logging.debug(f"Submitting block {self.block_name} on batch {i}")
+                pending.append(executor.submit(block, batch))
+                if len(pending) >= self.max_batches_in_flight:
+                    yield merge_spans(pending.popleft().result())
+            while pending:
+                yield merge_spans(pending.popleft().result())
+        finally:
+            # The consumer may stop early, do not process the batches read ahead
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Run the block over the frame in batches of batch_size rows, an empty
+        frame is a single empty batch so the block still sets the output columns."""
+        if self.batch_size is None:
+            batches = [input_df]
+        else:
+            batches = (
+                input_df.iloc[start:stop]
+                for start, stop in chunk_bounds(
+                    len(input_df), chunk_size=self.batch_size
+                )
+            )
+        return pd.concat(list(self.stream(batches)))
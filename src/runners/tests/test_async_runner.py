@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.params_base import BlockParamBase
+from src.runners.async_runner import AsyncRunner
+from src.runners.sequential_runner import SequentialRunner
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(100)), "ColumnB": list(range(100))})
+
+# Chunks that failed once, shared by every call of FlakyBlock
+FAILED_CHUNKS = set()
+# Chunks that were cancelled, shared by every call of SlowBlock
+CANCELLED_CHUNKS = set()
+
+
+# Setup for test
+class IOBlock(BlockBase):
+    async def arun(self, input_df: pd.DataFrame):
+        # Wait on "I/O" without blocking the event loop
+        await asyncio.sleep(0.05)
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class SyncBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        # A synchronous block, run in a worker thread
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class FlakyBlock(IOBlock):
+    async def arun(self, input_df: pd.DataFrame):
+        # Fails the first time it sees each chunk
+        key = int(input_df["ColumnA"].iloc[0])
+        if key not in FAILED_CHUNKS:
+            FAILED_CHUNKS.add(key)
+            raise RuntimeError(f"Chunk {key} failed")
+        return await super().arun(input_df)
+
+
+class SlowBlock(BlockBase):
+    async def arun(self, input_df: pd.DataFrame):
+        # The first chunk fails right away, every other chunk waits to be cancelled
+        key = int(input_df["ColumnA"].iloc[0])
+        if key == 0:
+            raise RuntimeError("First chunk failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            CANCELLED_CHUNKS.add(key)
+            raise
+        return input_df
+
+
+####################################################################################################
+# The following tests are for the AsyncRunner class                                                #
+####################################################################################################
+
+
+@pytest.mark.parametrize("block", [IOBlock(), SyncBlock()])
+def test_async_runner(block):
+    expected_result = TEST_DATA.copy()
+    expected_result["ColumnA"] += 1
+
+    # All 50 chunks of I/O overlap on the event loop
+    start = time.perf_counter()
+    result = AsyncRunner(block=block, chunk_size=2, max_concurrency=50)(TEST_DATA)
+    assert time.perf_counter() - start < 1
+    assert result.equals(expected_result)
+
+
+def test_async_runner_nested():
+    # AsyncRunner works as a stage of a SequentialRunner
+    sequential_runner = SequentialRunner(
+        block_map={1: AsyncRunner(block=IOBlock(), num_chunks=4)}
+    )
+    result = sequential_runner(TEST_DATA)
+    assert list(result["ColumnA"]) == list(range(1, 101))
+
+
+def test_async_runner_retries():
+    FAILED_CHUNKS.clear()
+    block = FlakyBlock(params=BlockParamBase(attempts=2, retry_delay=0))
+    result = AsyncRunner(block=block, chunk_size=10)(TEST_DATA)
+    assert len(FAILED_CHUNKS) == 10
+    assert list(result["ColumnA"]) == list(range(1, 101))
+
+
+def test_async_runner_cancels_on_failure():
+    CANCELLED_CHUNKS.clear()
+    block_runner = AsyncRunner(block=SlowBlock(), chunk_size=10)
+    with pytest.raises(RuntimeError):
+        block_runner(TEST_DATA)
+    assert CANCELLED_CHUNKS == set(range(10, 100, 10))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+import json
+import os
+from typing import ClassVar, List
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.params_base import BlockParamBase
+from src.runners.checkpoint import MANIFEST_FILE, block_hash
+from src.runners.parallel_runner import ParallelRunner
+from src.runners.sequential_runner import SequentialRunner
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(10)), "ColumnB": list(range(10, 20))})
+
+
+# Setup for test
+class AddParams(BlockParamBase):
+    amount: int = 1
+    fail: bool = False
+
+
+class AddBlock(BlockBase):
+    params: AddParams = AddParams()
+
+    # Amount of every call that actually ran, shared by every instance
+    calls: ClassVar[List[int]] = []
+
+    def run(self, input_df: pd.DataFrame):
+        AddBlock.calls.append(self.params.amount)
+        if self.params.fail:
+            raise ValueError("Stage failed")
+        result_df = input_df.copy()
+        result_df["ColumnA"] += self.params.amount
+        return result_df
+
+
+def add_block(amount: int, fail: bool = False) -> AddBlock:
+    return AddBlock(params=AddParams(amount=amount, fail=fail))
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    AddBlock.calls = []
+
+
+####################################################################################################
+# The following tests are for SequentialRunner checkpoints                                         #
+####################################################################################################
+
+
+def test_resume_after_failure(tmp_path):
+    checkpoint_dir = str(tmp_path)
+
+    # The third stage fails, the first two are checkpointed
+    with pytest.raises(ValueError):
+        SequentialRunner(
+            block_map={1: add_block(1), 2: add_block(10), 3: add_block(100, fail=True)},
+            checkpoint_dir=checkpoint_dir,
+        )(TEST_DATA)
+    with open(os.path.join(checkpoint_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)["stages"]
+    assert [entry["order"] for entry in manifest] == [1, 2]
+    assert manifest[1]["params_hash"] == block_hash(add_block(10))
+
+    # Rerunning resumes from the failed stage
+    AddBlock.calls = []
+    result = SequentialRunner(
+        block_map={1: add_block(1), 2: add_block(10), 3: add_block(100)},
+        checkpoint_dir=checkpoint_dir,
+    )(TEST_DATA)
+    assert AddBlock.calls == [100]
+    assert list(result["ColumnA"]) == [i + 111 for i in range(10)]
+
+
+def test_changed_params_invalidate_later_stages(tmp_path):
+    def run(block_map):
+        AddBlock.calls = []
+        return SequentialRunner(block_map=block_map, checkpoint_dir=str(tmp_path))(
+            TEST_DATA
+        )
+
+    run({1: add_block(1), 2: add_block(10), 3: add_block(100)})
+
+    # Everything is unchanged, nothing runs
+    result = run({1: add_block(1), 2: add_block(10), 3: add_block(100)})
+    assert AddBlock.calls == []
+    assert list(result["ColumnA"]) == [i + 111 for i in range(10)]
+
+    # The second stage changed, so it and every later stage run again
+    run({1: add_block(1), 2: add_block(20), 3: add_block(100)})
+    assert AddBlock.calls == [20, 100]
+
+    # Params of nested blocks are part of the hash as well
+    run(
+        {
+            1: add_block(1),
+            2: ParallelRunner(block=add_block(20), num_chunks=2, use_thread_pool=True),
+            3: add_block(100),
+        }
+    )
+    assert sorted(AddBlock.calls) == [20, 20, 100]
+
+    # Stale stage outputs are removed
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def test_changed_input_reruns_every_stage(tmp_path):
+    block_map = {1: add_block(1), 2: add_block(10)}
+    SequentialRunner(block_map=block_map, checkpoint_dir=str(tmp_path))(TEST_DATA)
+    SequentialRunner(block_map=block_map, checkpoint_dir=str(tmp_path))(
+        TEST_DATA.iloc[:5]
+    )
+    assert AddBlock.calls == [1, 10, 1, 10]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,176 @@
+import threading
+from typing import ClassVar
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.blocks.simple.sum.sum_block import SumBlock, SumBlockParams
+from src.runners.chunk_planner import plan_chunks, split_cost
+from src.runners.parallel_runner import ParallelRunner
+from src.utils.tracing import configure_tracing, get_tracer
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(100)), "ColumnB": list(range(100))})
+
+
+# Setup for test
+class DummyBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # A simple transformation, for example, adding a constant to a column
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class IncrementBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        return input_df.assign(ColumnA=input_df["ColumnA"] + 1)
+
+
+class BarrierBlock(IncrementBlock):
+    barrier: ClassVar[threading.Barrier] = threading.Barrier(2)
+
+    def run(self, input_df: pd.DataFrame):
+        self.barrier.wait(timeout=10)
+        return super().run(input_df)
+
+
+####################################################################################################
+# The following tests are for the chunk planning functions                                         #
+####################################################################################################
+
+
+@pytest.mark.parametrize(
+    "per_row_seconds, task_overhead_seconds, expected_num_chunks",
+    [
+        # Cheap rows, expensive tasks: a single chunk
+        (1e-7, 1e-3, 1),
+        # Expensive rows, cheap tasks: bounded by tasks per worker
+        (1e-2, 1e-4, 16),
+        # In between: bounded by the overhead fraction (min 200 rows per chunk)
+        (1e-5, 1e-4, 5),
+        # Nothing measured: a single chunk
+        (0.0, 1e-4, 1),
+    ],
+)
+def test_plan_chunks(per_row_seconds, task_overhead_seconds, expected_num_chunks):
+    plan = plan_chunks(
+        num_rows=1000,
+        workers=4,
+        per_row_seconds=per_row_seconds,
+        task_overhead_seconds=task_overhead_seconds,
+    )
+    assert plan.num_chunks == expected_num_chunks
+    assert plan.chunk_size * plan.num_chunks >= plan.num_rows
+
+
+def test_split_cost():
+    per_row_seconds, task_overhead_seconds = split_cost([(10, 0.002), (20, 0.003)])
+    assert per_row_seconds == pytest.approx(1e-4)
+    assert task_overhead_seconds == pytest.approx(1e-3)
+
+    # Timings that shrink with more rows are noise, not a negative cost
+    assert split_cost([(10, 0.003), (20, 0.002)]) == (0.0, 0.003)
+    assert split_cost([(10, 0.01)]) == (0.001, 0.0)
+    assert split_cost([]) == (0.0, 0.0)
+
+
+####################################################################################################
+# The following tests are for the ParallelRunner auto chunking mode                                #
+####################################################################################################
+
+
+@pytest.mark.parametrize(
+    "use_process_pool, use_thread_pool", [(True, False), (False, True)]
+)
+def test_parallel_runner_auto_chunking(use_process_pool, use_thread_pool):
+    block_runner = ParallelRunner(
+        block=DummyBlock(),
+        auto_chunking=True,
+        probe_rows=20,
+        use_process_pool=use_process_pool,
+        use_thread_pool=use_thread_pool,
+    )
+    with block_runner.executor_context() as executor:
+        plan, results, head_rows = block_runner.plan_chunking(TEST_DATA, executor)
+    assert 1 <= plan.num_chunks <= plan.num_rows
+    assert head_rows == 30 and plan.num_rows == 70
+    assert [len(result) for result in results] == [10, 20]
+
+    # Run the block and check the result
+    result = block_runner(TEST_DATA)
+    expected_result = TEST_DATA.copy()
+    expected_result["ColumnA"] += 1
+    assert result.equals(expected_result)
+
+
+@pytest.mark.parametrize("num_rows", [0, 5, 100])
+def test_auto_chunking_runs_rows_once(num_rows):
+    configure_tracing()
+    input_df = TEST_DATA.iloc[:num_rows]
+    block_runner = ParallelRunner(
+        block=IncrementBlock(), auto_chunking=True, probe_rows=20, use_thread_pool=True
+    )
+    result = block_runner(input_df)
+    assert list(result["ColumnA"]) == list(input_df["ColumnA"] + 1)
+
+    # The calibration chunks are part of the run, every row goes through the block once
+    spans = [span for span in get_tracer().spans() if span.name == "IncrementBlock"]
+    assert sum(span.rows_in for span in spans) == num_rows
+
+
+@pytest.mark.parametrize("aggregate", [False, True])
+def test_auto_chunking_uses_one_executor(monkeypatch, aggregate):
+    # The calibration chunks and the rest of the input run on the same pool
+    executors = []
+    get_executor = ParallelRunner.get_executor
+
+    def counting_get_executor(self):
+        executors.append(get_executor(self))
+        return executors[-1]
+
+    monkeypatch.setattr(ParallelRunner, "get_executor", counting_get_executor)
+    block = IncrementBlock()
+    if aggregate:
+        block = SumBlock(params=SumBlockParams(column_mapping={"ColumnA": "SumA"}))
+    ParallelRunner(
+        block=block, auto_chunking=True, probe_rows=20, use_thread_pool=True
+    )(TEST_DATA)
+    assert len(executors) == 1
+
+
+def test_auto_chunking_submits_calibration_chunks_together():
+    # Both calibration chunks must run at once to pass the barrier
+    BarrierBlock.barrier = threading.Barrier(2)
+    block_runner = ParallelRunner(
+        block=BarrierBlock(),
+        auto_chunking=True,
+        probe_rows=20,
+        max_workers=2,
+        use_thread_pool=True,
+    )
+    with block_runner.executor_context() as executor:
+        _, results, _ = block_runner.plan_chunking(TEST_DATA, executor)
+    assert [len(result) for result in results] == [10, 20]
+
+
+def test_auto_chunking_aggregate():
+    block = SumBlock(params=SumBlockParams(column_mapping={"ColumnA": "SumA"}))
+    block_runner = ParallelRunner(
+        block=block, auto_chunking=True, probe_rows=20, use_thread_pool=True
+    )
+    result = block_runner(TEST_DATA)
+    assert (result["SumA"] == TEST_DATA["ColumnA"].sum()).all()
+
+
+def test_auto_chunking_validation():
+    block_runner = ParallelRunner(
+        block=DummyBlock(), auto_chunking=True, chunk_size=2, use_thread_pool=True
+    )
+    with pytest.raises(ValueError):
+        block_runner.validate_runner()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
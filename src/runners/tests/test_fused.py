@@ -0,0 +1,115 @@
+from typing import ClassVar, List
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.blocks.simple.average.average_block import (AverageBlock,
+                                                     AverageBlockParams)
+from src.runners.fused import FusedBlock
+from src.runners.parallel_runner import ParallelRunner
+from src.runners.sequential_runner import SequentialRunner
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(10)), "ColumnB": list(range(10, 20))})
+
+
+# Setup for test
+class IncrementBlock(BlockBase):
+    row_local: ClassVar[bool] = True
+
+    def __call__(self, input_df: pd.DataFrame):
+        # A simple transformation: incrementing all values in ColumnA
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class DoubleBlock(BlockBase):
+    row_local: ClassVar[bool] = True
+
+    def __call__(self, input_df: pd.DataFrame):
+        # Another simple transformation: doubling all values in ColumnA
+        result_df = input_df.copy()
+        result_df["ColumnA"] *= 2
+        return result_df
+
+
+def build_runner(fuse_parallel: bool) -> SequentialRunner:
+    return SequentialRunner(
+        fuse_parallel=fuse_parallel,
+        block_map={
+            1: ParallelRunner(
+                block=IncrementBlock(), chunk_size=3, use_thread_pool=True
+            ),
+            2: ParallelRunner(block=DoubleBlock(), chunk_size=5, use_thread_pool=True),
+            3: ParallelRunner(
+                block=IncrementBlock(), chunk_size=3, use_thread_pool=True
+            ),
+            # Not row local, ends the fused stage
+            4: AverageBlock(
+                params=AverageBlockParams(column_mapping={"ColumnA": "ColumnA_avg"})
+            ),
+            5: ParallelRunner(block=DoubleBlock(), chunk_size=3, use_thread_pool=True),
+        },
+    )
+
+
+####################################################################################################
+# The following tests are for fusing ParallelRunner stages                                         #
+####################################################################################################
+
+
+def test_fuse_stages():
+    stages = build_runner(fuse_parallel=True).ordered_blocks()
+
+    # The first three parallel stages are fused into one stage
+    assert [order for order, _ in stages] == [1, 4, 5]
+    fused_runner = stages[0][1]
+    assert isinstance(fused_runner, ParallelRunner)
+    assert isinstance(fused_runner.block, FusedBlock)
+    assert [block.__class__ for block in fused_runner.block.blocks] == [
+        IncrementBlock,
+        DoubleBlock,
+        IncrementBlock,
+    ]
+    assert fused_runner.chunk_size == 3
+
+    # A single fusable stage is left as is
+    assert isinstance(stages[2][1].block, DoubleBlock)
+
+
+def test_fused_result_matches_unfused():
+    fused_result = build_runner(fuse_parallel=True)(TEST_DATA)
+    unfused_result = build_runner(fuse_parallel=False)(TEST_DATA)
+    assert fused_result.equals(unfused_result)
+
+
+def test_fused_block_columns():
+    class AddCBlock(IncrementBlock):
+        def read_columns(self) -> List[str]:
+            return ["ColumnA"]
+
+        def write_columns(self) -> List[str]:
+            return ["ColumnC"]
+
+    class DoubleCBlock(IncrementBlock):
+        def read_columns(self) -> List[str]:
+            return ["ColumnB", "ColumnC"]
+
+        def write_columns(self) -> List[str]:
+            return ["ColumnC"]
+
+    # ColumnC is produced inside the chunk, so it is not read from the input
+    fused_block = FusedBlock(blocks=[AddCBlock(), DoubleCBlock()])
+    assert fused_block.read_columns() == ["ColumnA", "ColumnB"]
+    assert fused_block.write_columns() == ["ColumnC"]
+
+    # A block without declarations makes the whole chain undeclared
+    fused_block = FusedBlock(blocks=[AddCBlock(), IncrementBlock()])
+    assert fused_block.read_columns() is None
+    assert fused_block.write_columns() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
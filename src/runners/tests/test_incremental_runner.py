@@ -0,0 +1,193 @@
+import os
+from typing import ClassVar, List
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.params_base import BlockParamBase
+from src.runners.incremental_runner import (
+    PART_SUFFIX,
+    IncrementalRunner,
+    edge_fingerprint,
+)
+
+# Define test data, rows are appended to it between runs
+TEST_DATA = pd.DataFrame(
+    {"id": [f"trip-{i}" for i in range(10)], "ColumnA": list(range(10))}
+)
+APPENDED_DATA = pd.DataFrame(
+    {"id": [f"trip-{i}" for i in range(10, 15)], "ColumnA": list(range(10, 15))}
+)
+
+
+# Setup for test
+class RecordingBlock(BlockBase):
+    # Number of rows of every call, shared by every instance
+    calls: ClassVar[List[int]] = []
+
+    row_local: ClassVar[bool] = True
+
+    def __call__(self, input_df: pd.DataFrame):
+        RecordingBlock.calls.append(len(input_df))
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class IncrementParams(BlockParamBase):
+    increment: int = 1
+
+
+class IncrementBlock(RecordingBlock):
+    params: IncrementParams = IncrementParams()
+
+    def __call__(self, input_df: pd.DataFrame):
+        RecordingBlock.calls.append(len(input_df))
+        return input_df.assign(ColumnA=input_df["ColumnA"] + self.params.increment)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    RecordingBlock.calls = []
+
+
+def expected_result(input_df: pd.DataFrame) -> pd.DataFrame:
+    return input_df.assign(ColumnA=input_df["ColumnA"] + 1)
+
+
+####################################################################################################
+# The following tests are for the IncrementalRunner class                                          #
+####################################################################################################
+
+
+@pytest.mark.parametrize(
+    "watermark, watermark_column",
+    [("row_count", None), ("max_value", "ColumnA"), ("id_set", "id")],
+)
+def test_incremental_runner(tmp_path, watermark, watermark_column):
+    def runner():
+        return IncrementalRunner(
+            block=RecordingBlock(),
+            state_dir=str(tmp_path),
+            name="taxi",
+            watermark=watermark,
+            watermark_column=watermark_column,
+        )
+
+    # The first run processes every row
+    assert runner()(TEST_DATA).equals(expected_result(TEST_DATA))
+
+    # Later runs only process the appended rows
+    full_data = pd.concat([TEST_DATA, APPENDED_DATA], ignore_index=True)
+    assert runner()(full_data).equals(expected_result(full_data))
+
+    # Nothing new, the stored output is returned
+    assert runner()(full_data).equals(expected_result(full_data))
+    assert RecordingBlock.calls == [10, 5]
+
+
+def test_incremental_runner_reprocesses_changed_rows(tmp_path):
+    runner = IncrementalRunner(
+        block=RecordingBlock(), state_dir=str(tmp_path), name="taxi"
+    )
+    runner(TEST_DATA)
+
+    # A row seen before was rewritten, so the delta can not be trusted
+    changed_data = pd.concat([TEST_DATA, APPENDED_DATA], ignore_index=True)
+    changed_data.loc[3, "ColumnA"] = 100
+    assert runner(changed_data).equals(expected_result(changed_data))
+    assert RecordingBlock.calls == [10, 15]
+
+    # Resetting the state processes every row again
+    runner.reset()
+    runner(changed_data)
+    assert RecordingBlock.calls == [10, 15, 15]
+
+
+@pytest.mark.parametrize("block_cls", [RecordingBlock, IncrementBlock])
+def test_incremental_runner_reprocesses_changed_block(tmp_path, block_cls):
+    IncrementalRunner(block=block_cls(), state_dir=str(tmp_path), name="taxi")(
+        TEST_DATA
+    )
+
+    # The stored output was computed with other logic, it is not mixed with the new one
+    full_data = pd.concat([TEST_DATA, APPENDED_DATA], ignore_index=True)
+    runner = IncrementalRunner(
+        block=IncrementBlock(params=IncrementParams(increment=2)),
+        state_dir=str(tmp_path),
+        name="taxi",
+    )
+    result = runner(full_data)
+    assert list(result["ColumnA"]) == list(full_data["ColumnA"] + 2)
+    assert RecordingBlock.calls == [10, 15]
+
+
+def test_incremental_runner_appends_parts(tmp_path):
+    def runner(return_all: bool = True):
+        return IncrementalRunner(
+            block=RecordingBlock(),
+            state_dir=str(tmp_path),
+            name="taxi",
+            return_all=return_all,
+        )
+
+    def parts():
+        return sorted(
+            file_name
+            for file_name in os.listdir(tmp_path / "taxi")
+            if file_name.endswith(PART_SUFFIX)
+        )
+
+    runner()(TEST_DATA)
+    (first_part,) = parts()
+    first_mtime = os.stat(tmp_path / "taxi" / first_part).st_mtime_ns
+
+    # The output of the new rows is a part of its own, earlier parts are not rewritten
+    full_data = pd.concat([TEST_DATA, APPENDED_DATA], ignore_index=True)
+    result = runner(return_all=False)(full_data)
+    assert result.equals(expected_result(full_data).iloc[10:])
+    assert len(parts()) == 2
+    assert os.stat(tmp_path / "taxi" / first_part).st_mtime_ns == first_mtime
+    assert runner()(full_data).equals(expected_result(full_data))
+
+    # Reprocessing every row replaces the parts
+    runner()(TEST_DATA)
+    assert len(parts()) == 1 and first_part not in parts()
+
+
+def test_edge_fingerprint():
+    data = pd.DataFrame({"ColumnA": list(range(100))})
+    assert edge_fingerprint(data, rows=10) == edge_fingerprint(data.copy(), rows=10)
+
+    # Only the row count and the rows at both ends are hashed
+    changed = data.copy()
+    changed.loc[50, "ColumnA"] = -1
+    assert edge_fingerprint(changed, rows=10) == edge_fingerprint(data, rows=10)
+    changed.loc[95, "ColumnA"] = -1
+    assert edge_fingerprint(changed, rows=10) != edge_fingerprint(data, rows=10)
+    longer = pd.concat([data.iloc[:50], data.iloc[49:]])
+    assert edge_fingerprint(longer, rows=10) != edge_fingerprint(data, rows=10)
+
+
+def test_incremental_runner_validation(tmp_path):
+    with pytest.raises(ValueError):
+        IncrementalRunner(
+            block=RecordingBlock(),
+            state_dir=str(tmp_path),
+            name="taxi",
+            watermark="id_set",
+        )(TEST_DATA)
+
+    with pytest.raises(ValueError):
+        IncrementalRunner(
+            block=RecordingBlock(),
+            state_dir=str(tmp_path),
+            name="taxi",
+            watermark="max_value",
+            watermark_column="missing",
+        )(TEST_DATA)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,7 +1,11 @@
+from typing import ClassVar, List
+
 import pandas as pd
 import pytest
 
 from src.block_base import BlockBase
+from src.blocks.simple.sum.sum_block import SumBlock, SumBlockParams
+from src.params_base import BlockParamBase
 from src.runners.parallel_runner import ParallelRunner
 
 # Define test data
@@ -17,6 +21,43 @@ class DummyBlock(BlockBase):
         return result_df
 
 
+class ProjectedBlock(BlockBase):
+    def read_columns(self) -> List[str]:
+        return ["ColumnA"]
+
+    def write_columns(self) -> List[str]:
+        return ["ColumnA", "ColumnC"]
+
+    def run(self, input_df: pd.DataFrame):
+        # Fails if any column other than the declared read column is shipped
+        assert list(input_df.columns) == ["ColumnA"]
+        input_df["ColumnC"] = input_df["ColumnA"] * 2
+        input_df["ColumnA"] += 1
+        return input_df
+
+
+class ProjectedFilterBlock(ProjectedBlock):
+    def run(self, input_df: pd.DataFrame):
+        return input_df[input_df["ColumnA"] % 2 == 0]
+
+
+class SchemaBlock(BlockBase):
+    # Number of calls that validated their input columns, shared by every instance
+    validations: ClassVar[int] = 0
+
+    def input_schema(self):
+        return {"ColumnA": "numeric"}
+
+    def validate_columns(self, input_df: pd.DataFrame) -> None:
+        SchemaBlock.validations += 1
+        super().validate_columns(input_df)
+
+    def run(self, input_df: pd.DataFrame):
+        result_df = input_df.copy()
+        result_df["ColumnC"] = result_df["ColumnA"] * 2
+        return result_df
+
+
 # Initialize a dummy block for use in tests
 DUMMY_BLOCK = DummyBlock()
 
@@ -106,6 +147,102 @@ def test_runner_validation():
     with pytest.raises(ValueError):
         block_runner.validate_runner()
 
+    block_runner.num_chunks = 2
+    block_runner.assembly = "unknown"
+    with pytest.raises(ValueError):
+        block_runner.validate_runner()
+
+
+@pytest.mark.parametrize(
+    "use_process_pool, use_thread_pool", [(True, False), (False, True)]
+)
+@pytest.mark.parametrize("assembly", ["concat", "preallocated"])
+def test_parallel_runner_keeps_chunk_order(use_process_pool, use_thread_pool, assembly):
+    # Test that results are merged in chunk order without sorting
+    block_runner = ParallelRunner(
+        block=DUMMY_BLOCK,
+        chunk_size=1,
+        use_process_pool=use_process_pool,
+        use_thread_pool=use_thread_pool,
+        assembly=assembly,
+    )
+    result = block_runner(TEST_DATA)
+
+    expected_result = TEST_DATA.copy()
+    expected_result["ColumnA"] += 1
+    assert result.equals(expected_result), "The result should keep the input order"
+
+
+def test_preallocated_assembly_falls_back_to_merge():
+    # Test that chunks changing the row count are merged in chunk order
+    class FilterBlock(BlockBase):
+        def __call__(self, input_df: pd.DataFrame):
+            return input_df[input_df["ColumnA"] % 2 == 0]
+
+    block_runner = ParallelRunner(
+        block=FilterBlock(), chunk_size=3, use_thread_pool=True, assembly="preallocated"
+    )
+    result = block_runner(TEST_DATA)
+    assert result.equals(TEST_DATA[TEST_DATA["ColumnA"] % 2 == 0])
+
+
+@pytest.mark.parametrize(
+    "use_process_pool, use_thread_pool", [(True, False), (False, True)]
+)
+def test_project_columns(use_process_pool, use_thread_pool):
+    # Only the read column is shipped, the written columns are stitched back on
+    block_runner = ParallelRunner(
+        block=ProjectedBlock(),
+        chunk_size=3,
+        use_process_pool=use_process_pool,
+        use_thread_pool=use_thread_pool,
+        project_columns=True,
+    )
+    result = block_runner(TEST_DATA)
+    expected_result = TEST_DATA.assign(
+        ColumnA=TEST_DATA["ColumnA"] + 1, ColumnC=TEST_DATA["ColumnA"] * 2
+    )
+    assert result.equals(expected_result)
+
+
+def test_project_columns_aggregate():
+    # Aggregates compute their partial states on the read columns only
+    block = SumBlock(params=SumBlockParams(column_mapping={"ColumnA": "ColumnA_sum"}))
+    block_runner = ParallelRunner(
+        block=block, num_chunks=3, use_thread_pool=True, project_columns=True
+    )
+    result = block_runner(TEST_DATA)
+    assert result.equals(TEST_DATA.assign(ColumnA_sum=45))
+
+
+def test_project_columns_requires_same_rows():
+    block_runner = ParallelRunner(
+        block=ProjectedFilterBlock(),
+        chunk_size=3,
+        use_thread_pool=True,
+        project_columns=True,
+    )
+    with pytest.raises(ValueError):
+        block_runner(TEST_DATA)
+
+
+def test_schema_checked_once():
+    # The schema is checked once on the whole input, the chunks skip validate_columns
+    SchemaBlock.validations = 0
+    runner = ParallelRunner(block=SchemaBlock(), chunk_size=2, use_thread_pool=True)
+    result = runner(TEST_DATA)
+    assert list(result["ColumnC"]) == [2 * i for i in range(10)]
+    assert SchemaBlock.validations == 0
+
+    # Sampled runtime checks still validate a fraction of the chunks
+    block = SchemaBlock(params=BlockParamBase(schema_sample_rate=1.0))
+    ParallelRunner(block=block, chunk_size=2, use_thread_pool=True)(TEST_DATA)
+    assert SchemaBlock.validations == 5
+
+    # An invalid input fails before any chunk runs
+    with pytest.raises(ValueError, match="wrong type"):
+        runner(TEST_DATA.astype({"ColumnA": str}))
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,139 @@
+import time
+from typing import ClassVar
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.pipeline import Pipeline
+from src.runners.sequential_runner import SequentialRunner
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(20)), "ColumnB": list(range(20))})
+
+
+# Setup for test
+class SleepIncrementBlock(BlockBase):
+    # Seconds to sleep per chunk, stands in for an I/O or CPU heavy stage
+    delay: float = 0.0
+
+    row_local: ClassVar[bool] = True
+
+    def __call__(self, input_df: pd.DataFrame):
+        time.sleep(self.delay)
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class SleepDoubleBlock(SleepIncrementBlock):
+    def __call__(self, input_df: pd.DataFrame):
+        time.sleep(self.delay)
+        result_df = input_df.copy()
+        result_df["ColumnB"] *= 2
+        return result_df
+
+
+class FailingBlock(SleepIncrementBlock):
+    def __call__(self, input_df: pd.DataFrame):
+        if 10 in input_df["ColumnB"].values:
+            raise ValueError("Bad chunk")
+        return input_df
+
+
+class NotRowLocalBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        return input_df
+
+
+EXPECTED_RESULT = TEST_DATA.assign(
+    ColumnA=TEST_DATA["ColumnA"] + 1, ColumnB=TEST_DATA["ColumnB"] * 2
+)
+
+####################################################################################################
+# The following tests are for pipelined stage execution                                            #
+####################################################################################################
+
+
+@pytest.mark.parametrize("stage_concurrency", [{}, {1: 3, 2: 2}])
+def test_pipelined_runner(stage_concurrency):
+    sequential_runner = SequentialRunner(
+        block_map={1: SleepIncrementBlock(), 2: SleepDoubleBlock()},
+        pipelined=True,
+        chunk_size=3,
+        stage_concurrency=stage_concurrency,
+    )
+    result = sequential_runner(TEST_DATA)
+
+    # Chunks are reassembled in order
+    assert result.equals(EXPECTED_RESULT)
+    assert [m.num_chunks for m in sequential_runner.pipeline_metrics] == [7, 7]
+
+
+def test_pipelined_stages_overlap():
+    block_map = {1: SleepIncrementBlock(delay=0.05), 2: SleepDoubleBlock(delay=0.05)}
+
+    # Sequentially every chunk waits on both stages, 8 * 0.1 seconds
+    start = time.perf_counter()
+    SequentialRunner(block_map=block_map, pipelined=True, num_chunks=8, queue_size=1)(
+        TEST_DATA
+    )
+    pipelined_time = time.perf_counter() - start
+
+    # Pipelined, the second stage runs alongside the first, about 9 * 0.05 seconds
+    assert pipelined_time < 0.7
+
+
+def test_pipeline_metrics_find_bottleneck():
+    pipeline = Pipeline(
+        stages=[
+            ("fast", SleepIncrementBlock(delay=0.001)),
+            ("slow", SleepDoubleBlock(delay=0.03)),
+        ],
+        queue_size=2,
+    )
+    results = pipeline.run([TEST_DATA.iloc[i : i + 2] for i in range(0, 20, 2)])
+    assert pd.concat(results).equals(EXPECTED_RESULT)
+
+    # The slow stage is busy all the time, its queue fills up and blocks the fast stage
+    fast, slow = pipeline.metrics
+    assert pipeline.bottleneck is slow
+    assert slow.max_occupancy == 2
+    assert fast.blocked_time > slow.blocked_time
+
+
+def test_pipelined_runner_failure():
+    sequential_runner = SequentialRunner(
+        block_map={1: SleepIncrementBlock(), 2: FailingBlock()},
+        pipelined=True,
+        chunk_size=2,
+    )
+    with pytest.raises(ValueError, match="Bad chunk"):
+        sequential_runner(TEST_DATA)
+
+
+def test_pipelined_runner_validation():
+    # Only row local blocks can be pipelined
+    with pytest.raises(ValueError):
+        SequentialRunner(
+            block_map={1: NotRowLocalBlock()}, pipelined=True, chunk_size=2
+        )(TEST_DATA)
+
+    # Chunking must be specified
+    with pytest.raises(ValueError):
+        SequentialRunner(block_map={1: SleepIncrementBlock()}, pipelined=True)(
+            TEST_DATA
+        )
+
+    # Concurrency must refer to a stage
+    with pytest.raises(ValueError):
+        SequentialRunner(
+            block_map={1: SleepIncrementBlock()},
+            pipelined=True,
+            chunk_size=2,
+            stage_concurrency={2: 2},
+        )(TEST_DATA)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
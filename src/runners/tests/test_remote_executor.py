@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+from src.runners.remote_executor import RemoteExecutor, parse_address
+
+# Root of the repository, workers must be able to import the blocks
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(20)), "ColumnB": list(range(20))})
+
+
+# Setup for test
+class DummyBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # A simple transformation, for example, adding a constant to a column
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class KillOnceBlock(DummyBlock):
+    # File created by the first call, which then kills its worker
+    marker: str
+
+    def __call__(self, input_df: pd.DataFrame):
+        if not os.path.exists(self.marker):
+            open(self.marker, "w").close()
+            os._exit(1)
+        return super().__call__(input_df)
+
+
+def start_worker(address: str) -> tuple:
+    """Start a worker daemon and return the process and its bound address."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.runners.remote_executor", "--address", address],
+        cwd=ROOT_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    return process, line.strip().rsplit(" ", 1)[-1]
+
+
+@pytest.fixture
+def workers(tmp_path):
+    # Two TCP workers and one unix socket worker
+    started = [
+        start_worker("127.0.0.1:0"),
+        start_worker("127.0.0.1:0"),
+        start_worker(f"unix:{tmp_path / 'worker.sock'}"),
+    ]
+    yield started
+    for process, _ in started:
+        process.kill()
+        process.wait()
+
+
+####################################################################################################
+# The following tests are for the RemoteExecutor class                                             #
+####################################################################################################
+
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:9000")[1] == ("127.0.0.1", 9000)
+    assert parse_address("unix:/tmp/worker.sock")[1] == "/tmp/worker.sock"
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_remote_executor(workers):
+    addresses = [address for _, address in workers]
+    with RemoteExecutor(addresses=addresses) as executor:
+        futures = [executor.submit(pow, 2, i) for i in range(10)]
+        assert [future.result() for future in futures] == [2**i for i in range(10)]
+
+        # Errors raised by the task are returned, not retried
+        with pytest.raises(ZeroDivisionError):
+            executor.submit(divmod, 1, 0).result()
+
+
+@pytest.mark.parametrize("scheduling", ["static", "dynamic"])
+def test_parallel_runner_remote_pool(workers, scheduling):
+    block_runner = ParallelRunner(
+        block=DummyBlock(),
+        chunk_size=3,
+        use_remote_pool=True,
+        remote_addresses=[address for _, address in workers],
+        scheduling=scheduling,
+    )
+    result = block_runner(TEST_DATA)
+    expected_result = TEST_DATA.copy()
+    expected_result["ColumnA"] += 1
+    assert result.equals(expected_result)
+
+
+def test_remote_pool_requeues_when_worker_dies(workers, tmp_path):
+    block_runner = ParallelRunner(
+        block=KillOnceBlock(marker=str(tmp_path / "killed")),
+        num_chunks=3,
+        use_remote_pool=True,
+        remote_addresses=[address for _, address in workers],
+    )
+    result = block_runner(TEST_DATA)
+
+    # One worker died and its chunk was requeued on another worker
+    assert sum(process.poll() is not None for process, _ in workers) == 1
+    assert list(result["ColumnA"]) == list(range(1, 21))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
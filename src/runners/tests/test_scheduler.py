@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(40)), "ColumnB": list(range(40))})
+
+# Number of calls that got the first row, shared by every copy of the block
+STRAGGLER_CALLS = {"count": 0}
+STRAGGLER_LOCK = threading.Lock()
+
+
+# Setup for test
+class DummyBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # A simple transformation, for example, adding a constant to a column
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+class StragglerBlock(DummyBlock):
+    def __call__(self, input_df: pd.DataFrame):
+        # The first call on the first row stalls, as if its worker was descheduled
+        if 0 in input_df["ColumnA"].values:
+            with STRAGGLER_LOCK:
+                STRAGGLER_CALLS["count"] += 1
+                first_call = STRAGGLER_CALLS["count"] == 1
+            if first_call:
+                time.sleep(2)
+        return super().__call__(input_df)
+
+
+####################################################################################################
+# The following tests are for the ParallelRunner dynamic scheduling mode                           #
+####################################################################################################
+
+
+@pytest.mark.parametrize(
+    "use_process_pool, use_thread_pool", [(True, False), (False, True)]
+)
+def test_dynamic_scheduling(use_process_pool, use_thread_pool):
+    block_runner = ParallelRunner(
+        block=DummyBlock(),
+        num_chunks=3,
+        use_process_pool=use_process_pool,
+        use_thread_pool=use_thread_pool,
+        scheduling="dynamic",
+        max_workers=2,
+    )
+
+    # Every chunk is split into over_partition tasks
+    chunks = block_runner.split(TEST_DATA)
+    assert len(block_runner.over_split(chunks)) == 12
+
+    # Results are merged in row order
+    result = block_runner(TEST_DATA)
+    expected_result = TEST_DATA.copy()
+    expected_result["ColumnA"] += 1
+    assert result.equals(expected_result)
+
+
+@pytest.mark.parametrize("chunking", [{"num_chunks": 3}, {"chunk_size": 5}])
+@pytest.mark.parametrize("scheduling", ["static", "dynamic"])
+def test_empty_input(chunking, scheduling):
+    block_runner = ParallelRunner(
+        block=DummyBlock(), use_thread_pool=True, scheduling=scheduling, **chunking
+    )
+    assert len(block_runner.over_split(block_runner.split(TEST_DATA.iloc[:0]))) == 1
+
+    # An empty input still runs the block once and returns an empty frame
+    result = block_runner(TEST_DATA.iloc[:0])
+    assert result.empty
+    assert list(result.columns) == list(TEST_DATA.columns)
+
+
+def test_dynamic_scheduling_speculates_stragglers():
+    STRAGGLER_CALLS["count"] = 0
+    block_runner = ParallelRunner(
+        block=StragglerBlock(),
+        chunk_size=10,
+        use_thread_pool=True,
+        scheduling="dynamic",
+        max_workers=4,
+    )
+
+    # The stalled task is re-run and the fast copy is kept
+    start = time.perf_counter()
+    result = block_runner(TEST_DATA)
+    assert time.perf_counter() - start < 1.5
+    assert STRAGGLER_CALLS["count"] == 2
+    assert list(result["ColumnA"]) == list(range(1, 41))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,7 +1,15 @@
+from typing import ClassVar, List
+
+import numpy as np
 import pandas as pd
 import pytest
 
 from src.block_base import BlockBase
+from src.blocks.simple.average.average_block import (AverageBlock,
+                                                     AverageBlockParams)
+from src.blocks.simple.compact.compact_block import CompactBlockParams
+from src.blocks.simple.sum.sum_block import SumBlock, SumBlockParams
+from src.runners.parallel_runner import ParallelRunner
 from src.runners.sequential_runner import SequentialRunner
 
 # Define test data
@@ -25,6 +33,28 @@ class DoubleBlock(BlockBase):
         return result_df
 
 
+class DoubleABlock(BlockBase):
+    row_local: ClassVar[bool] = True
+
+    def run(self, input_df: pd.DataFrame):
+        return input_df.assign(ColumnA=input_df["ColumnA"] * 2)
+
+
+class SuffixBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        return input_df.assign(ColumnC=input_df["ColumnC"] + "!")
+
+
+class InPlaceIncrementBlock(BlockBase):
+    def write_columns(self) -> List[str]:
+        # Declares the written column, so it can be incremented in place
+        return ["ColumnA"]
+
+    def run(self, input_df: pd.DataFrame):
+        input_df["ColumnA"] += 1
+        return input_df
+
+
 # Initialize blocks for use in tests
 INCREMENT_BLOCK = IncrementBlock()
 DOUBLE_BLOCK = DoubleBlock()
@@ -82,5 +112,120 @@ def test_sequential_runner_single_block():
     ), "The result should only have the increment transformation applied"
 
 
+def test_sequential_runner_declared_writes():
+    # Blocks writing in place only copy the columns they declare
+    input_df = TEST_DATA.copy()
+    sequential_runner = SequentialRunner(
+        block_map={1: InPlaceIncrementBlock(), 2: InPlaceIncrementBlock()}
+    )
+    result = sequential_runner(input_df)
+
+    # The caller's frame is unchanged and the untouched column is shared
+    assert input_df.equals(TEST_DATA)
+    assert list(result["ColumnA"]) == [i + 2 for i in range(10)]
+    assert np.shares_memory(result["ColumnB"].values, input_df["ColumnB"].values)
+
+
+def test_sequential_runner_compact():
+    # The output of every stage is compacted losslessly before the next stage
+    input_df = TEST_DATA.assign(
+        ColumnC=["x", "y"] * 5, ColumnD=[i / 2 for i in range(10)]
+    )
+    sequential_runner = SequentialRunner(
+        block_map={1: INCREMENT_BLOCK, 2: DOUBLE_BLOCK, 3: SuffixBlock()},
+        compact=True,
+    )
+    result = sequential_runner(input_df)
+    assert result["ColumnA"].dtype == np.int64
+    assert result["ColumnD"].dtype == np.float32
+    assert list(result["ColumnA"]) == [i + 1 for i in range(10)]
+    assert list(result["ColumnB"]) == [2 * i for i in range(10, 20)]
+    assert list(result["ColumnD"]) == [i / 2 for i in range(10)]
+    assert sorted(sequential_runner.compact_reports) == [1, 2, 3]
+    assert sequential_runner.compact_reports[1]["bytes_saved"].sum() == 10 * 4
+
+    # Strings stay strings, so later stages can write new values to them
+    assert list(result["ColumnC"]) == ["x!", "y!"] * 5
+    assert result["ColumnC"].dtype == object
+
+    # Categoricals are opt in
+    categorized = SequentialRunner(
+        block_map={1: INCREMENT_BLOCK},
+        compact=True,
+        compact_params=CompactBlockParams(integers=False, categories=True),
+    )(input_df)
+    assert categorized["ColumnC"].dtype == "category"
+
+    with pytest.raises(ValueError):
+        SequentialRunner(
+            block_map={1: INCREMENT_BLOCK}, compact=True, pipelined=True, num_chunks=2
+        )(TEST_DATA)
+    with pytest.raises(ValueError):
+        SequentialRunner(
+            block_map={1: INCREMENT_BLOCK},
+            compact=True,
+            compact_params=CompactBlockParams(),
+        )(TEST_DATA)
+
+
+def test_sequential_runner_compact_growing_values():
+    # A later stage grows the values past the range of the compacted output
+    input_df = pd.DataFrame({"ColumnA": list(range(100, 110))})
+    sequential_runner = SequentialRunner(
+        block_map={1: INCREMENT_BLOCK, 2: DoubleABlock()}, compact=True
+    )
+    result = sequential_runner(input_df)
+    assert list(result["ColumnA"]) == list(range(202, 222, 2))
+
+
+def test_sequential_runner_schema():
+    # The sum column written by the first stage is averaged by the second
+    block_map = {
+        1: SumBlock(params=SumBlockParams(column_mapping={"ColumnA": "SumA"})),
+        2: ParallelRunner(
+            block=AverageBlock(
+                params=AverageBlockParams(column_mapping={"SumA": "AvgA"})
+            ),
+            num_chunks=2,
+            use_thread_pool=True,
+        ),
+    }
+    runner = SequentialRunner(
+        block_map=block_map, source_schema={"ColumnA": "int", "ColumnB": "int"}
+    )
+    _, output_schema = runner.check_schema(runner.source_schema)
+    assert output_schema == {
+        "ColumnA": "int",
+        "ColumnB": "int",
+        "SumA": "int",
+        "AvgA": "float",
+    }
+    assert list(runner(TEST_DATA)["AvgA"]) == [45.0] * 10
+
+    # Invalid stages are rejected when the runner is built
+    with pytest.raises(ValueError, match="wrong type"):
+        SequentialRunner(block_map=block_map, source_schema={"ColumnA": "string"})
+
+    # Without a source schema the stages are checked when the runner is called
+    with pytest.raises(ValueError, match="missing columns"):
+        SequentialRunner(block_map=block_map)(TEST_DATA[["ColumnB"]])
+
+
+def test_sequential_runner_runs_the_given_blocks():
+    # Nested runners run themselves, not copies, so their state is kept
+    compacted = SequentialRunner(block_map={1: DoubleABlock()}, compact=True)
+    pipelined = SequentialRunner(
+        block_map={1: DoubleABlock()}, pipelined=True, num_chunks=2
+    )
+    runner = SequentialRunner(
+        block_map={1: compacted, 2: pipelined},
+        source_schema={"ColumnA": "int", "ColumnB": "int"},
+    )
+    result = runner(TEST_DATA)
+    assert list(result["ColumnA"]) == [4 * i for i in range(10)]
+    assert sorted(compacted.compact_reports) == [1]
+    assert len(pipelined.pipeline_metrics) == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
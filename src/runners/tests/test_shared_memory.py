@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+from src.runners.shared_memory import MappedColumn, SharedFrame, build_chunk
+from src.utils.tracing import configure_tracing, get_tracer
+
+# Define test data, a mix of numeric and non numeric columns
+TEST_DATA = pd.DataFrame(
+    {
+        "ColumnA": list(range(10)),
+        "ColumnB": [float(i) / 2 for i in range(10)],
+        "ColumnC": [f"row_{i}" for i in range(10)],
+    }
+)
+
+
+# Setup for test
+class DummyBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # Keeps the row count and the schema, output can be written to shared memory
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        result_df["ColumnC"] = result_df["ColumnC"] + "_done"
+        return result_df
+
+
+class FilterBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # Drops rows, output has to be shipped back whole
+        return input_df[input_df["ColumnA"] % 2 == 0]
+
+
+class TypedBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        # Output dtypes that can not be told from a single row
+        result_df = input_df.copy()
+        result_df["Nullable"] = pd.array(
+            [None if value % 4 == 0 else value for value in input_df["ColumnA"]],
+            dtype="Int64",
+        )
+        result_df["Category"] = pd.Categorical(input_df["ColumnC"].str[:3])
+        result_df["Mixed"] = [
+            value if value % 2 else None for value in input_df["ColumnA"]
+        ]
+        return result_df
+
+
+class DuplicateColumnsBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # Output with repeated column names of different dtypes
+        result_df = input_df.copy()
+        result_df.columns = ["Value", "Value", "Label"]
+        result_df["Value2"] = result_df.iloc[:, 0] * 2
+        result_df.columns = ["Value", "Value", "Label", "Value"]
+        return result_df
+
+
+####################################################################################################
+# The following tests are for the SharedFrame class                                                #
+####################################################################################################
+
+
+def test_shared_frame_round_trip():
+    with SharedFrame.from_frame(TEST_DATA) as shared_frame:
+        # Only the numeric columns are placed in shared memory
+        assert shared_frame.spec.shared_positions == [0, 1]
+        assert shared_frame.spec.local_positions == [2]
+
+        # Rebuild a chunk from the views and the local columns
+        local_df = TEST_DATA.iloc[2:5, shared_frame.spec.local_positions]
+        arrays = shared_frame.views(2, 5)
+        chunk = build_chunk(shared_frame.spec, arrays, local_df)
+        assert chunk.equals(TEST_DATA.iloc[2:5])
+
+        # The chunk shares memory with the shared buffers and is read only
+        assert np.shares_memory(chunk["ColumnA"].to_numpy(), arrays[0])
+        with pytest.raises(ValueError):
+            arrays[0][0] = 100
+
+
+####################################################################################################
+# The following tests are for the ParallelRunner shared memory transport                           #
+####################################################################################################
+
+
+@pytest.mark.parametrize("block", [DummyBlock(), FilterBlock()])
+@pytest.mark.parametrize("chunk_size", [1, 3, 10])
+def test_parallel_runner_shared_memory(block, chunk_size):
+    block_runner = ParallelRunner(
+        block=block,
+        chunk_size=chunk_size,
+        use_process_pool=True,
+        transport="shared_memory",
+    )
+    result = block_runner(TEST_DATA)
+    expected_result = block(TEST_DATA)
+
+    # Results come back in chunk order with the original dtypes
+    assert result.equals(expected_result)
+    assert list(result.dtypes) == list(expected_result.dtypes)
+
+
+def test_parallel_runner_shared_memory_dtypes():
+    configure_tracing()
+    block = TypedBlock()
+    block_runner = ParallelRunner(
+        block=block, num_chunks=3, use_process_pool=True, transport="shared_memory"
+    )
+    result = block_runner(TEST_DATA)
+    expected_result = block(TEST_DATA)
+    pd.testing.assert_frame_equal(result, expected_result)
+
+    # The block only ran on the chunks, it was never probed on a single row
+    spans = [span for span in get_tracer().spans() if span.name == "TypedBlock"]
+    assert spans and all(span.rows_in != 1 for span in spans)
+
+
+@pytest.mark.parametrize(
+    "input_df", [TEST_DATA, TEST_DATA.set_axis(["X", "X", "Y"], axis=1)]
+)
+def test_parallel_runner_shared_memory_duplicate_columns(input_df):
+    block = DuplicateColumnsBlock()
+    block_runner = ParallelRunner(
+        block=block, num_chunks=3, use_process_pool=True, transport="shared_memory"
+    )
+    result = block_runner(input_df)
+
+    # Columns are kept by position, none of the repeated names collapse
+    pd.testing.assert_frame_equal(result, block(input_df))
+
+
+def test_parallel_runner_shared_memory_preallocated_output():
+    block_runner = ParallelRunner(
+        block=DummyBlock(),
+        num_chunks=3,
+        use_process_pool=True,
+        transport="shared_memory",
+    )
+    result = block_runner(TEST_DATA)
+    pd.testing.assert_frame_equal(result, DummyBlock()(TEST_DATA))
+
+    # Every chunk wrote into one output buffer per column, used as is by the result
+    for column in ["ColumnA", "ColumnB"]:
+        base = result[column].to_numpy()
+        while isinstance(base, np.ndarray):
+            base = base.base
+        assert isinstance(base, MappedColumn)
+        assert base.__array_interface__["shape"] == (len(TEST_DATA),)
+
+    # The buffer stays mapped after its segment was unlinked
+    result["ColumnA"] += 1
+    assert result["ColumnA"].tolist() == list(range(2, 12))
+
+
+def test_shared_memory_requires_process_pool():
+    block_runner = ParallelRunner(
+        block=DummyBlock(),
+        chunk_size=2,
+        use_thread_pool=True,
+        transport="shared_memory",
+    )
+    with pytest.raises(ValueError):
+        block_runner.validate_runner()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
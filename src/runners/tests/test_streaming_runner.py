@@ -0,0 +1,102 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.sequential_runner import SequentialRunner
+from src.runners.streaming_runner import (StreamingRunner, read_csv_batches,
+                                          write_csv_batches)
+
+# Path to the iris dataset shipped with the repository
+IRIS_CSV = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "data", "iris.csv")
+)
+
+
+# Setup for test
+class PetalAreaBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # Row local feature: the petal area of each flower
+        result_df = input_df.copy()
+        result_df["petal_area"] = (
+            result_df["petal_length_cm"] * result_df["petal_width_cm"]
+        )
+        return result_df
+
+
+class IsSetosaBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # Row local feature: whether the flower is a setosa
+        result_df = input_df.copy()
+        result_df["is_setosa"] = result_df["target"] == 0
+        return result_df
+
+
+CHAIN = SequentialRunner(block_map={1: PetalAreaBlock(), 2: IsSetosaBlock()})
+
+####################################################################################################
+# The following tests are for the StreamingRunner class                                            #
+####################################################################################################
+
+
+@pytest.mark.parametrize("max_batches_in_flight", [1, 3])
+def test_stream_csv(max_batches_in_flight):
+    streaming_runner = StreamingRunner(
+        block=CHAIN, max_batches_in_flight=max_batches_in_flight
+    )
+    batches = list(streaming_runner.stream(read_csv_batches(IRIS_CSV, batch_size=40)))
+
+    # Batches come out in order and match a run over the whole file
+    assert [len(batch) for batch in batches] == [40, 40, 40, 30]
+    assert pd.concat(batches).equals(CHAIN(pd.read_csv(IRIS_CSV)))
+
+
+@pytest.mark.parametrize("max_batches_in_flight", [1, 2])
+def test_stream_is_bounded(max_batches_in_flight):
+    streaming_runner = StreamingRunner(
+        block=CHAIN, max_batches_in_flight=max_batches_in_flight
+    )
+
+    # Count the batches pulled from the input before the first output
+    pulled = []
+
+    def batches():
+        for batch in read_csv_batches(IRIS_CSV, batch_size=10):
+            pulled.append(len(batch))
+            yield batch
+
+    stream = streaming_runner.stream(batches())
+    next(stream)
+    assert len(pulled) == max_batches_in_flight
+    stream.close()
+
+
+def test_run_in_batches(tmp_path):
+    iris = pd.read_csv(IRIS_CSV)
+    streaming_runner = StreamingRunner(block=CHAIN, batch_size=25)
+    assert streaming_runner(iris).equals(CHAIN(iris))
+
+    # Stream from one csv file to another
+    output_csv = str(tmp_path / "output.csv")
+    num_rows = write_csv_batches(
+        streaming_runner.stream(read_csv_batches(IRIS_CSV, batch_size=25)),
+        output_csv,
+        index=False,
+    )
+    assert num_rows == len(iris)
+    assert len(pd.read_csv(output_csv)) == len(iris)
+
+
+def test_run_empty_input():
+    iris = pd.read_csv(IRIS_CSV).iloc[0:0]
+    streaming_runner = StreamingRunner(block=CHAIN, batch_size=25)
+    result = streaming_runner(iris)
+
+    # The block still runs once, on the empty frame
+    assert result.empty
+    assert result.equals(CHAIN(iris))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
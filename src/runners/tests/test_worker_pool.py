@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+from src.runners.worker_pool import (
+    WorkerPool,
+    get_shared_pool,
+    shutdown_shared_pools,
+    start_shared_pool,
+)
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(10)), "ColumnB": list(range(10, 20))})
+
+
+# Setup for test
+class DummyBlock(BlockBase):
+    def __call__(self, input_df: pd.DataFrame):
+        # A simple transformation, for example, adding a constant to a column
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+@pytest.fixture(autouse=True)
+def clean_shared_pools():
+    # Make sure every test starts and ends without any shared pools
+    shutdown_shared_pools()
+    yield
+    shutdown_shared_pools()
+
+
+####################################################################################################
+# The following tests are for the WorkerPool class                                                 #
+####################################################################################################
+
+
+@pytest.mark.parametrize("use_process_pool", [True, False])
+def test_worker_pool_lifecycle(use_process_pool):
+    pool = WorkerPool(use_process_pool=use_process_pool, max_workers=2)
+    assert not pool.is_running
+
+    # Start is idempotent and returns the same executor
+    executor = pool.start()
+    assert pool.is_running
+    assert pool.start() is executor
+
+    # Warm up runs one task on every worker
+    pids = pool.warm_up(modules=["pandas"])
+    assert len(pids) == 2
+    if use_process_pool:
+        assert len(set(pids)) == 2
+
+    # Shutdown and restart creates a new executor
+    pool.shutdown()
+    assert not pool.is_running
+    assert pool.start() is not executor
+    pool.shutdown()
+
+
+def test_shared_pool_is_reused():
+    pool = start_shared_pool(use_process_pool=False, max_workers=2)
+    assert get_shared_pool(use_process_pool=False) is pool
+    assert get_shared_pool(use_process_pool=True) is not pool
+
+    # Resizing the shared pool replaces it
+    resized = start_shared_pool(use_process_pool=False, max_workers=3)
+    assert resized is not pool
+    assert resized.max_workers == 3
+
+
+@pytest.mark.parametrize(
+    "use_process_pool, use_thread_pool", [(True, False), (False, True)]
+)
+def test_parallel_runner_shared_pool(use_process_pool, use_thread_pool):
+    pool = start_shared_pool(use_process_pool=use_process_pool, max_workers=2)
+    executor = pool.executor
+
+    # Run two different runners attached to the same shared pool
+    for _ in range(2):
+        block_runner = ParallelRunner(
+            block=DummyBlock(),
+            chunk_size=3,
+            use_process_pool=use_process_pool,
+            use_thread_pool=use_thread_pool,
+            use_shared_pool=True,
+        )
+        result = block_runner(TEST_DATA).sort_values(by="ColumnA")
+        assert list(result["ColumnA"]) == list(range(1, 11))
+
+    # The executor was not recreated between the runs
+    assert pool.executor is executor
+
+
+def test_nested_runners_shared_pool():
+    start_shared_pool(use_process_pool=False, max_workers=2)
+
+    # The outer chunks hold every worker of the shared pool, the inner runners
+    # run their chunks on their own executor instead of waiting for a worker
+    inner = ParallelRunner(
+        block=DummyBlock(), num_chunks=2, use_thread_pool=True, use_shared_pool=True
+    )
+    outer = ParallelRunner(
+        block=inner, num_chunks=2, use_thread_pool=True, use_shared_pool=True
+    )
+    result = outer(TEST_DATA).sort_values(by="ColumnA")
+    assert list(result["ColumnA"]) == list(range(1, 11))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
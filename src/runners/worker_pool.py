@@ -0,0 +1,207 @@
+import atexit
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules imported by every worker during warm up so the first real task does not pay for them
+DEFAULT_WARM_UP_MODULES: List[str] = ["pandas", "numpy"]
+
+# Seconds the warm up tasks wait for every worker to pick one up
+WARM_UP_TIMEOUT: float = 60.0
+
+# Id of the pool the current thread is a worker of, see WorkerPool.in_worker
+_worker_state = threading.local()
+
+
+def _init_worker(pool_id: str) -> None:
+    """Mark the current thread as a worker of the pool with the given id."""
+    _worker_state.pool_id = pool_id
+
+
+def _warm_up_worker(modules: List[str], barrier: Any) -> int:
+    """Import the given modules inside a worker, then wait until every worker runs a
+    warm up task so that no worker takes two of them, and return the worker pid."""
+    for module in modules:
+        importlib.import_module(module)
+    barrier.wait(timeout=WARM_UP_TIMEOUT)
+    return os.getpid()
+
+
+class WorkerPool:
+    """Long-lived executor that can be shared by many ParallelRunner instances.
+
+    Creating a ProcessPoolExecutor / ThreadPoolExecutor for every call means the
+    workers (and their imports) are rebuilt for every stage. A WorkerPool is
+    started once, optionally warmed up, and then reused until shutdown.
+    """
+
+    def __init__(
+        self, use_process_pool: bool = False, max_workers: Optional[int] = None
+    ):
+        """Initialize the pool, the executor is not created until start is called."""
+        self.use_process_pool = use_process_pool
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pool_id = uuid.uuid4().hex
+
+    @property
+    def kind(self) -> str:
+        """Return the kind of executor backing this pool"""
+        return "process" if self.use_process_pool else "thread"
+
+    @property
+    def is_running(self) -> bool:
+        """Return whether the underlying executor has been started"""
+        return self._executor is not None
+
+    def in_worker(self) -> bool:
+        """Return whether the caller runs in a worker thread of this pool. Waiting
+        there on tasks submitted to the pool can deadlock, as the tasks may be
+        queued behind the ones holding every worker."""
+        return getattr(_worker_state, "pool_id", None) == self._pool_id
+
+    @property
+    def executor(self) -> Executor:
+        """Return the running executor, starting it if required"""
+        return self.start()
+
+    def start(self) -> Executor:
+        """Start the underlying executor if it is not already running."""
+        with self._lock:
+            if self._executor is None:
+                logger.debug(
+                    f"Starting {self.kind} worker pool with {self.max_workers} workers"
+                )
+                executor_cls = (
+                    ProcessPoolExecutor if self.use_process_pool else ThreadPoolExecutor
+                )
+                self._executor = executor_cls(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self._pool_id,),
+                )
+            return self._executor
+
+    def warm_up(self, modules: Optional[List[str]] = None) -> List[int]:
+        """Submit one task per worker so every worker is spawned and has imported the
+        given modules before the first real task arrives. The tasks wait on a
+        barrier until all of them run, so each one runs on a different worker.
+
+        Args:
+            modules: Modules to import in each worker, defaults to DEFAULT_WARM_UP_MODULES.
+        Returns:
+            pids: The pids of the workers that ran a warm up task.
+        """
+        modules = DEFAULT_WARM_UP_MODULES if modules is None else modules
+        executor = self.start()
+        if self.use_process_pool:
+            # A manager barrier can be passed to the tasks of a process pool
+            with multiprocessing.Manager() as manager:
+                pids = self._run_warm_up(
+                    executor, modules, manager.Barrier(self.max_workers)
+                )
+        else:
+            pids = self._run_warm_up(
+                executor, modules, threading.Barrier(self.max_workers)
+            )
+        logger.debug(f"Warmed up {self.kind} worker pool with modules {modules}")
+        return pids
+
+    def _run_warm_up(
+        self, executor: Executor, modules: List[str], barrier: Any
+    ) -> List[int]:
+        """Run one warm up task per worker and return their pids."""
+        futures = [
+            executor.submit(_warm_up_worker, modules, barrier)
+            for _ in range(self.max_workers)
+        ]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shutdown the underlying executor, the pool can be started again later."""
+        with self._lock:
+            if self._executor is not None:
+                logger.debug(f"Shutting down {self.kind} worker pool")
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown()
+
+
+####################################################################################################
+# Process wide shared pools                                                                        #
+####################################################################################################
+
+_SHARED_POOLS: Dict[bool, WorkerPool] = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def start_shared_pool(
+    use_process_pool: bool = False,
+    max_workers: Optional[int] = None,
+    warm_up: bool = False,
+    warm_up_modules: Optional[List[str]] = None,
+) -> WorkerPool:
+    """Start (or resize) the process wide pool of the given kind.
+
+    Args:
+        use_process_pool: Whether to start the process pool, otherwise the thread pool.
+        max_workers: Number of workers, defaults to the number of cpus.
+        warm_up: Whether to warm up the workers once started.
+        warm_up_modules: Modules to import in each worker when warming up.
+    Returns:
+        pool: The shared pool.
+    """
+    with _SHARED_POOLS_LOCK:
+        pool = _SHARED_POOLS.get(use_process_pool)
+        if (
+            pool is not None
+            and max_workers is not None
+            and pool.max_workers != max_workers
+        ):
+            pool.shutdown()
+            pool = None
+        if pool is None:
+            pool = WorkerPool(
+                use_process_pool=use_process_pool, max_workers=max_workers
+            )
+            _SHARED_POOLS[use_process_pool] = pool
+    pool.start()
+    if warm_up:
+        pool.warm_up(modules=warm_up_modules)
+    return pool
+
+
+def get_shared_pool(use_process_pool: bool = False) -> WorkerPool:
+    """Return the process wide pool of the given kind, starting it with defaults if needed."""
+    with _SHARED_POOLS_LOCK:
+        pool = _SHARED_POOLS.get(use_process_pool)
+    if pool is None:
+        return start_shared_pool(use_process_pool=use_process_pool)
+    return pool
+
+
+def shutdown_shared_pools(wait: bool = True) -> None:
+    """Shutdown every process wide pool."""
+    with _SHARED_POOLS_LOCK:
+        pools = list(_SHARED_POOLS.values())
+        _SHARED_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
+
+atexit.register(shutdown_shared_pools)
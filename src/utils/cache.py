@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+from pydantic import BaseModel
+
+from src.params_base import RUN_CONTROL_PARAMS
+
+logger = logging.getLogger(__name__)
+
+# Extension of the cached result files
+CACHE_SUFFIX = ".pkl.gz"
+# Default upper bound on the size of a cache directory, 1 GiB
+DEFAULT_MAX_BYTES: int = 1 << 30
+
+
+def fingerprint_frame(input_df: pd.DataFrame) -> str:
+    """Return a fast content hash of the frame (values, index, columns and dtypes)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(input_df.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in input_df.dtypes]).encode())
+    # One vectorized uint64 hash per row, including the index
+    row_hashes = pd.util.hash_pandas_object(input_df, index=True)
+    digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def describe(value: Any) -> Any:
+    """Return a json friendly description of a block, its params and nested blocks.
+
+    Block ids are random per instance and run control params do not change the
+    result, so both are left out.
+    """
+    if isinstance(value, BaseModel):
+        return {
+            "class": f"{value.__class__.__module__}.{value.__class__.__qualname__}",
+            "fields": {
+                name: describe(getattr(value, name))
+                for name in value.__class__.model_fields
+                if name != "id" and name not in RUN_CONTROL_PARAMS
+            },
+        }
+    if isinstance(value, dict):
+        return {str(key): describe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [describe(item) for item in value]
+    return repr(value)
+
+
+def is_cacheable(value: Any) -> bool:
+    """Return whether the block and every nested block (e.g. of a runner) is cacheable."""
+    if isinstance(value, BaseModel):
+        return getattr(value, "cacheable", True) and all(
+            is_cacheable(getattr(value, name)) for name in value.__class__.model_fields
+        )
+    if isinstance(value, dict):
+        return all(is_cacheable(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(is_cacheable(item) for item in value)
+    return True
+
+
+def block_hash(block: BaseModel) -> str:
+    """Return a hash of the block class, its params and every nested block."""
+    description = json.dumps(describe(block), sort_keys=True)
+    return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+
+class BlockCache:
+    """Content addressed cache of block results in a local directory.
+
+    Results are keyed on the fingerprint of the input frame and the hash of the
+    block class, its params and every nested block (e.g. of a runner), and
+    stored as compressed pickles (pandas keeps the columns of a frame in
+    contiguous blocks, so this round trips every dtype exactly without an extra
+    dependency). Reading a result touches its file, and
+    the least recently used files are evicted once the directory grows past
+    max_bytes. The directory can be shared by several processes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Counters for this process
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def key(self, block, input_df: pd.DataFrame) -> str:
+        """Return the cache key of running the block on the input frame."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(block_hash(block).encode())
+        digest.update(fingerprint_frame(input_df).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """Return the path of the file holding the result for the key."""
+        return os.path.join(self.cache_dir, f"{key}{CACHE_SUFFIX}")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached result for the key, or None on a miss."""
+        path = self.path(key)
+        try:
+            result = pd.read_pickle(path, compression="gzip")
+            # Mark the entry as recently used
+            os.utime(path)
+        except (FileNotFoundError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result_df: pd.DataFrame) -> None:
+        """Store the result for the key, then evict old entries if over max_bytes."""
+        path = self.path(key)
+        # Write to a temporary file first so readers never see a partial result
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        result_df.to_pickle(
+            tmp_path, compression={"method": "gzip", "compresslevel": 1}
+        )
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self) -> list:
+        """Return (last used, size, path) of every cached result."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        """Return the total size in bytes of the cached results."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        """Remove the least recently used results until the cache fits in max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            logger.debug(f"Evicted {evicted} results from cache {self.cache_dir}")
+            with self._lock:
+                self.evictions += evicted
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit, miss and eviction counters of this process."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# One cache per (directory, size) so the counters are shared by every block using it
+_CACHES: Dict[Tuple[str, int], BlockCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> BlockCache:
+    """Return the process wide cache for the given directory."""
+    cache_key = (os.path.abspath(cache_dir), max_bytes)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_key)
+        if cache is None:
+            cache = BlockCache(cache_dir=cache_key[0], max_bytes=max_bytes)
+            _CACHES[cache_key] = cache
+    return cache
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+
+def duplicated_rows(input_df: pd.DataFrame, id_col: str) -> np.ndarray:
+    """Return a mask of the rows equal to an earlier row, using the id column to
+    find the candidates.
+
+    Only rows sharing an id with another row are compared value by value, so a
+    frame of row hashes without duplicates is checked in a single pass over the
+    compact ids. Rows sharing an id but differing in any value (e.g. supplied
+    ids reused by distinct rows, or a hash collision) are not duplicates.
+    """
+    candidates = input_df[id_col].duplicated(keep=False).to_numpy()
+    duplicated = np.zeros(len(input_df), dtype=bool)
+    if candidates.any():
+        duplicated[candidates] = input_df[candidates].duplicated().to_numpy()
+    return duplicated
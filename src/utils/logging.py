@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 LOG_MAPPING = {
     "DEBUG": logging.DEBUG,
@@ -7,14 +8,28 @@ LOG_MAPPING = {
     "ERROR": logging.ERROR,
 }
 
+# Level the logging of the current process was initialized with, None if not yet
+_initialized_level: Optional[str] = None
+
 
 def init_logging(level: str = "INFO"):
-    """Initialize the logging with the given level."""
+    """Initialize the logging with the given level, once per process.
+
+    Blocks call this on every call, so later calls return right away. As with
+    logging.basicConfig the first level wins, use logging.getLogger().setLevel
+    to change it afterwards.
+    """
+    global _initialized_level
+    if level == _initialized_level:
+        return
     if level not in LOG_MAPPING:
         raise ValueError(f"Invalid logging level: {level}")
+    if _initialized_level is not None:
+        return
 
     logging.basicConfig(
         level=LOG_MAPPING[level],
         format="%(asctime)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
+    _initialized_level = level
@@ -0,0 +1,145 @@
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.utils.tracing import Span, get_tracer
+
+# Columns of the summary table, one row per block name
+SUMMARY_COLUMNS: List[str] = [
+    "block",
+    "calls",
+    "failed",
+    "wall_seconds",
+    "cpu_seconds",
+    "cpu_ratio",
+    "mean_call_seconds",
+    "max_call_seconds",
+    "rows_in",
+    "rows_out",
+    "rows_per_sec",
+    "bytes_in",
+    "bytes_out",
+    "max_rss_delta",
+]
+
+
+def span_tree(spans: List[Span], root_id: int) -> List[Span]:
+    """Return the span with the given id and every span nested in it."""
+    children: Dict[Optional[int], List[Span]] = {}
+    for span in spans:
+        children.setdefault(span.parent_id, []).append(span)
+    tree = [span for span in spans if span.span_id == root_id]
+    for span in tree:
+        tree.extend(children.get(span.span_id, []))
+    return sorted(tree, key=lambda span: span.start_ns)
+
+
+def summary_table(spans: Optional[List[Span]] = None) -> pd.DataFrame:
+    """Return the metrics of every block over its calls, slowest block first.
+
+    The cpu_ratio is the CPU time of the calling threads over the wall time: a
+    runner that mostly waits for its workers has a ratio close to 0, a block
+    that computes has a ratio close to 1.
+
+    Args:
+        spans: The spans to summarize, defaults to every span of the process tracer.
+    """
+    spans = get_tracer().spans() if spans is None else spans
+    rows = []
+    for name, group in pd.DataFrame(spans, columns=Span._fields).groupby("name"):
+        call_seconds = (group["end_ns"] - group["start_ns"]) / 1e9
+        wall_seconds = call_seconds.sum()
+        cpu_seconds = group["cpu_ns"].sum() / 1e9
+        rows.append(
+            [
+                name,
+                len(group),
+                int(group["rows_out"].isna().sum()),
+                wall_seconds,
+                cpu_seconds,
+                cpu_seconds / wall_seconds if wall_seconds else 0.0,
+                call_seconds.mean(),
+                call_seconds.max(),
+                int(group["rows_in"].sum()),
+                int(group["rows_out"].sum()),
+                group["rows_in"].sum() / wall_seconds if wall_seconds else 0.0,
+                int(group["bytes_in"].sum()),
+                int(group["bytes_out"].sum()),
+                int(group["rss_delta"].max()),
+            ]
+        )
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    return summary.sort_values("wall_seconds", ascending=False, ignore_index=True)
+
+
+def chrome_trace(spans: Optional[List[Span]] = None) -> Dict[str, Any]:
+    """Return the spans as Chrome trace events, viewable in chrome://tracing or Perfetto.
+
+    Every span is a complete event on the row of its process and thread, with its
+    metrics as args. Spans nested in the same thread are drawn inside their parent,
+    children running in another thread or process are linked with a flow arrow.
+
+    Args:
+        spans: The spans to export, defaults to every span of the process tracer.
+    """
+    spans = get_tracer().spans() if spans is None else spans
+    threads = {span.span_id: (span.pid, span.thread_id) for span in spans}
+    events = []
+    for span in spans:
+        events.append(
+            {
+                "name": span.name,
+                "cat": "block",
+                "ph": "X",
+                "ts": span.start_ns / 1e3,
+                "dur": span.duration_ns / 1e3,
+                "pid": span.pid,
+                "tid": span.thread_id,
+                "args": {
+                    "block_id": span.block_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "cpu_ms": span.cpu_ns / 1e6,
+                    "rows_in": span.rows_in,
+                    "rows_out": span.rows_out,
+                    "rows_per_sec": span.rows_per_sec,
+                    "bytes_in": span.bytes_in,
+                    "bytes_out": span.bytes_out,
+                    "rss_delta": span.rss_delta,
+                },
+            }
+        )
+        parent = threads.get(span.parent_id)
+        if parent is not None and parent != (span.pid, span.thread_id):
+            flow = {"name": "chunk", "cat": "flow", "id": span.span_id}
+            events.append(
+                {
+                    **flow,
+                    "ph": "s",
+                    "ts": span.start_ns / 1e3,
+                    "pid": parent[0],
+                    "tid": parent[1],
+                }
+            )
+            events.append(
+                {
+                    **flow,
+                    "ph": "f",
+                    "bp": "e",
+                    "ts": span.start_ns / 1e3,
+                    "pid": span.pid,
+                    "tid": span.thread_id,
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: str, spans: Optional[List[Span]] = None) -> None:
+    """Write the spans as a Chrome trace JSON file atomically."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(chrome_trace(spans), f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,285 @@
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import shutil
+import sys
+import threading
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pydantic import BaseModel
+
+# Profilers a block can run under, see BlockParamBase.profile
+PROFILERS: List[str] = ["cprofile", "tracemalloc"]
+
+# Number of functions and allocation sites listed in a report
+REPORT_TOP: int = 25
+
+# Allocation sites kept in the raw dump of every call, before merging
+DUMP_TOP: int = 200
+
+# Sub directory of the profile dir holding the raw dumps of the calls
+RAW_DIR: str = "raw"
+
+# tracemalloc is process wide, it is started by the first profiled call and
+# stopped by the last one still running (e.g. in the threads of a pool)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+# cProfile can profile one call per process at a time (on Python 3.12+ it runs
+# on sys.monitoring, which takes every thread), the first profiled call owns it
+_cprofile_lock = threading.Lock()
+_cprofile_owned = False
+
+# Ids of the blocks whose call the current thread or task is profiling, so a
+# call is profiled once even if it hops to a worker thread (e.g. arun)
+_profiling: ContextVar[frozenset] = ContextVar("profiling", default=frozenset())
+
+
+def profile_name(block: BaseModel) -> str:
+    """Return the name of the report of a block, unique per block instance."""
+    return f"{block.__class__.__name__}-{block.id[:8]}"
+
+
+def raw_dir(block: BaseModel) -> str:
+    """Return the directory holding the raw dumps of the calls of a block."""
+    return os.path.join(block.params.profile_dir, RAW_DIR, profile_name(block))
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write a file atomically, so a report is never read half written."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _start_cprofile() -> Any:
+    """Start profiling calls, returns the profiler, None if another call of the
+    process or another profiling tool already profiles."""
+    global _cprofile_owned
+    with _cprofile_lock:
+        if _cprofile_owned or sys.getprofile() is not None:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another tool already profiles through sys.monitoring
+            return None
+        _cprofile_owned = True
+        return profiler
+
+
+def _stop_cprofile(profiler: Any) -> None:
+    """Stop the profiler started by _start_cprofile."""
+    global _cprofile_owned
+    profiler.disable()
+    with _cprofile_lock:
+        _cprofile_owned = False
+
+
+def _start_tracemalloc() -> Any:
+    """Start tracing allocations, returns the snapshot to diff against, None if
+    tracing started with this call."""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            return None
+        return tracemalloc.take_snapshot()
+
+
+def _stop_tracemalloc(before: Any) -> Dict[str, Any]:
+    """Return the allocation sites and peak traced memory since _start_tracemalloc."""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+    own_frames = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    snapshot = snapshot.filter_traces(own_frames)
+    if before is None:
+        stats = snapshot.statistics("lineno")
+    else:
+        stats = snapshot.compare_to(before.filter_traces(own_frames), "lineno")
+    sites = []
+    for stat in stats[:DUMP_TOP]:
+        frame = stat.traceback[0]
+        size = getattr(stat, "size_diff", stat.size)
+        count = getattr(stat, "count_diff", stat.count)
+        if size > 0:
+            sites.append([frame.filename, frame.lineno, size, count])
+    return {"peak": peak, "sites": sites}
+
+
+@contextmanager
+def profiled(block: BaseModel) -> Iterator[None]:
+    """Run the body under the profilers of block.params.profile and dump the
+    profile of the call to the raw dir of the block.
+
+    Every process and thread dumps its own calls, so calls made in pool workers
+    are profiled too, see write_reports for merging them. cProfile is skipped
+    when another call of the process is already profiled (e.g. by a profiled
+    enclosing block, or a block running in another thread of a pool), whose
+    profile then includes this call on the same thread, and on every thread
+    from Python 3.12. tracemalloc traces the whole process, so with blocks
+    running concurrently in threads the allocation sites of a call include the
+    allocations of the others.
+    """
+    profiling = _profiling.get()
+    if block.id in profiling:
+        yield
+        return
+    token = _profiling.set(profiling | {block.id})
+    profilers = block.params.profile
+    profiler, traced, before = None, False, None
+    try:
+        if "tracemalloc" in profilers:
+            before = _start_tracemalloc()
+            traced = True
+        if "cprofile" in profilers:
+            profiler = _start_cprofile()
+        yield
+    finally:
+        if profiler is not None:
+            _stop_cprofile(profiler)
+        _profiling.reset(token)
+        allocations = _stop_tracemalloc(before) if traced else None
+
+        directory = raw_dir(block)
+        os.makedirs(directory, exist_ok=True)
+        name = f"{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}"
+        if profiler is not None:
+            profiler.create_stats()
+            path = os.path.join(directory, f"{name}.prof")
+            write_atomic(path, marshal.dumps(profiler.stats))
+        if allocations is not None:
+            path = os.path.join(directory, f"{name}.json")
+            write_atomic(path, json.dumps(allocations).encode())
+
+
+def profiled_blocks(value: Any) -> List[BaseModel]:
+    """Return the block and every nested block (e.g. of a runner) that is profiled."""
+    if isinstance(value, BaseModel):
+        blocks = []
+        params = getattr(value, "params", None)
+        if getattr(params, "profile", None) and hasattr(value, "id"):
+            blocks.append(value)
+        for name in value.__class__.model_fields:
+            if name != "params":
+                blocks.extend(profiled_blocks(getattr(value, name)))
+        return blocks
+    if isinstance(value, dict):
+        return [block for item in value.values() for block in profiled_blocks(item)]
+    if isinstance(value, (list, tuple)):
+        return [block for item in value for block in profiled_blocks(item)]
+    return []
+
+
+def reset_profiles(blocks: List[BaseModel]) -> None:
+    """Remove the raw dumps left by earlier runs of the blocks."""
+    for block in blocks:
+        shutil.rmtree(raw_dir(block), ignore_errors=True)
+
+
+def merge_dumps(directory: str) -> Tuple[Any, Dict[str, Any]]:
+    """Merge the raw dumps of a directory.
+
+    Returns:
+        stats: The pstats.Stats of every call, None if none was run under cProfile.
+        allocations: The allocation sites summed over the calls, largest first,
+            the maximum peak traced memory, the number of calls and of processes.
+    """
+    stats = None
+    sites: Dict[Tuple[str, int], List[int]] = {}
+    peak, calls = 0, set()
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        if file_name.endswith(".prof"):
+            if stats is None:
+                stats = pstats.Stats(path, stream=io.StringIO())
+            else:
+                stats.add(path)
+        elif file_name.endswith(".json"):
+            with open(path) as f:
+                dump = json.load(f)
+            peak = max(peak, dump["peak"])
+            for filename, lineno, size, count in dump["sites"]:
+                site = sites.setdefault((filename, lineno), [0, 0])
+                site[0] += size
+                site[1] += count
+        else:
+            continue
+        # Both profilers of a call dump to files of the same name
+        calls.add(os.path.splitext(file_name)[0])
+    ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+    allocations = {
+        "peak": peak,
+        "sites": [[*site, *totals] for site, totals in ranked],
+        "calls": len(calls),
+        "processes": len({call.split("-")[0] for call in calls}),
+    }
+    return stats, allocations
+
+
+def format_report(
+    block: BaseModel, stats: Any, allocations: Dict[str, Any], top: int = REPORT_TOP
+) -> str:
+    """Return the text report of the merged profiles of a block."""
+    lines = [
+        f"Profile of {block.__class__.__name__} [{block.id}]",
+        f"{allocations['calls']} calls in {allocations['processes']} processes",
+        "",
+    ]
+    if stats is not None:
+        stream = io.StringIO()
+        stats.stream = stream
+        # The raw dumps it was loaded from are removed once merged
+        stats.files = []
+        stats.sort_stats("cumulative").print_stats(top)
+        lines += [f"Top {top} functions by cumulative time", stream.getvalue()]
+    if allocations["sites"]:
+        lines.append(
+            f"Top {top} allocation sites (peak traced memory "
+            f"{allocations['peak'] / 2**20:.1f} MiB)"
+        )
+        for filename, lineno, size, count in allocations["sites"][:top]:
+            lines.append(
+                f"{size / 2**10:12.1f} KiB {count:10d} blocks  {filename}:{lineno}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def write_reports(blocks: List[BaseModel], top: int = REPORT_TOP) -> List[str]:
+    """Merge the raw dumps of every block into one report per block, written to
+    its profile dir as <name>.txt along with the merged cProfile stats as
+    <name>.prof (readable by pstats or snakeviz). The raw dumps are removed.
+
+    Returns:
+        The paths of the written reports.
+    """
+    paths = []
+    for block in blocks:
+        directory = raw_dir(block)
+        if not os.path.isdir(directory):
+            continue
+        stats, allocations = merge_dumps(directory)
+        path = os.path.join(block.params.profile_dir, profile_name(block))
+        if stats is not None:
+            write_atomic(f"{path}.prof", marshal.dumps(stats.stats))
+        write_atomic(
+            f"{path}.txt", format_report(block, stats, allocations, top).encode()
+        )
+        shutil.rmtree(directory, ignore_errors=True)
+        paths.append(f"{path}.txt")
+    return paths
@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Schema of a frame, the dtype family of every column
+Schema = Dict[str, str]
+
+# Dtype families a schema may require, "any" accepts every dtype and is also the
+# family of an output column whose dtype a block does not know in advance
+DTYPE_FAMILIES: List[str] = [
+    "any",
+    "numeric",
+    "int",
+    "float",
+    "bool",
+    "string",
+    "category",
+    "datetime",
+    "timedelta",
+]
+
+# Families accepted by every required family, besides itself
+ACCEPTED_FAMILIES: Dict[str, set] = {"numeric": {"int", "float"}}
+
+
+def dtype_family(dtype) -> str:
+    """Return the family of a dtype, object columns are assumed to hold strings."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return "timedelta"
+    if pd.api.types.is_string_dtype(dtype):
+        return "string"
+    return "any"
+
+
+def frame_schema(input_df: pd.DataFrame, columns: Optional[List[str]] = None) -> Schema:
+    """Return the schema of the frame, or of the given columns that it has."""
+    dtypes = input_df.dtypes
+    if columns is not None:
+        dtypes = dtypes[dtypes.index.isin(columns)]
+    return {col: dtype_family(dtype) for col, dtype in dtypes.items()}
+
+
+def check_schema(required: Schema, schema: Schema, name: str) -> bool:
+    """Check that a frame with the given schema satisfies the required schema.
+
+    Args:
+        required: The family required of every column.
+        schema: The schema of the frame, columns of family "any" have an unknown dtype.
+        name: The name of the block, used in error messages.
+    Returns:
+        Whether the frame is proven to satisfy the required schema, False if a
+        required column has an unknown dtype.
+    Raises:
+        ValueError: If a required column is missing or has the wrong family.
+    """
+    unknown = set(required.values()) - set(DTYPE_FAMILIES)
+    if unknown:
+        raise ValueError(f"Block {name} requires unknown dtype families {unknown}")
+    missing = [col for col in required if col not in schema]
+    if missing:
+        raise ValueError(f"Block {name} reads missing columns {missing}")
+
+    verified, mismatched = True, {}
+    for col, family in required.items():
+        actual = schema[col]
+        if family == "any" or family == actual:
+            continue
+        if actual == "any":
+            verified = False
+        elif actual not in ACCEPTED_FAMILIES.get(family, set()):
+            mismatched[col] = f"{actual} instead of {family}"
+    if mismatched:
+        raise ValueError(f"Block {name} reads columns of the wrong type {mismatched}")
+    return verified
+
+
+# Ids of the blocks whose input a runner proved valid for the whole run (see
+# BlockBase.check_schema), their calls skip validate_columns
+_checked_blocks: ContextVar[frozenset] = ContextVar(
+    "checked_blocks", default=frozenset()
+)
+
+
+def checked_blocks() -> frozenset:
+    """Return the ids of the blocks whose input is proven valid for the current run."""
+    return _checked_blocks.get()
+
+
+def merge_checks(checks: Dict[str, bool], other: Dict[str, bool]) -> Dict[str, bool]:
+    """Merge the checks of two blocks, a block checked by both is only proven
+    valid if it is proven by both (e.g. a block used by two stages)."""
+    merged = dict(checks)
+    for block_id, proven in other.items():
+        merged[block_id] = merged.get(block_id, True) and proven
+    return merged
+
+
+@contextmanager
+def schema_checked(checks: Dict[str, bool]) -> Iterator[None]:
+    """Run the body with the blocks proven valid by checks (by block id) skipping
+    validate_columns, and the blocks that are not proven validating it."""
+    proven = {block_id for block_id, valid in checks.items() if valid}
+    token = _checked_blocks.set((_checked_blocks.get() - set(checks)) | proven)
+    try:
+        yield
+    finally:
+        _checked_blocks.reset(token)
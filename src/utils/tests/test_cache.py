@@ -0,0 +1,143 @@
+import os
+from typing import ClassVar
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.params_base import BlockParamBase
+from src.runners.parallel_runner import ParallelRunner
+from src.utils.cache import BlockCache, fingerprint_frame, get_cache
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(100)), "ColumnB": list(range(100))})
+
+
+# Setup for test
+class CountingParams(BlockParamBase):
+    increment: int = 1
+
+
+class CountingBlock(BlockBase):
+    params: CountingParams = CountingParams()
+
+    # Number of times run was actually called, shared by every instance
+    calls: ClassVar[int] = 0
+
+    def run(self, input_df: pd.DataFrame):
+        CountingBlock.calls += 1
+        result_df = input_df.copy()
+        result_df["ColumnA"] += self.params.increment
+        return result_df
+
+
+class RandomBlock(CountingBlock):
+    cacheable: ClassVar[bool] = False
+
+    def run(self, input_df: pd.DataFrame):
+        result_df = super().run(input_df)
+        result_df["Noise"] = np.random.random(len(result_df))
+        return result_df
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CountingBlock.calls = 0
+
+
+####################################################################################################
+# The following tests are for the block result cache                                               #
+####################################################################################################
+
+
+def test_fingerprint_frame():
+    assert fingerprint_frame(TEST_DATA) == fingerprint_frame(TEST_DATA.copy())
+
+    # Values, index, column names and dtypes all change the fingerprint
+    changed = TEST_DATA.copy()
+    changed.loc[50, "ColumnB"] = -1
+    assert fingerprint_frame(changed) != fingerprint_frame(TEST_DATA)
+    assert fingerprint_frame(TEST_DATA.iloc[::-1]) != fingerprint_frame(TEST_DATA)
+    assert fingerprint_frame(
+        TEST_DATA.rename(columns={"ColumnB": "ColumnC"})
+    ) != fingerprint_frame(TEST_DATA)
+    assert fingerprint_frame(TEST_DATA.astype(float)) != fingerprint_frame(TEST_DATA)
+
+
+def test_cached_block(tmp_path):
+    params = CountingParams(cache_dir=str(tmp_path))
+    cache = get_cache(str(tmp_path))
+
+    first = CountingBlock(params=params)(TEST_DATA)
+    second = CountingBlock(params=params)(TEST_DATA)
+    assert first.equals(second)
+    assert CountingBlock.calls == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+    # Other params or input are a different entry, run control params are not
+    CountingBlock(params=params.model_copy(update={"increment": 2}))(TEST_DATA)
+    CountingBlock(params=params)(TEST_DATA.iloc[:10])
+    CountingBlock(params=params.model_copy(update={"log_level": "DEBUG"}))(TEST_DATA)
+    assert CountingBlock.calls == 3
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_nested_blocks_change_the_key(tmp_path):
+    params = BlockParamBase(cache_dir=str(tmp_path))
+
+    # Runners with the same params wrapping different blocks are different entries
+    results = [
+        ParallelRunner(
+            block=CountingBlock(params=CountingParams(increment=increment)),
+            num_chunks=2,
+            use_thread_pool=True,
+            params=params,
+        )(TEST_DATA)
+        for increment in [1, 5]
+    ]
+    assert list(results[0]["ColumnA"]) == list(TEST_DATA["ColumnA"] + 1)
+    assert list(results[1]["ColumnA"]) == list(TEST_DATA["ColumnA"] + 5)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_non_deterministic_block_is_not_cached(tmp_path):
+    params = CountingParams(cache_dir=str(tmp_path))
+    RandomBlock(params=params)(TEST_DATA)
+    RandomBlock(params=params)(TEST_DATA)
+    assert CountingBlock.calls == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_runner_of_non_deterministic_block_is_not_cached(tmp_path):
+    # A runner is only cached if every block nested in it is cacheable
+    params = BlockParamBase(cache_dir=str(tmp_path))
+    runner = ParallelRunner(
+        block=RandomBlock(), num_chunks=2, use_thread_pool=True, params=params
+    )
+    first = runner(TEST_DATA)
+    second = runner(TEST_DATA)
+    assert CountingBlock.calls == 4
+    assert not first["Noise"].equals(second["Noise"])
+    assert os.listdir(tmp_path) == []
+
+
+def test_lru_eviction(tmp_path):
+    cache = BlockCache(cache_dir=str(tmp_path))
+    frames = [TEST_DATA + i for i in range(3)]
+    for i, frame in enumerate(frames):
+        cache.put(str(i), frame)
+        os.utime(cache.path(str(i)), ns=(i, i))
+    entry_size = cache.size() // 3
+
+    # Using entry 0 makes entry 1 the least recently used
+    assert cache.get("0").equals(frames[0])
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+    assert cache.evict() == 1
+    assert cache.get("1") is None
+    assert cache.get("2").equals(frames[2])
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,90 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+from src.runners.sequential_runner import SequentialRunner
+from src.utils.metrics import (SUMMARY_COLUMNS, chrome_trace,
+                               export_chrome_trace, span_tree, summary_table)
+from src.utils.tracing import configure_tracing
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(100))})
+
+
+# Setup for test
+class IncrementBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        result_df = input_df.copy()
+        result_df["ColumnA"] += 1
+        return result_df
+
+
+@pytest.fixture(autouse=True)
+def tracer():
+    # Every test gets a fresh process wide tracer
+    yield configure_tracing()
+    configure_tracing()
+
+
+def run_pipeline() -> None:
+    SequentialRunner(
+        block_map={
+            1: IncrementBlock(),
+            2: ParallelRunner(
+                block=IncrementBlock(), num_chunks=4, use_thread_pool=True
+            ),
+        }
+    )(TEST_DATA)
+
+
+####################################################################################################
+# The following tests are for the metrics exports                                                  #
+####################################################################################################
+
+
+def test_summary_table():
+    run_pipeline()
+    summary = summary_table().set_index("block")
+    assert list(summary.columns) == SUMMARY_COLUMNS[1:]
+    assert summary.loc["IncrementBlock", "calls"] == 5
+    assert summary.loc["IncrementBlock", "rows_in"] == 200
+    assert summary.loc["ParallelRunner", "rows_out"] == 100
+    assert summary.loc["SequentialRunner", "bytes_in"] == 800
+    assert summary.loc["SequentialRunner", "failed"] == 0
+    assert summary_table([]).empty
+
+
+def test_span_tree(tracer):
+    run_pipeline()
+    spans = tracer.spans()
+    root = [span for span in spans if span.name == "SequentialRunner"][0]
+    parallel = [span for span in spans if span.name == "ParallelRunner"][0]
+    assert len(span_tree(spans, root.span_id)) == 7
+    assert [span.name for span in span_tree(spans, parallel.span_id)] == [
+        "ParallelRunner"
+    ] + ["IncrementBlock"] * 4
+
+
+def test_chrome_trace(tmp_path):
+    run_pipeline()
+    trace = chrome_trace()
+    complete = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert len(complete) == 7
+    assert all(event["dur"] >= 0 for event in complete)
+
+    # Every chunk run in a worker thread is linked to the runner by a flow
+    starts = [event for event in trace["traceEvents"] if event["ph"] == "s"]
+    ends = [event for event in trace["traceEvents"] if event["ph"] == "f"]
+    assert len(starts) == len(ends) == 4
+
+    path = tmp_path / "trace.json"
+    export_chrome_trace(str(path))
+    with open(path) as f:
+        assert json.load(f) == json.loads(json.dumps(trace))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import threading
+from typing import ClassVar
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from src.block_base import BlockBase
+from src.params_base import BlockParamBase
+from src.runners.parallel_runner import ParallelRunner
+from src.utils.profiling import profile_name, raw_dir
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(100))})
+
+
+# Setup for test
+class SquareBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        squares = [value * value for value in input_df["ColumnA"]]
+        return input_df.assign(ColumnB=squares)
+
+
+class AsyncSquareBlock(SquareBlock):
+    async def arun(self, input_df: pd.DataFrame):
+        await asyncio.sleep(0)
+        return self.run(input_df)
+
+
+class BarrierSquareBlock(SquareBlock):
+    # Holds every call until all of them are running, so they are profiled at once
+    barrier: ClassVar[threading.Barrier] = threading.Barrier(4)
+
+    def run(self, input_df: pd.DataFrame):
+        self.barrier.wait(timeout=10)
+        return super().run(input_df)
+
+
+class NestedSquareBlock(SquareBlock):
+    inner: SquareBlock
+
+    def run(self, input_df: pd.DataFrame):
+        return self.inner(super().run(input_df))
+
+
+def read_report(block: BlockBase) -> str:
+    path = os.path.join(block.params.profile_dir, f"{profile_name(block)}.txt")
+    with open(path) as f:
+        return f.read()
+
+
+####################################################################################################
+# The following tests are for the profile params                                                   #
+####################################################################################################
+
+
+def test_profile_params():
+    assert BlockParamBase().profile == []
+    assert BlockParamBase(profile=["cprofile", "tracemalloc"]).profile == [
+        "cprofile",
+        "tracemalloc",
+    ]
+    with pytest.raises(ValidationError):
+        BlockParamBase(profile=["perf"])
+
+
+def test_not_profiled(tmp_path):
+    block = SquareBlock(params=BlockParamBase(profile_dir=str(tmp_path)))
+    block(TEST_DATA)
+    assert os.listdir(tmp_path) == []
+
+
+####################################################################################################
+# The following tests are for the profile reports                                                  #
+####################################################################################################
+
+
+def test_profile_block(tmp_path):
+    params = BlockParamBase(
+        profile=["cprofile", "tracemalloc"], profile_dir=str(tmp_path)
+    )
+    block = SquareBlock(params=params)
+    result = block(TEST_DATA)
+    assert list(result["ColumnB"]) == [value * value for value in range(100)]
+
+    report = read_report(block)
+    assert "1 calls in 1 processes" in report
+    assert "functions by cumulative time" in report
+    assert "test_profiling.py" in report
+    assert "allocation sites" in report
+    assert os.path.exists(tmp_path / f"{profile_name(block)}.prof")
+
+    # The raw dumps are merged away, a second run replaces the report
+    assert not os.path.exists(raw_dir(block))
+    block(TEST_DATA)
+    assert "1 calls in 1 processes" in read_report(block)
+
+
+def test_profile_cprofile_only(tmp_path):
+    params = BlockParamBase(profile=["cprofile"], profile_dir=str(tmp_path))
+    block = SquareBlock(params=params)
+    block(TEST_DATA)
+    report = read_report(block)
+    assert "functions by cumulative time" in report
+    assert "allocation sites" not in report
+
+
+@pytest.mark.parametrize("block_cls", [SquareBlock, AsyncSquareBlock])
+def test_profile_async_call(tmp_path, block_cls):
+    params = BlockParamBase(
+        profile=["cprofile", "tracemalloc"], profile_dir=str(tmp_path)
+    )
+    block = block_cls(params=params)
+    asyncio.run(block.acall(TEST_DATA))
+
+    # Every call is profiled once, in the thread it runs in
+    report = read_report(block)
+    assert "1 calls in 1 processes" in report
+    assert "test_profiling.py" in report
+
+
+@pytest.mark.parametrize("pool", ["use_thread_pool", "use_process_pool"])
+def test_profile_pool_workers(tmp_path, pool):
+    params = BlockParamBase(
+        profile=["cprofile", "tracemalloc"], profile_dir=str(tmp_path)
+    )
+    block = SquareBlock(params=params)
+    runner = ParallelRunner(block=block, num_chunks=4, max_workers=2, **{pool: True})
+    result = runner(TEST_DATA)
+    assert len(result) == len(TEST_DATA)
+
+    # The profiles of every chunk are merged into the report of the block
+    report = read_report(block)
+    assert "4 calls in" in report
+    assert "test_profiling.py" in report
+    assert os.listdir(tmp_path / "raw") == []
+
+
+def test_profile_concurrent_calls(tmp_path):
+    # Only one call of the process runs cProfile at a time, the others are skipped
+    params = BlockParamBase(
+        profile=["cprofile", "tracemalloc"], profile_dir=str(tmp_path)
+    )
+    block = BarrierSquareBlock(params=params)
+    runner = ParallelRunner(
+        block=block, num_chunks=4, max_workers=4, use_thread_pool=True
+    )
+    assert len(runner(TEST_DATA)) == len(TEST_DATA)
+
+    report = read_report(block)
+    assert "4 calls in 1 processes" in report
+    assert "functions by cumulative time" in report
+
+
+def test_profile_nested_blocks(tmp_path):
+    params = BlockParamBase(
+        profile=["cprofile", "tracemalloc"], profile_dir=str(tmp_path)
+    )
+    inner = SquareBlock(params=params)
+    outer = NestedSquareBlock(params=params, inner=inner)
+    outer(TEST_DATA)
+
+    # The inner call is part of the cProfile profile of the outer call
+    assert "functions by cumulative time" in read_report(outer)
+    assert "1 calls in 1 processes" in read_report(inner)
+    assert "functions by cumulative time" not in read_report(inner)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.schema import (check_schema, checked_blocks, dtype_family,
+                              frame_schema, merge_checks, schema_checked)
+
+# Define test data
+TEST_DATA = pd.DataFrame(
+    {
+        "count": np.array([1, 2], dtype=np.int8),
+        "fare": [1.5, 2.5],
+        "flag": [True, False],
+        "name": ["a", "b"],
+        "weekday": pd.Categorical(["Mon", "Tue"]),
+        "date": pd.to_datetime(["2010-01-01", "2010-01-02"]),
+    }
+)
+
+####################################################################################################
+# The following tests are for the schema helpers                                                   #
+####################################################################################################
+
+
+def test_frame_schema():
+    assert frame_schema(TEST_DATA) == {
+        "count": "int",
+        "fare": "float",
+        "flag": "bool",
+        "name": "string",
+        "weekday": "category",
+        "date": "datetime",
+    }
+    assert frame_schema(TEST_DATA, columns=["fare", "missing"]) == {"fare": "float"}
+    assert dtype_family(pd.Series([1], dtype="Int64").dtype) == "int"
+
+
+def test_check_schema():
+    schema = frame_schema(TEST_DATA)
+    assert check_schema({"count": "numeric", "fare": "numeric"}, schema, "Block")
+    assert check_schema({"name": "any", "weekday": "category"}, schema, "Block")
+
+    # Columns of unknown type can not be proven valid
+    assert not check_schema({"fare": "numeric"}, {"fare": "any"}, "Block")
+
+    with pytest.raises(ValueError, match="missing columns"):
+        check_schema({"other": "any"}, schema, "Block")
+    with pytest.raises(ValueError, match="wrong type"):
+        check_schema({"name": "numeric"}, schema, "Block")
+    with pytest.raises(ValueError, match="unknown dtype families"):
+        check_schema({"fare": "decimal"}, schema, "Block")
+
+
+def test_merge_checks():
+    # A block is only proven valid if every check of it is
+    checks = merge_checks({"a": True, "b": True}, {"b": False, "c": True})
+    assert checks == {"a": True, "b": False, "c": True}
+
+
+def test_schema_checked():
+    assert checked_blocks() == frozenset()
+    with schema_checked({"a": True, "b": True}):
+        assert checked_blocks() == {"a", "b"}
+        with schema_checked({"b": False, "c": True}):
+            assert checked_blocks() == {"a", "c"}
+        assert checked_blocks() == {"a", "b"}
+    assert checked_blocks() == frozenset()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,162 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from src.block_base import BlockBase
+from src.runners.parallel_runner import ParallelRunner
+from src.utils.logging import init_logging
+from src.utils.metrics import summary_table
+from src.utils.tracing import Span, Tracer, configure_tracing, get_tracer
+
+# Define test data
+TEST_DATA = pd.DataFrame({"ColumnA": list(range(10))})
+
+
+# Setup for test
+class FilterBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        return input_df[input_df["ColumnA"] % 2 == 0]
+
+
+class FailingBlock(BlockBase):
+    def run(self, input_df: pd.DataFrame):
+        raise ValueError("Block failed")
+
+
+def make_span(name: str, i: int) -> Span:
+    return Span(i, None, name, "id", i, i + 1, 1, 1, 1, 8, 8, 0, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def tracer():
+    # Every test gets a fresh process wide tracer
+    yield configure_tracing()
+    configure_tracing()
+
+
+####################################################################################################
+# The following tests are for the Tracer class                                                     #
+####################################################################################################
+
+
+def test_ring_buffer_keeps_latest_spans():
+    tracer = Tracer(capacity=4)
+    for i in range(10):
+        tracer.record(make_span(f"span_{i}", i))
+    assert [span.name for span in tracer.spans()] == [f"span_{i}" for i in range(6, 10)]
+    assert tracer.recorded == 10
+    assert tracer.dropped == 6
+
+    tracer.clear()
+    assert tracer.spans() == []
+
+
+def test_concurrent_records():
+    tracer = Tracer(capacity=1000)
+
+    def record():
+        for i in range(100):
+            tracer.record(make_span("span", i))
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(tracer.spans()) == 800
+
+
+def test_sampling():
+    assert not Tracer(sample_rate=0).sampled()
+    assert Tracer(sample_rate=1).sampled()
+    with pytest.raises(ValueError):
+        Tracer(sample_rate=2)
+
+
+####################################################################################################
+# The following tests are for the block spans                                                      #
+####################################################################################################
+
+
+def test_block_spans(tracer):
+    block = FilterBlock()
+    block(TEST_DATA)
+    with pytest.raises(ValueError):
+        FailingBlock()(TEST_DATA)
+
+    first, second = tracer.spans()
+    assert (first.name, first.block_id, first.rows_in, first.rows_out) == (
+        "FilterBlock",
+        block.id,
+        10,
+        5,
+    )
+    assert 0 < first.duration_ns and first.end_ns <= second.start_ns
+    assert second.name == "FailingBlock" and second.rows_out is None
+    assert "failed" in list(tracer.format_spans())[1]
+
+
+def test_span_metrics(tracer):
+    FilterBlock()(TEST_DATA)
+    (span,) = tracer.spans()
+    assert span.bytes_in == TEST_DATA.memory_usage(index=False).sum()
+    assert span.bytes_out == 5 * 8
+    assert 0 <= span.cpu_ns
+    assert span.rss_delta >= 0
+    assert span.rows_per_sec > 0
+
+
+def test_nested_spans(tracer):
+    # The chunks run in worker threads are children of the runner span
+    runner = ParallelRunner(block=FilterBlock(), num_chunks=2, use_thread_pool=True)
+    runner(TEST_DATA)
+    spans = tracer.spans()
+    (root,) = [span for span in spans if span.name == "ParallelRunner"]
+    chunks = [span for span in spans if span.name == "FilterBlock"]
+    assert root.parent_id is None
+    assert len(chunks) == 2
+    assert all(chunk.parent_id == root.span_id for chunk in chunks)
+    assert all(root.start_ns <= chunk.start_ns <= root.end_ns for chunk in chunks)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"scheduling": "dynamic", "over_partition": 1, "speculation_factor": None},
+        {"transport": "shared_memory"},
+    ],
+)
+def test_process_pool_spans(tracer, options):
+    # The chunk spans made in worker processes are sent back to the parent tracer
+    runner = ParallelRunner(
+        block=FilterBlock(), num_chunks=4, use_process_pool=True, **options
+    )
+    runner(TEST_DATA)
+    spans = tracer.spans()
+    (root,) = [span for span in spans if span.name == "ParallelRunner"]
+    chunks = [span for span in spans if span.name == "FilterBlock"]
+    assert len(chunks) == 4
+    assert all(chunk.parent_id == root.span_id for chunk in chunks)
+    assert all(chunk.pid != os.getpid() for chunk in chunks)
+    assert sum(chunk.rows_in for chunk in chunks) == len(TEST_DATA)
+    assert summary_table(spans).set_index("block").loc["FilterBlock", "calls"] == 4
+
+
+def test_disabled_tracing():
+    configure_tracing(sample_rate=0)
+    FilterBlock()(TEST_DATA)
+    assert get_tracer().spans() == []
+
+
+def test_init_logging():
+    init_logging("INFO")
+    init_logging("INFO")
+    with pytest.raises(ValueError):
+        init_logging("VERBOSE")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,355 @@
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar, Token
+from functools import partial
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional
+
+import pandas as pd
+
+from src.utils.schema import checked_blocks, schema_checked
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Number of spans kept by the process wide tracer, older spans are overwritten
+DEFAULT_CAPACITY: int = 8192
+
+# Unit of ru_maxrss in bytes, kilobytes on Linux and bytes on macOS
+RSS_UNIT: int = 1 if sys.platform == "darwin" else 1024
+
+# Span the current thread or task is running in, None outside of any span
+_current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+# Number of block calls the current thread or task is nested in
+_call_depth: ContextVar[int] = ContextVar("call_depth", default=0)
+
+
+def current_span_id() -> Optional[int]:
+    """Return the id of the span the caller runs in, None outside of any span."""
+    return _current_span.get()
+
+
+def call_depth() -> int:
+    """Return the number of block calls the caller is nested in, 0 at the top level."""
+    return _call_depth.get()
+
+
+def enter_call() -> Token:
+    """Mark the start of a block call, returns the token to pass to exit_call."""
+    return _call_depth.set(_call_depth.get() + 1)
+
+
+def exit_call(token: Token) -> None:
+    """Mark the end of the block call started with enter_call."""
+    _call_depth.reset(token)
+
+
+def peak_rss() -> int:
+    """Return the peak resident set size of the process in bytes, 0 if unknown."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+def frame_nbytes(df: Any) -> Optional[int]:
+    """Return the bytes held by the columns of a frame (not counting the objects
+    referenced by object columns), None if it is not a frame.
+
+    DataFrame.memory_usage takes ~0.5ms on a wide frame, summing the arrays of
+    the block manager takes ~1us, so the latter is used when available.
+    """
+    if not isinstance(df, pd.DataFrame):
+        return None
+    try:
+        return sum(block.values.nbytes for block in df._mgr.blocks)
+    except AttributeError:
+        return int(df.memory_usage(index=False, deep=False).sum())
+
+
+class Span(NamedTuple):
+    """A single call of a block, timestamps are perf_counter_ns values."""
+
+    span_id: int
+    # Span of the runner (or block) the call was made from, None for top level calls
+    parent_id: Optional[int]
+    name: str
+    block_id: str
+    start_ns: int
+    end_ns: int
+    # CPU time of the calling thread, far below the wall time if it mostly waited
+    cpu_ns: int
+    rows_in: int
+    # None if the call raised
+    rows_out: Optional[int]
+    bytes_in: int
+    bytes_out: Optional[int]
+    # Growth of the peak resident set size of the process during the call
+    rss_delta: int
+    pid: int
+    thread_id: int
+
+    @property
+    def duration_ns(self) -> int:
+        """Return the wall time of the call in nanoseconds"""
+        return self.end_ns - self.start_ns
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Return the number of input rows processed per second"""
+        return self.rows_in / max(self.duration_ns, 1) * 1e9
+
+    def format(self) -> str:
+        """Return a human readable line describing the span"""
+        outcome = "failed" if self.rows_out is None else f"{self.rows_out} rows out"
+        return (
+            f"[{self.block_id}] {self.name} {self.duration_ns / 1e6:.3f}ms "
+            f"(cpu {self.cpu_ns / 1e6:.3f}ms, {self.rows_in} rows in, {outcome}) "
+            f"pid={self.pid} thread={self.thread_id}"
+        )
+
+
+class OpenSpan(NamedTuple):
+    """A span that started and has not ended yet, see Tracer.open_span."""
+
+    span_id: int
+    parent_id: Optional[int]
+    token: Token
+    name: str
+    block_id: str
+    start_ns: int
+    cpu_ns: int
+    peak_rss: int
+    rows_in: int
+    bytes_in: int
+
+
+class Tracer:
+    """Records block spans into a preallocated ring buffer.
+
+    Recording a span is a counter increment and a slot assignment, nothing is
+    formatted, so tracing can stay on for hot paths with thousands of small
+    chunks. Only a sample_rate fraction of the calls are recorded, and once
+    capacity spans were recorded the oldest ones are overwritten. Every process
+    has its own tracer, the spans of calls made with with_parent in another
+    process are sent back with their results and merged in by merge_spans.
+
+    Spans opened while another span is open in the same thread (or asyncio
+    task) are its children, functions run in other threads or processes can be
+    linked to the current span with with_parent.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, sample_rate: float = 1.0):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.pid = os.getpid()
+        self._slots: List[Optional[Span]] = [None] * capacity
+        # next() on itertools.count is atomic, so threads never share a slot index
+        self._counter = itertools.count()
+        self._span_ids = itertools.count(1)
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+    def sampled(self) -> bool:
+        """Return whether the current call should be recorded."""
+        if self.sample_rate >= 1:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def open_span(self, name: str, block_id: str, input_df: pd.DataFrame) -> OpenSpan:
+        """Start a span of a call on input_df, it is the current span until closed."""
+        # Span ids are unique across the processes of a run
+        span_id = (self.pid << 32) | next(self._span_ids)
+        parent_id = _current_span.get()
+        return OpenSpan(
+            span_id,
+            parent_id,
+            _current_span.set(span_id),
+            name,
+            block_id,
+            time.perf_counter_ns(),
+            time.thread_time_ns(),
+            peak_rss(),
+            len(input_df),
+            frame_nbytes(input_df),
+        )
+
+    def close_span(self, span: OpenSpan, result_df: Optional[pd.DataFrame]) -> Span:
+        """End and record a span, result_df is None if the call raised."""
+        end_ns = time.perf_counter_ns()
+        cpu_ns = time.thread_time_ns() - span.cpu_ns
+        _current_span.reset(span.token)
+        closed = Span(
+            span.span_id,
+            span.parent_id,
+            span.name,
+            span.block_id,
+            span.start_ns,
+            end_ns,
+            cpu_ns,
+            span.rows_in,
+            None if result_df is None else len(result_df),
+            span.bytes_in,
+            frame_nbytes(result_df),
+            peak_rss() - span.peak_rss,
+            self.pid,
+            threading.get_ident(),
+        )
+        self.record(closed)
+        return closed
+
+    def record(self, span: Span) -> None:
+        """Record a span, overwriting the oldest one if the buffer is full."""
+        index = next(self._counter)
+        self._slots[index % self.capacity] = span
+        self._recorded = max(self._recorded, index + 1)
+
+    @property
+    def recorded(self) -> int:
+        """Return the number of spans recorded so far, including overwritten ones"""
+        return self._recorded
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of spans overwritten by newer ones"""
+        return max(0, self._recorded - self.capacity)
+
+    def spans(self) -> List[Span]:
+        """Return the spans still in the buffer, oldest first."""
+        with self._lock:
+            slots = list(self._slots)
+        recorded = self._recorded
+        if recorded <= self.capacity:
+            spans = slots[:recorded]
+        else:
+            start = recorded % self.capacity
+            spans = slots[start:] + slots[:start]
+        # A slot whose index was taken by a concurrent call may not be written yet
+        return [span for span in spans if span is not None]
+
+    def spans_since(self, recorded: int) -> List[Span]:
+        """Return the spans recorded once the tracer had recorded the given number
+        of spans (see recorded), that are still in the buffer, oldest first."""
+        spans = self.spans()
+        return spans[len(spans) - min(self._recorded - recorded, len(spans)) :]
+
+    def format_spans(self) -> Iterator[str]:
+        """Lazily format the spans still in the buffer, oldest first."""
+        return (span.format() for span in self.spans())
+
+    def clear(self) -> None:
+        """Forget every recorded span."""
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self._counter = itertools.count()
+            self._recorded = 0
+
+
+# Tracer of the current process, created on first use
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Return the tracer of the current process."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    elif _tracer.pid != os.getpid():
+        # Forked workers start with an empty tracer instead of a copy of the parent's
+        _tracer = Tracer(capacity=_tracer.capacity, sample_rate=_tracer.sample_rate)
+    return _tracer
+
+
+def configure_tracing(
+    capacity: int = DEFAULT_CAPACITY, sample_rate: float = 1.0
+) -> Tracer:
+    """Replace the tracer of the current process, sample_rate=0 disables tracing."""
+    global _tracer
+    _tracer = Tracer(capacity=capacity, sample_rate=sample_rate)
+    return _tracer
+
+
+class TracedResult(NamedTuple):
+    """Result of a call made in another process and the spans it recorded there."""
+
+    result: Any
+    spans: List[Span]
+
+
+def call_spans(
+    spans: List[Span], parent_id: Optional[int], thread_id: int
+) -> List[Span]:
+    """Return the spans of the calls made by a thread in the given parent span and
+    the spans nested in them, leaving out the calls other threads made meanwhile."""
+    span_ids, selected = set(), []
+    # Spans are recorded when they close, after the spans nested in them
+    for span in reversed(spans):
+        if span.parent_id in span_ids or (
+            span.parent_id == parent_id and span.thread_id == thread_id
+        ):
+            span_ids.add(span.span_id)
+            selected.append(span)
+    return selected[::-1]
+
+
+def call_with_parent(
+    parent_id: Optional[int],
+    depth: int,
+    checked: frozenset,
+    pid: int,
+    fn: Callable,
+    *args,
+) -> Any:
+    """Call fn in the given span, at the given call depth and with the given blocks
+    checked, see with_parent. When called in another process than pid, the spans
+    of the call are returned with its result as a TracedResult (see merge_spans)."""
+    tracer = get_tracer()
+    recorded = tracer.recorded
+    span_token, depth_token = _current_span.set(parent_id), _call_depth.set(depth)
+    try:
+        with schema_checked(dict.fromkeys(checked, True)):
+            result = fn(*args)
+    finally:
+        _call_depth.reset(depth_token)
+        _current_span.reset(span_token)
+    if os.getpid() == pid:
+        return result
+    spans = call_spans(tracer.spans_since(recorded), parent_id, threading.get_ident())
+    return TracedResult(result, spans)
+
+
+def with_parent(fn: Callable) -> Callable:
+    """Return fn bound to the current span and call depth, so the calls it makes in
+    another thread or process (e.g. the chunks of a runner) are nested in the current
+    call and their spans are children of the current span. The blocks whose schema
+    the current run checked skip validate_columns there too. The result can be
+    pickled if fn can, pass what it returns to merge_spans."""
+    return partial(
+        call_with_parent,
+        _current_span.get(),
+        _call_depth.get(),
+        checked_blocks(),
+        os.getpid(),
+        fn,
+    )
+
+
+def merge_spans(result: Any) -> Any:
+    """Return the result of a function bound with with_parent, recording the spans
+    it made in another process (e.g. a process pool worker) into this tracer, so
+    they show up with the spans of its parent. The spans of a call that raised
+    stay in the tracer of the process it ran in."""
+    if not isinstance(result, TracedResult):
+        return result
+    tracer = get_tracer()
+    for span in result.spans:
+        tracer.record(span)
+    return result.result
@@ -1,36 +1,103 @@
-import datetime
 import logging
+import time
 
 import pandas as pd
 
+from src.utils.tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
 
 def log_run_info(func):
-    """Decorator to log information about the run function."""
+    """Decorator to trace and log information about the run function."""
 
     def wrapper(self, input_df: pd.DataFrame) -> pd.DataFrame:
-        """Wrapper function to log information about the run function.
+        """Wrapper function to trace and log information about the run function.
 
         Args:
             input_df: The input DataFrame.
         Returns:
             result_df: The resulting DataFrame.
         """
-        # Log the start of the run
+        # Skip every measurement when the call is neither traced nor logged
+        tracer = get_tracer()
+        traced = tracer.sampled()
+        logged = logger.isEnabledFor(logging.INFO)
+        if not traced and not logged:
+            return func(self, input_df)
+
+        # Log the start of the run, the message is only formatted if emitted
+        block_name = self.__class__.__name__
+        logger.info(
+            "[%s] Starting %s with input shape %s", self.id, block_name, input_df.shape
+        )
+
+        # Call the original function inside a span, the spans it opens are its children
+        start_ns = time.perf_counter_ns()
+        span = tracer.open_span(block_name, self.id, input_df) if traced else None
+        result_df = None
+        try:
+            result_df = func(self, input_df)
+        finally:
+            if span is not None:
+                tracer.close_span(span, result_df)
+            end_ns = time.perf_counter_ns()
+
+        # Log the run information
+        logger.info(
+            "[%s] Finished %s in %.6fs with output shape %s",
+            self.id,
+            block_name,
+            (end_ns - start_ns) / 1e9,
+            result_df.shape,
+        )
+        return result_df
+
+    return wrapper
+
+
+def log_run_info_async(func):
+    """Decorator to trace and log information about the async run function."""
+
+    async def wrapper(self, input_df: pd.DataFrame) -> pd.DataFrame:
+        """Wrapper function to trace and log information about the async run function.
+
+        Args:
+            input_df: The input DataFrame.
+        Returns:
+            result_df: The resulting DataFrame.
+        """
+        # Skip every measurement when the call is neither traced nor logged
+        tracer = get_tracer()
+        traced = tracer.sampled()
+        logged = logger.isEnabledFor(logging.INFO)
+        if not traced and not logged:
+            return await func(self, input_df)
+
+        # Log the start of the run, the message is only formatted if emitted
         block_name = self.__class__.__name__
-        start_time = datetime.datetime.now()
         logger.info(
-            f"[{self.id}] Starting {block_name} at {start_time} with input shape {input_df.shape}"
+            "[%s] Starting %s with input shape %s", self.id, block_name, input_df.shape
         )
 
-        # Call the original function
-        result_df = func(self, input_df)
+        # Await the original function inside a span, the spans it opens are its children
+        start_ns = time.perf_counter_ns()
+        span = tracer.open_span(block_name, self.id, input_df) if traced else None
+        result_df = None
+        try:
+            result_df = await func(self, input_df)
+        finally:
+            if span is not None:
+                tracer.close_span(span, result_df)
+            end_ns = time.perf_counter_ns()
 
         # Log the run information
-        end_time = datetime.datetime.now()
         logger.info(
-            f"[{self.id}] Finished {block_name} at {end_time} in {end_time - start_time} with output shape {result_df.shape}"
+            "[%s] Finished %s in %.6fs with output shape %s",
+            self.id,
+            block_name,
+            (end_ns - start_ns) / 1e9,
+            result_df.shape,
         )
         return result_df
 
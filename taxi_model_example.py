@@ -12,12 +12,15 @@ from src.blocks.train.train_tabular import TrainModelBlock, TrainModelParams
 from src.runners.parallel_runner import ParallelRunner
 from src.runners.sequential_runner import SequentialRunner
 from src.utils.logging import init_logging
+from src.utils.metrics import export_chrome_trace, summary_table
 
 app = typer.Typer()
 
 # Params specifically for the taxi fare example
 TAXI_DATA = "data/NYCTaxiFares.csv"
 MODEL_FILE = "TaxiFareRegrModel.pt"
+CACHE_DIR = ".block_cache"
+CHECKPOINT_DIR = ".checkpoints/taxi"
 CATEGORICAL_COLUMNS = ["hour", "am_or_pm", "weekday", "time_of_day"]
 CONTINUOUS_COLUMNS = [
     "pickup_latitude",
@@ -38,6 +41,7 @@ MODEL_DROPOUT = 0.4
 @app.command()
 def train_taxi(
     verbose: bool = False,
+    trace_file: str = None,
 ):
     """Run a more complex model training example of a computation workflow."""
     # Initialize logging and load the data
@@ -47,8 +51,10 @@ def train_taxi(
     test_data = pd.read_csv(TAXI_DATA)
     print(f"Loaded data with {len(test_data)} records.")
 
-    # Create params for the preparation block
-    prepare_params = PrepareTaxiBlockParams(id_col="id", log_level="DEBUG")
+    # Create params for the preparation block, reusing the result of earlier runs
+    prepare_params = PrepareTaxiBlockParams(
+        id_col="id", log_level="DEBUG", cache_dir=CACHE_DIR
+    )
 
     # Create params for the training block
     train_params = TrainModelParams(
@@ -78,13 +84,14 @@ def train_taxi(
         log_level="INFO",
     )
 
-    # Create a sequential runner with a map of blocks to run
+    # Create a sequential runner with a map of blocks to run, a failed run
+    # resumes from the stage that failed
     sequential_runner = SequentialRunner(
         block_map={
             # (Parallel) Pre-process data
             1: ParallelRunner(
                 block=PrepareTaxiBlock(params=prepare_params),
-                chunk_size=10000,
+                auto_chunking=True,
                 use_thread_pool=True,
             ),
             # (Sequential) Train the model
@@ -92,10 +99,11 @@ def train_taxi(
             # (Parallel) Predict using the model
             3: ParallelRunner(
                 block=PredictBlock(params=predict_params),
-                chunk_size=10000,
+                auto_chunking=True,
                 use_thread_pool=True,
             ),
-        }
+        },
+        checkpoint_dir=CHECKPOINT_DIR,
     )
 
     # Run the sequential runner and time the execution
@@ -108,6 +116,12 @@ def train_taxi(
     print(f"\nDataframe Preview:\n{result.head(10)}")
     print(f"\nCompleted all work in {duration} seconds.")
 
+    # Print the per block metrics, and export them for chrome://tracing if asked
+    print(f"\nBlock Metrics:\n{summary_table()}")
+    if trace_file is not None:
+        export_chrome_trace(trace_file)
+        print(f"Wrote the trace of the run to {trace_file}")
+
 
 if __name__ == "__main__":
     app()